@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 import datetime
 from django.db import models
+from django.db.models.signals import post_save, post_delete
 from django.db.models import get_model
 from django.contrib.contenttypes import generic
 from django.contrib.contenttypes.models import ContentType
@@ -12,7 +13,7 @@ from django.template import loader, Context, TemplateDoesNotExist
 from django.utils.translation import get_language, activate
 from notification.models import NoticeType
 from transifex.txcommon.log import logger
-from .queues import log_to_queues
+from .queues import queue_pushes
 
 def _get_formatted_message(label, context):
     """
@@ -218,6 +219,103 @@ class LogEntry(models.Model):
         """
         return self.action_type.label.split('_')[-1]
 
+# The NoticeType objects by label. They are shared by all writers of the
+# process and cleared, whenever a NoticeType changes.
+_notice_types = {}
+
+
+def _notice_type(label):
+    """Return the NoticeType with the label."""
+    if label not in _notice_types:
+        _notice_types[label] = NoticeType.objects.get(label=label)
+    return _notice_types[label]
+
+
+def clear_notice_types(sender, **kwargs):
+    """Clear the cache of NoticeType objects."""
+    _notice_types.clear()
+
+post_save.connect(clear_notice_types, sender=NoticeType)
+post_delete.connect(clear_notice_types, sender=NoticeType)
+
+
+class ActionLogWriter(object):
+    """
+    Collect action logs and write them in a batch.
+
+    The LogEntry rows are inserted in bulk and the redis queues are updated
+    in a single pipeline. If ACTIONLOG_ASYNC is set, the batch is written by
+    a celery task instead. Nothing is queued, unless ACTIONLOG_ENABLED is
+    set.
+
+    Usage::
+
+        writer = ActionLogWriter()
+        for project in projects:
+            writer.add(request.user, [project], 'project_changed',
+                context={'project': project})
+        writer.flush()
+    """
+
+    def __init__(self):
+        self._entries = []
+        self._pushes = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, user, object_list, action_type, message=None, context=None,
+            action_time=None):
+        """
+        Queue the action logs of an action. The arguments are the same as
+        the ones of ``action_logging``.
+        """
+        if not getattr(settings, 'ACTIONLOG_ENABLED', None):
+            return
+
+        if context is None:
+            context = {}
+
+        if message is None:
+            message = _get_formatted_message(action_type, context)
+
+        action_type_obj = _notice_type(action_type)
+
+        if action_time is None:
+            action_time = datetime.datetime.now()
+
+        try:
+            for object in object_list:
+                self._entries.append(LogEntry(
+                        user_id = user.pk,
+                        # get_for_model caches the content types.
+                        content_type = ContentType.objects.get_for_model(object),
+                        object_id = object.pk,
+                        object_name = force_unicode(object)[:200],
+                        action_type = action_type_obj,
+                        action_time = action_time,
+                        message = message))
+                if settings.USE_REDIS:
+                    self._pushes.extend(queue_pushes(
+                        object, user, action_time, action_type_obj, message
+                    ))
+        except TypeError:
+            raise TypeError("The 'object_list' parameter must be iterable")
+
+    def flush(self):
+        """Write the queued action logs."""
+        # Avoid circular imports
+        from .tasks import write_action_logs
+        if not self._entries:
+            return
+        entries, pushes = self._entries, self._pushes
+        self._entries, self._pushes = [], []
+        if getattr(settings, 'ACTIONLOG_ASYNC', False):
+            write_action_logs.delay(entries, pushes)
+        else:
+            write_action_logs(entries, pushes)
+
+
 def action_logging(user, object_list, action_type, message=None, context=None):
     """
     Add ActionLog using a set of parameters.
@@ -241,32 +339,9 @@ def action_logging(user, object_list, action_type, message=None, context=None):
         al = 'project_added'
         context = {'project': object}
         action_logging(request.user, [object], al , context=context):
-    """
-    if not getattr(settings, 'ACTIONLOG_ENABLED', None):
-        return
 
-    if context is None:
-        context = {}
-
-    if message is None:
-        message = _get_formatted_message(action_type, context)
-
-    action_type_obj = NoticeType.objects.get(label=action_type)
-
-    time = datetime.datetime.now()
-
-    try:
-        for object in object_list:
-            l = LogEntry(
-                    user_id = user.pk,
-                    content_type = ContentType.objects.get_for_model(object),
-                    object_id = object.pk,
-                    object_name = force_unicode(object)[:200],
-                    action_type = action_type_obj,
-                    action_time = time,
-                    message = message)
-            l.save()
-            if settings.USE_REDIS:
-                log_to_queues(object, user, time, action_type_obj, message)
-    except TypeError:
-        raise TypeError("The 'object_list' parameter must be iterable")
+    Use an ``ActionLogWriter`` to log many actions at once.
+    """
+    writer = ActionLogWriter()
+    writer.add(user, object_list, action_type, message, context)
+    writer.flush()
@@ -4,13 +4,28 @@
 Redis related stuff for action logs.
 """
 
+from __future__ import with_statement
+
 from django.db.models import get_model
 from django.utils.encoding import force_unicode
 from django.contrib.auth.models import User
+from transifex.txcommon.cache import get_generations, bump_generation
 from transifex.txcommon.log import logger
 from datastores.txredis import TxRedisMapper, redis_exception_handler
 
 
+# The key of the list of the most recent actions on public projects
+EVENT_FEED_KEY = 'event_feed'
+
+# The cache namespace, the generation of which changes, whenever a project
+# becomes private or public.
+PRIVATE_PROJECTS_NAMESPACE = 'private_projects'
+
+# The urls of the private projects, cached by the process, along with the
+# generation they were loaded at.
+_private_urls = (None, [])
+
+
 def redis_key_for_resource(resource):
     return 'resource:history:%s:%s' % (resource.project_id, resource.slug)
 
@@ -27,109 +42,129 @@ def redis_key_for_user(user):
     return 'user:history:%s' % user.id
 
 
-@redis_exception_handler
-def log_to_queues(o, user, action_time, action_type, message):
-    """Log actions to redis' queues."""
+def queue_pushes(o, user, action_time, action_type, message):
+    """Return the pushes to redis' queues, which log an action.
+
+    Args:
+        o: The object of the action.
+        user: The user, who did the action.
+        action_time: The time of the action.
+        action_type: The NoticeType of the action.
+        message: The message of the action.
+    Returns:
+        A list of (key, data, length) tuples, where length is the number of
+        items the queue keeps.
+    """
     Project = get_model('projects', 'Project')
     Resource = get_model('resources', 'Resource')
     Team = get_model('teams', 'Team')
-    _log_to_user_history(user, action_time, action_type, message)
+    data = {
+        'action_time': action_time,
+        'message': message,
+        'action_type': action_type,
+    }
+    user_data = dict(data, user=user.username)
+    pushes = [(redis_key_for_user(user), user_data, 12)]
     if isinstance(o, Project):
-        _log_to_recent_project_actions(o, user.id, action_time, message)
-        _log_to_project_history(o, action_time, action_type, message)
+        # We skip actions that refer to private projects.
+        if not o.private:
+            feed_data = {
+                'name': force_unicode(o)[:200],
+                'user_id': user.id,
+                'action_time': action_time,
+                'message': message
+            }
+            pushes.append((EVENT_FEED_KEY, feed_data, 12))
+        # Store logs in hubs, too
+        project = o
+        while project is not None:
+            pushes.append((redis_key_for_project(project), data, 5))
+            project = project.outsource
     elif isinstance(o, Resource):
-        _log_to_resource_history(o, action_time, action_type, message)
+        pushes.append((redis_key_for_resource(o), data, 5))
     elif isinstance(o, Team):
-        _log_to_team_history(o, action_time, action_type, message)
+        pushes.append((redis_key_for_team(o), data, 5))
+    return pushes
 
-def _log_to_recent_project_actions(p, user_id, action_time, message):
-    """Log actions that refer to projects to a queue of most recent actions.
 
-    We use redis' list for that. We skip actions that refer to private projects.
+@redis_exception_handler
+def push_to_queues(pushes):
+    """Push the actions to redis' queues in a single pipeline.
+
+    Actions in the event feed, the message of which mentions a private
+    project, are skipped.
+
+    Args:
+        pushes: A list of (key, data, length) tuples as returned by
+            ``queue_pushes``.
     """
-    Project = get_model('projects', 'Project')
-    if p.private:
+    if not pushes:
         return
-    private_slugs = Project.objects.filter(
-        private=True
-    ).values_list('slug', flat=True)
-    for slug in private_slugs:
-        if ('/projects/p/%s/' % slug) in message:
-            return
-
-    key = 'event_feed'
-    data = {
-        'name': force_unicode(p)[:200],
-        'user_id': user_id,
-        'action_time': action_time,
-        'message': message
-    }
-    r = TxRedisMapper()
-    r.lpush(key, data=data)
-    r.ltrim(key, 0, 11)
+    private_urls = None
+    with TxRedisMapper().batch() as r:
+        for key, data, length in pushes:
+            if key == EVENT_FEED_KEY:
+                if private_urls is None:
+                    private_urls = private_project_urls()
+                message = data['message'] or ''
+                if any(url in message for url in private_urls):
+                    continue
+            r.lpush(key, data=data)
+            r.ltrim(key, 0, length - 1)
 
 
-@redis_exception_handler
-def _log_to_project_history(project, action_time, action_type, message):
-    """Log a message to a project's history queue."""
-    Project = get_model('projects', 'Project')
-    key = redis_key_for_project(project)
-    data = {
-        'action_time': action_time,
-        'message': message,
-        'action_type': action_type,
-    }
-    r = TxRedisMapper()
-    r.lpush(key, data=data)
-    r.ltrim(key, 0, 4)
-
-    # Store logs in hubs, too
-    if project.outsource:
-        _log_to_project_history(
-            project.outsource, action_time, action_type, message
-        )
+def _project_url(slug):
+    return '/projects/p/%s/' % slug
 
 
-@redis_exception_handler
-def _log_to_resource_history(resource, action_time, action_type, message):
-    """Log a message to a resource's history queue."""
-    Resource = get_model('resources', 'Resource')
-    key = redis_key_for_resource(resource)
-    data = {
-        'action_time': action_time,
-        'message': message,
-        'action_type': action_type,
-    }
-    r = TxRedisMapper()
-    r.lpush(key, data=data)
-    r.ltrim(key, 0, 4)
+def private_project_urls():
+    """Return the urls of the private projects.
 
+    They are cached by the process until ``invalidate_private_projects``
+    bumps their generation in any process.
+    """
+    global _private_urls
+    generation = get_generations((PRIVATE_PROJECTS_NAMESPACE, ()))
+    if _private_urls[0] != generation:
+        Project = get_model('projects', 'Project')
+        _private_urls = (generation, [
+            _project_url(slug) for slug in Project.objects.filter(
+                private=True
+            ).values_list('slug', flat=True)
+        ])
+    return _private_urls[1]
+
+
+def check_project_privacy(sender, instance, **kwargs):
+    """Note whether a project, which is about to be saved, becomes private or
+    public or changes the slug of a private project.
+
+    Connected to the pre_save signal of projects.
+    """
+    if instance.pk is None:
+        instance._privacy_changed = instance.private
+        return
+    stored = sender.objects.filter(pk=instance.pk).values_list(
+        'private', 'slug'
+    )
+    if not stored:
+        instance._privacy_changed = instance.private
+        return
+    private, slug = stored[0]
+    instance._privacy_changed = (private != instance.private or
+            (private and slug != instance.slug))
 
-@redis_exception_handler
-def _log_to_team_history(team, action_time, action_type, message):
-    """Log a message to a team's history queue."""
-    Resource = get_model('teams', 'Team')
-    key = redis_key_for_team(team)
-    data = {
-        'action_time': action_time,
-        'message': message,
-        'action_type': action_type,
-    }
-    r = TxRedisMapper()
-    r.lpush(key, data=data)
-    r.ltrim(key, 0, 4)
 
+def invalidate_private_projects(sender, instance, **kwargs):
+    """Invalidate the urls of the private projects in all processes, if
+    they have changed.
 
-@redis_exception_handler
-def _log_to_user_history(user, action_time, action_type, message):
-    """Log a message to a user's history queue."""
-    key = redis_key_for_user(user)
-    data = {
-        'action_time': action_time,
-        'message': message,
-        'action_type': action_type,
-        'user': user.username
-    }
-    r = TxRedisMapper()
-    r.lpush(key, data=data)
-    r.ltrim(key, 0, 11)
+    Connected to the post_save and post_delete signals of projects.
+    """
+    if 'created' in kwargs:
+        changed = getattr(instance, '_privacy_changed', True)
+        instance._privacy_changed = False
+    else:
+        changed = instance.private
+    if changed:
+        bump_generation(PRIVATE_PROJECTS_NAMESPACE)
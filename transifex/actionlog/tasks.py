@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from celery.decorators import task
+from djangobulk.bulk import insert_many
+from .models import LogEntry
+from .queues import push_to_queues
+
+
+@task(name='write_action_logs', ignore_result=True)
+def write_action_logs(entries, pushes):
+    """
+    Write a batch of action logs.
+
+    Args:
+        entries: A list of unsaved LogEntry objects.
+        pushes: A list of pushes to redis' queues, as returned by
+            ``queue_pushes``.
+    """
+    insert_many(LogEntry, entries)
+    if pushes:
+        push_to_queues(pushes)
@@ -0,0 +1,65 @@
+#-*- coding: utf-8 -*-
+from django.contrib.contenttypes.models import ContentType
+from transifex.txcommon.tests import base
+from transifex.actionlog.models import *
+from transifex.actionlog.queues import queue_pushes, redis_key_for_project,\
+        redis_key_for_user, EVENT_FEED_KEY, private_project_urls
+
+
+class ActionLogWriterTests(base.BaseTestCase):
+
+    def test_batch(self):
+        """Test that the queued action logs are written on flush."""
+        ctype = ContentType.objects.get_for_model(self.project)
+        existing = LogEntry.objects.filter(content_type=ctype).count()
+        writer = ActionLogWriter()
+        writer.add(self.user['maintainer'], [self.project],
+            'project_changed', message='Changed')
+        writer.add(self.user['maintainer'],
+            [self.project, self.project_private], 'project_changed',
+            message='Changed again')
+        self.assertEqual(len(writer), 3)
+        self.assertEqual(
+            LogEntry.objects.filter(content_type=ctype).count(), existing
+        )
+        writer.flush()
+        self.assertEqual(len(writer), 0)
+        self.assertEqual(
+            LogEntry.objects.filter(content_type=ctype).count(), existing + 3
+        )
+        entry = LogEntry.objects.by_object(self.project_private)[0]
+        self.assertEqual(entry.message, 'Changed again')
+        self.assertEqual(entry.user, self.user['maintainer'])
+
+    def test_queue_pushes(self):
+        """Test the redis queues an action is logged to."""
+        hub = self.project_private
+        self.project.outsource = hub
+        user = self.user['maintainer']
+        pushes = queue_pushes(self.project, user, None, None, 'Changed')
+        self.assertEqual(
+            [key for key, data, length in pushes],
+            [redis_key_for_user(user), EVENT_FEED_KEY,
+             redis_key_for_project(self.project), redis_key_for_project(hub)]
+        )
+        pushes = queue_pushes(hub, user, None, None, 'Changed')
+        self.assertFalse(EVENT_FEED_KEY in [key for key, d, l in pushes])
+
+    def test_private_project_urls(self):
+        """Test that the cached urls of private projects are invalidated,
+        when a project becomes private or public.
+        """
+        url = '/projects/p/%s/' % self.project.slug
+        private_url = '/projects/p/%s/' % self.project_private.slug
+        urls = private_project_urls()
+        self.assertTrue(private_url in urls)
+        self.assertFalse(url in urls)
+        self.project.description = 'Changed'
+        self.project.save()
+        self.assertTrue(private_project_urls() is urls)
+        self.project.private = True
+        self.project.save()
+        self.assertTrue(url in private_project_urls())
+        self.project.private = False
+        self.project.save()
+        self.assertFalse(url in private_project_urls())
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Fetching of remote source files.
+
+The source files are fetched with conditional requests, using the ETag
+and Last-Modified validators of the previous fetch, and compared with the
+digest of the content that was last imported, so that unchanged files are
+skipped before they are parsed. Many files can be fetched concurrently by
+a bounded pool of threads.
+"""
+
+import time
+import urllib2
+import urlparse
+from collections import deque
+from hashlib import sha1
+from multiprocessing.pool import ThreadPool
+from django.conf import settings
+from transifex.txcommon.log import logger
+
+
+class FetchResult(object):
+    """The result of fetching the source file of a URLInfo object.
+
+    The status is one of:
+        fetched: The file has changed and its content is available.
+        not_modified: The server replied that the file has not changed.
+        unchanged: The content is the one imported last time.
+        failed: The file could not be fetched. See error.
+    """
+
+    def __init__(self, url_info):
+        self.url_info = url_info
+        self.status = 'failed'
+        self.filename = ''
+        self.content = None
+        self.etag = ''
+        self.last_modified = ''
+        self.digest = ''
+        self.error = None
+        self.elapsed = 0
+
+    @property
+    def changed(self):
+        """Whether the file has to be imported."""
+        return self.status == 'fetched'
+
+
+def _filename(url, info):
+    """Return the filename of the fetched file.
+
+    Take it from the Content-Disposition header of the response, if there
+    is one, or from the URL otherwise.
+    """
+    filename = ''
+    if info.has_key('Content-Disposition'):
+        content = info['Content-Disposition']
+        if 'filename' in content:
+            filename = content.split('filename')[1]
+            filename = filename.replace('"', '').replace("'", ""
+                ).replace("=", "").replace('/', '-').strip()
+    if filename == '':
+        parts = urlparse.urlsplit(url)
+        #FIXME: This still might end empty
+        filename = parts.path.split('/')[-1]
+    return filename
+
+
+def fetch_source(url_info, conditional=True, timeout=None):
+    """Fetch the source file of a URLInfo object.
+
+    This does not touch the database, so that it can run in a thread.
+
+    Args:
+        url_info: The URLInfo object, with its resource and project.
+        conditional: Whether to skip the file, if it has not changed since
+            it was last imported.
+        timeout: The timeout of the request in seconds. Defaults to the
+            AUTOFETCH_TIMEOUT setting.
+    Returns:
+        A FetchResult object.
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'AUTOFETCH_TIMEOUT', 60)
+    url = url_info.source_file_url
+    result = FetchResult(url_info)
+    start = time.time()
+    request = urllib2.Request(url)
+    if conditional:
+        if url_info.etag:
+            request.add_header('If-None-Match', url_info.etag)
+        if url_info.last_modified:
+            request.add_header('If-Modified-Since', url_info.last_modified)
+    try:
+        source_file = urllib2.urlopen(request, timeout=timeout)
+        try:
+            info = source_file.info()
+            result.filename = _filename(url, info)
+            result.content = source_file.read()
+            result.etag = info.get('ETag', '')
+            result.last_modified = info.get('Last-Modified', '')
+        finally:
+            source_file.close()
+    except urllib2.HTTPError, e:
+        if conditional and e.code == 304:
+            result.status = 'not_modified'
+        else:
+            result.error = e
+    except Exception, e:
+        result.error = e
+
+    if result.content is not None:
+        result.digest = sha1(result.content).hexdigest()
+        if conditional and result.digest == url_info.content_digest:
+            result.status = 'unchanged'
+            result.content = None
+        else:
+            result.status = 'fetched'
+    result.elapsed = time.time() - start
+    if result.error is not None:
+        logger.error("Could not pull source file for resource %s (%s): %s" %
+            (url_info.resource.full_name, url, result.error))
+    else:
+        logger.debug("Fetched source file for resource %s in %.2f seconds: "
+            "%s" % (url_info.resource.full_name, result.elapsed, result.status))
+    return result
+
+
+def fetch_sources(url_infos, workers=4, conditional=True, timeout=None):
+    """Fetch the source files of many URLInfo objects concurrently.
+
+    At most ``workers`` files are fetched at the same time and the results
+    are returned in the order of the objects. Only a few results are kept
+    ahead of the caller, so that the content of all files is not held in
+    memory at once.
+
+    Args:
+        url_infos: An iterable of URLInfo objects, with their resources and
+            projects selected.
+        workers: The number of threads.
+        conditional: Whether to skip the files, which have not changed.
+        timeout: The timeout of each request in seconds.
+    Returns:
+        An iterator of FetchResult objects.
+    """
+    pool = ThreadPool(workers)
+    pending = deque()
+    try:
+        for url_info in url_infos:
+            pending.append(pool.apply_async(
+                fetch_source, (url_info, conditional, timeout)
+            ))
+            if len(pending) > 2 * workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+    finally:
+        pool.terminate()
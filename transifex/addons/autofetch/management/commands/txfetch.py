@@ -5,10 +5,13 @@ File containing the necessary mechanics for the txlanguages management command.
 from optparse import make_option, OptionParser
 import os.path
 import sys
+import time
 from django.core.management.base import (BaseCommand, LabelCommand, CommandError)
 from django.db.models import get_model
 from django.conf import settings
 
+from autofetch.fetcher import fetch_sources
+
 URLInfo = get_model("autofetch", "URLInfo")
 Resource = get_model("resources", "Resource")
 
@@ -19,12 +22,20 @@ class Command(LabelCommand):
     help = "Run this command to update resources which have provided a url"\
         " for their source\nfile. By default it updates all resources which"\
         " have auto_update set to True\nbut you can also specify the resources"\
-        " you want updated by providing the project\nand resource slug."
+        " you want updated by providing the project\nand resource slug."\
+        " The files are fetched concurrently and the ones which have not\n"\
+        "changed since they were last imported are skipped."
     args = "<project_slug1.resource_slug1 project_slug1.resource_slug2>"
     option_list = LabelCommand.option_list + (
         make_option('--skip', action='store_true',
             dest='skip', default=False,
             help='Import data from a file or from the default '),
+        make_option('--workers', '-w', type='int', dest='workers',
+            default=4, help='The number of files to fetch concurrently '
+            '(default 4).'),
+        make_option('--force', action='store_true', dest='force',
+            default=False, help='Import the files, even if they have not '
+            'changed.'),
     )
 
     can_import_settings = True
@@ -46,6 +57,8 @@ class Command(LabelCommand):
 
             resource_urlhandlers = URLInfo.objects.filter(resource__in=resources)
 
+        resource_urlhandlers = resource_urlhandlers.select_related(
+            'resource__project')
         num = resource_urlhandlers.count()
 
         if num == 0:
@@ -54,19 +67,49 @@ class Command(LabelCommand):
 
         sys.stdout.write("A total of %s resources are listed for updating.\n" % num)
 
-        for seq, handler in enumerate(resource_urlhandlers):
+        workers = max(options.get('workers') or 1, 1)
+        counts = {'fetched': 0, 'skipped': 0, 'failed': 0}
+        start = time.time()
+        results = fetch_sources(
+            resource_urlhandlers, workers=workers,
+            conditional=not options.get('force')
+        )
+        for seq, result in enumerate(results):
+            handler = result.url_info
             sys.stdout.write((u"Updating resource %s.%s (%s of %s)\n" %
                 ( handler.resource.project.slug, handler.resource.slug, seq+1,num)).encode('UTF-8'))
             try:
-                handler.update_source_file()
+                if result.error is not None:
+                    raise result.error
+                if not result.changed:
+                    handler.save_fetch_result(result)
+                    counts['skipped'] += 1
+                    sys.stdout.write((u"Source file for resource %s.%s has not "
+                        "changed (fetched in %.2fs)\n" % (handler.resource.project.slug,
+                        handler.resource.slug, result.elapsed)).encode('UTF-8'))
+                    continue
+                import_start = time.time()
+                handler.import_source_file(result)
             except Exception, e:
+                counts['failed'] += 1
                 sys.stderr.write((u"Error updating source file for resource %s.%s\n" %
                     ( handler.resource.project.slug, handler.resource.slug)).encode('UTF-8'))
                 sys.stderr.write("Exception was: %s\n" % e)
                 if skip:
                     continue
                 sys.stderr.write("Aborting...\n")
+                self._write_summary(counts, start)
                 sys.exit(1)
             else:
-               sys.stdout.write((u"Updated source file for resource %s.%s\n" %
-                    (handler.resource.project.slug, handler.resource.slug)).encode('UTF-8'))
+                counts['fetched'] += 1
+                sys.stdout.write((u"Updated source file for resource %s.%s "
+                    "(fetched in %.2fs, imported in %.2fs)\n" % (
+                    handler.resource.project.slug, handler.resource.slug,
+                    result.elapsed, time.time() - import_start)).encode('UTF-8'))
+        self._write_summary(counts, start)
+
+    def _write_summary(self, counts, start):
+        """Write the number of fetched, skipped and failed files."""
+        sys.stdout.write("Fetched %(fetched)s, skipped %(skipped)s and failed "
+            "%(failed)s source files" % counts)
+        sys.stdout.write(" in %.1f seconds.\n" % (time.time() - start))
@@ -6,9 +6,7 @@ from transifex.resources.models import Resource
 from transifex.txcommon.log import logger
 from transifex.resources.formats.registry import registry
 
-import os
-import urllib2, urlparse
-from uuid import uuid4
+from fetcher import fetch_source
 
 
 class URLInfo(models.Model):
@@ -23,6 +21,17 @@ class URLInfo(models.Model):
         " file should be automatically updated by pulling and merging from"\
         " the given URL."))
 
+    # The validators and the digest of the last imported file
+    etag = models.CharField(_("ETag"), max_length=255, blank=True,
+        default='', editable=False, help_text=_("The ETag of the last"
+        " fetched source file."))
+    last_modified = models.CharField(_("Last modified"), max_length=64,
+        blank=True, default='', editable=False, help_text=_("The"
+        " Last-Modified date of the last fetched source file."))
+    content_digest = models.CharField(_("Content digest"), max_length=40,
+        blank=True, default='', editable=False, help_text=_("The SHA-1 digest"
+        " of the last imported source file."))
+
     # Foreign keys
     resource = models.OneToOneField(Resource, verbose_name=_('Resource'),
         blank=False, null=False, related_name='url_info', unique=True,
@@ -35,33 +44,48 @@ class URLInfo(models.Model):
     def __unicode__(self):
         return "%s.%s" % (self.resource.project.slug, self.resource.slug)
 
-    def update_source_file(self, fake=False):
+    def __init__(self, *args, **kwargs):
+        super(URLInfo, self).__init__(*args, **kwargs)
+        self._source_file_url = self.source_file_url
+
+    def save(self, *args, **kwargs):
+        """Forget the fetched file, if the URL has changed."""
+        if self.source_file_url != self._source_file_url:
+            self.etag = self.last_modified = self.content_digest = ''
+            self._source_file_url = self.source_file_url
+        super(URLInfo, self).save(*args, **kwargs)
+
+    def update_source_file(self, fake=False, conditional=False):
         """
         Fetch source file from remote url and import it, updating existing
         entries.
+
+        Args:
+            fake: Whether to only check that the file can be parsed.
+            conditional: Whether to skip the file, if it has not changed
+                since it was last imported.
+        Returns:
+            The number of strings added and updated, or None, if the file
+            was skipped.
         """
-        try:
-            source_file = urllib2.urlopen(self.source_file_url)
-        except:
-            logger.error("Could not pull source file for resource %s (%s)" %
-                (self.resource.full_name, self.source_file_url))
-            raise
+        result = fetch_source(self, conditional=conditional and not fake)
+        if result.error is not None:
+            raise result.error
+        if not result.changed:
+            self.save_fetch_result(result)
+            return None
+        return self.import_source_file(result, fake=fake)
 
-        filename = ''
-        if source_file.info().has_key('Content-Disposition'):
-                # If the response has Content-Disposition, we try to take
-                # filename from it
-                content = source_file.info()['Content-Disposition']
-                if 'filename' in content:
-                    filename = content.split('filename')[1]
-                    filename = filename.replace('"', '').replace("'", ""
-                        ).replace("=", "").replace('/', '-').strip()
-
-        if filename == '':
-            parts = urlparse.urlsplit(self.source_file_url)
-            #FIXME: This still might end empty
-            filename = parts.path.split('/')[-1]
+    def import_source_file(self, result, fake=False):
+        """
+        Import a fetched source file, updating existing entries.
 
+        Args:
+            result: The FetchResult with the content of the file.
+            fake: Whether to only check that the file can be parsed.
+        Returns:
+            The number of strings added and updated.
+        """
         try:
             if not self.resource.i18n_method:
                 msg = "No i18n method defined for resource %s"
@@ -69,11 +93,10 @@ class URLInfo(models.Model):
                 return
             parser = registry.appropriate_handler(
                 self.resource, language=self.resource.source_language,
-                filename=filename
+                filename=result.filename
             )
             language = self.resource.source_language
-            content = source_file.read()
-            parser.bind_content(content)
+            parser.bind_content(result.content)
             parser.set_language(language)
             parser.bind_resource(self.resource)
             parser.is_content_valid()
@@ -81,13 +104,28 @@ class URLInfo(models.Model):
             strings_added, strings_updated = 0, 0
             if not fake:
                 strings_added, strings_updated = parser.save2db(is_source=True)
+                self.save_fetch_result(result)
         except Exception,e:
             logger.error("Error importing source file for resource %s.%s (%s): %s" %
                 ( self.resource.project.slug, self.resource.slug,
                     self.source_file_url, str(e)))
             raise
         finally:
-            source_file.close()
+            result.content = None
             gc.collect()
 
         return strings_added, strings_updated
+
+    def save_fetch_result(self, result):
+        """Store the validators and the digest of a fetched file, so that
+        the next fetch can be skipped, if the file has not changed.
+        """
+        if result.status == 'not_modified' or not self.pk:
+            return
+        self.etag = result.etag[:255]
+        self.last_modified = result.last_modified[:64]
+        self.content_digest = result.digest
+        URLInfo.objects.filter(pk=self.pk).update(
+            etag=self.etag, last_modified=self.last_modified,
+            content_digest=self.content_digest
+        )
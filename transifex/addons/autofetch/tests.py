@@ -1,4 +1,6 @@
 import os
+import threading
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
 from django.core.urlresolvers import reverse
 from django.conf import settings
 from django.test.client import Client
@@ -6,6 +8,7 @@ from transifex.projects.models import Project
 from transifex.resources.models import Resource
 from transifex.txcommon.tests.base import BaseTestCase
 from transifex.addons.autofetch.models import URLInfo
+from transifex.addons.autofetch.fetcher import fetch_source, fetch_sources
 
 class TestFetchUrl(BaseTestCase):
 
@@ -57,3 +60,95 @@ class TestFetchUrl(BaseTestCase):
             '"status": 500, "message": "Error updating source file."',
             status_code=200
         )
+
+    def test_conditional_update(self):
+        """Test that an unchanged source file is not imported again."""
+        source_url = os.path.join(
+            settings.TX_ROOT, 'resources/tests/lib/pofile/tests.pot'
+        )
+        url_info = URLInfo.objects.create(
+            source_file_url='file://' + source_url,
+            auto_update=True, resource = self.resource
+        )
+        self.assertNotEqual(url_info.update_source_file(conditional=True), None)
+        url_info = URLInfo.objects.get(pk=url_info.pk)
+        self.assertEqual(len(url_info.content_digest), 40)
+        self.assertEqual(url_info.update_source_file(conditional=True), None)
+        self.assertNotEqual(url_info.update_source_file(), None)
+
+        url_info.source_file_url = 'file://' + source_url + '?changed'
+        url_info.save()
+        self.assertEqual(url_info.content_digest, '')
+
+
+class TestFetcher(BaseTestCase):
+    """Test the fetching of source files against a local HTTP server."""
+
+    def setUp(self):
+        super(TestFetcher, self).setUp()
+        self.server = HTTPServer(('127.0.0.1', 0), _SourceFileHandler)
+        self.server.requests = []
+        self.url = 'http://127.0.0.1:%s/' % self.server.server_port
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        super(TestFetcher, self).tearDown()
+
+    def test_not_modified(self):
+        """Test that the validators of the last fetch are sent."""
+        url_info = URLInfo(
+            source_file_url=self.url + 'source.pot', resource=self.resource
+        )
+        result = fetch_source(url_info)
+        self.assertEqual(result.status, 'fetched')
+        self.assertEqual(result.filename, 'source.pot')
+        self.assertEqual(result.etag, '"v1"')
+        url_info.etag = result.etag
+        result = fetch_source(url_info)
+        self.assertEqual(result.status, 'not_modified')
+        self.assertEqual(self.server.requests, [None, '"v1"'])
+        result = fetch_source(url_info, conditional=False)
+        self.assertEqual(result.status, 'fetched')
+
+    def test_fetch_sources(self):
+        """Test that the results are in order and errors are reported."""
+        url_infos = [
+            URLInfo(source_file_url=self.url + path, resource=self.resource)
+            for path in ('a.pot', 'missing.pot', 'b.pot') * 3
+        ]
+        results = list(fetch_sources(url_infos, workers=2))
+        self.assertEqual(
+            [r.url_info for r in results], url_infos
+        )
+        self.assertEqual(
+            [r.status for r in results], ['fetched', 'failed', 'fetched'] * 3
+        )
+        self.assertEqual(results[1].error.code, 404)
+
+
+class _SourceFileHandler(BaseHTTPRequestHandler):
+    """Serve a source file with an ETag and record the If-None-Match
+    headers of the requests.
+    """
+
+    def do_GET(self):
+        etag = self.headers.getheader('If-None-Match')
+        self.server.requests.append(etag)
+        if self.path.startswith('/missing'):
+            self.send_response(404)
+        elif etag == '"v1"':
+            self.send_response(304)
+        else:
+            self.send_response(200)
+            self.send_header('ETag', '"v1"')
+            self.end_headers()
+            self.wfile.write('msgid ""\nmsgstr ""\n')
+            return
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import datetime
+import time
+from optparse import make_option
+from django.core.management.base import BaseCommand
+from datastores.txredis import get_serializer
+
+_HELP_TEXT = """Compare the serializers of the redis datastore.
+
+Each serializer dumps and loads a number of action log history entries,
+like the ones stored in redis, and the throughput and the payload size of
+each one are reported. Redis itself is not used.
+
+Example::
+    python manage.py txredisbench --entries 20000"""
+
+SERIALIZERS = (
+    'datastores.txredis.PickleSerializer',
+    'datastores.txredis.JSONSerializer',
+)
+
+
+class Command(BaseCommand):
+    help = (_HELP_TEXT)
+
+    option_list = BaseCommand.option_list + (
+        make_option('--entries', '-e', default=10000, dest='entries',
+            type='int', help='The number of entries to serialize.'),
+    )
+
+    requires_model_validation = False
+
+    def _entries(self, number):
+        """Return a list of history entries."""
+        now = datetime.datetime.now()
+        return [{
+            'action_time': now - datetime.timedelta(minutes=i),
+            'message': u'<a href="/accounts/profile/user%d/">user%d</a> '
+                u'submitted a translation to <a href="/projects/p/'
+                u'project%d/resource/resource/">resource</a>.' % (i, i, i),
+            'action_type': u'project_resource_translated',
+            'user': u'user%d' % i,
+        } for i in xrange(number)]
+
+    def handle(self, *args, **options):
+        entries = self._entries(options['entries'])
+        self.stdout.write("%-40s %12s %12s %10s\n" % (
+            'Serializer', 'dumps/s', 'loads/s', 'bytes'
+        ))
+        for path in SERIALIZERS:
+            serializer = get_serializer(path)
+            start = time.time()
+            payloads = [serializer.dumps(entry) for entry in entries]
+            dumps_time = time.time() - start
+            start = time.time()
+            for payload in payloads:
+                serializer.loads(payload)
+            loads_time = time.time() - start
+            size = sum(len(payload) for payload in payloads)
+            self.stdout.write("%-40s %12.0f %12.0f %10.1f\n" % (
+                path, len(entries) / max(dumps_time, 1e-6),
+                len(entries) / max(loads_time, 1e-6),
+                float(size) / max(len(entries), 1)
+            ))
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 
+import datetime
 from django.test import TestCase
 from datastores import TxRedisMapper
+from datastores.txredis import PickleSerializer, JSONSerializer
 from transifex.txcommon.log import logger
 
 
@@ -21,3 +23,24 @@ class TestRedis(TestCase):
         self.assertEquals(res, 1)
         res = self.r.lpop(key)
         self.assertEquals(res, data)
+
+
+class TestSerializers(TestCase):
+
+    def test_json_serializer(self):
+        """Test that the JSON serializer keeps the types of the history
+        entries and loads values stored with pickle.
+        """
+        data = {
+            'action_time': datetime.datetime(2012, 3, 4, 5, 6, 7, 8),
+            'message': u'Translated αβγ',
+            'day': datetime.date(2012, 3, 4),
+            'user': u'user',
+        }
+        serializer = JSONSerializer()
+        payload = serializer.dumps(data)
+        self.assertEquals(serializer.loads(payload), data)
+        self.assertTrue(len(payload) < len(PickleSerializer().dumps(data)))
+        self.assertEquals(
+            serializer.loads(PickleSerializer().dumps(data)), data
+        )
@@ -4,10 +4,16 @@
 Redis backend.
 """
 
+import datetime
 import cPickle as pickle
 import functools
-from redis import StrictRedis, ConnectionError
+from contextlib import contextmanager
+from redis import StrictRedis, ConnectionPool, ConnectionError
 from django.conf import settings
+from django.db.models import Model
+from django.utils import simplejson as json
+from django.utils.encoding import force_unicode
+from django.utils.importlib import import_module
 from transifex.txcommon.log import logger
 
 
@@ -23,8 +29,104 @@ def redis_exception_handler(func):
     return wrapper
 
 
+class PickleSerializer(object):
+    """Serialize values with pickle.
+
+    It supports any python object. The binary protocol is used, which is
+    faster and more compact than the default text one; values stored with
+    the text protocol are still loaded.
+    """
+
+    def dumps(self, value):
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data):
+        return pickle.loads(data)
+
+
+class JSONSerializer(object):
+    """Serialize values with compact JSON.
+
+    Dates and datetimes are tagged, so that they are loaded back as such.
+    Model instances are stored as their unicode representation, which is
+    what the templates show for the action types of the history entries.
+
+    Payloads stored by the PickleSerializer can still be loaded, so that
+    switching serializers does not need redis to be flushed.
+    """
+
+    def _default(self, value):
+        """Encode the values JSON does not support."""
+        if isinstance(value, datetime.datetime):
+            return {'$dt': [
+                value.year, value.month, value.day, value.hour,
+                value.minute, value.second, value.microsecond
+            ]}
+        elif isinstance(value, datetime.date):
+            return {'$d': [value.year, value.month, value.day]}
+        elif isinstance(value, Model):
+            return force_unicode(value)
+        raise TypeError("%r is not JSON serializable" % value)
+
+    def _object_hook(self, obj):
+        """Decode the tagged values."""
+        if len(obj) == 1:
+            if '$dt' in obj:
+                return datetime.datetime(*obj['$dt'])
+            elif '$d' in obj:
+                return datetime.date(*obj['$d'])
+        return obj
+
+    def dumps(self, value):
+        return json.dumps(value, default=self._default, separators=(',', ':'))
+
+    def loads(self, data):
+        try:
+            return json.loads(data, object_hook=self._object_hook)
+        except ValueError:
+            # Pickles always end with a STOP opcode, which is invalid JSON.
+            return pickle.loads(data)
+
+
+_serializers = {}
+
+
+def get_serializer(path=None):
+    """Return the serializer with the dotted path.
+
+    Defaults to the REDIS_SERIALIZER setting.
+    """
+    if path is None:
+        path = getattr(
+            settings, 'REDIS_SERIALIZER', 'datastores.txredis.PickleSerializer'
+        )
+    if path not in _serializers:
+        module, name = path.rsplit('.', 1)
+        _serializers[path] = getattr(import_module(module), name)()
+    return _serializers[path]
+
+
+# The connection pools of the process, one for each (host, port, db)
+_pools = {}
+
+
+def _connection_pool(host, port, db):
+    """Return the connection pool for the redis database."""
+    key = (host, port, db)
+    pool = _pools.get(key)
+    if pool is None:
+        pool = _pools.setdefault(
+            key, ConnectionPool(host=host, port=port, db=db)
+        )
+    return pool
+
+
 class TxRedis(object):
-    """Wrapper class around redis for Transifex."""
+    """Wrapper class around redis for Transifex.
+
+    The connections are shared through a connection pool per process, so
+    creating instances is cheap.
+    """
 
     def __init__(self, host=None, port=None, db=None):
         if host is None:
@@ -33,12 +135,38 @@ class TxRedis(object):
             port = settings.REDIS_PORT
         if db is None:
             db = settings.REDIS_DATABASE
-        self._r = StrictRedis(host=host, port=port, db=db)
+        self._r = StrictRedis(connection_pool=_connection_pool(host, port, db))
 
     def __getattr__(self, name):
         """Forward all method calls to redis."""
         return getattr(self._r, name)
 
+    def pipeline(self, transaction=True):
+        """Return a pipeline, which wraps the commands the same way.
+
+        The commands are buffered and sent to redis in one round-trip,
+        when ``execute`` is called.
+        """
+        pipe = self.__class__.__new__(self.__class__)
+        pipe.__dict__.update(self.__dict__)
+        pipe._r = self._r.pipeline(transaction=transaction)
+        return pipe
+
+    @contextmanager
+    def batch(self):
+        """Buffer the commands issued in the block and send them to redis
+        in one round-trip at the end of it.
+
+        Usage::
+
+            with TxRedisMapper().batch() as r:
+                r.lpush(key, data=data)
+                r.ltrim(key, 0, 4)
+        """
+        pipe = self.pipeline(transaction=False)
+        yield pipe
+        pipe.execute()
+
 
 class TxRedisMapper(TxRedis):
     """A redis wrapper which provides support for objects, too."""
@@ -46,18 +174,24 @@ class TxRedisMapper(TxRedis):
     set_methods = ['set', 'lpush', 'rpush', ]
     get_methods = ['get', 'lrange', 'lpop',]
 
+    def __init__(self, host=None, port=None, db=None, serializer=None):
+        super(TxRedisMapper, self).__init__(host=host, port=port, db=db)
+        self._serializer = get_serializer(serializer)
+
     def __getattr__(self, name):
         """Send all method calls to redis, while serializing arguments and
         results.
 
-        Using pickle for (de)serialization. For argument serialization,
-        he must provide the data in a dictionary named `data`.
+        The serializer is set by the REDIS_SERIALIZER setting. For argument
+        serialization, he must provide the data in a dictionary named
+        `data`.
         """
         attr = getattr(self._r, name)
+        serializer = self._serializer
         if name in self.set_methods:
             def new_attr(*args, **kwargs):
                 if kwargs:      # argument serialization
-                    data = pickle.dumps(kwargs.pop('data'))
+                    data = serializer.dumps(kwargs.pop('data'))
                     args = list(args)
                     # value data almost always goes to the end
                     # override the other methods manually
@@ -68,11 +202,11 @@ class TxRedisMapper(TxRedis):
             def new_attr(*args, **kwargs):
                 res = attr(*args, **kwargs)
                 if isinstance(res, basestring):
-                    return pickle.loads(res)
+                    return serializer.loads(res)
                 elif isinstance(res, list):
                     new_res = []
                     for r in res:
-                        new_res.append(pickle.loads(r))
+                        new_res.append(serializer.loads(r))
                     return new_res
                 else:
                     return res
@@ -8,7 +8,7 @@ from django.contrib.sites.models import Site
 from django.contrib import messages
 from notification  import models as notification
 from transifex.resources.models import Resource
-from transifex.resources.utils import invalidate_template_cache
+from transifex.txcommon.cache import bump_generation
 from transifex.teams.models import Team
 from transifex.txcommon.log import logger
 from txcron.signals import cron_daily, cron_hourly
@@ -116,20 +116,8 @@ def invalidate_cache(sender, instance, created=True, **kwargs):
     if created:
         logger.debug("lock-addon: Invalidating cache: %s" % instance)
 
-        invalidate_template_cache('resource_details_lang',
-            instance.rlstats.resource.project.slug,
-            instance.rlstats.resource.slug,
-            instance.rlstats.language.code)
-
-        invalidate_template_cache('resource_details',
-            instance.rlstats.resource.project.slug,
-            instance.rlstats.resource.slug)
-
-        invalidate_template_cache("team_details",
-            instance.rlstats.resource.project.slug,
-            instance.rlstats.language.code,
-            instance.rlstats.resource.id
-        )
+        bump_generation("resource_language",
+            instance.rlstats.resource_id, instance.rlstats.language.code)
 
 def connect():
     pre_submit_translation.connect(pre_handler, sender=Resource)
@@ -327,6 +327,30 @@ class LotteViewsTests(BaseTestCase):
             source_entity=self.source_entity4,
             language=self.language_ar).count(), 1)
 
+    def test_push_many_translations(self):
+        """Test that the rows of a push are saved independently."""
+        data = {"strings":[{"id":self.source_string3.id,
+                            "translations":{
+                               "other":"String4",}
+                            },
+                           {"id":self.source_string4.id,
+                            "translations":{
+                               "other":"String with arguments: %s %f",}
+                            },]
+               }
+        resp = self.client['maintainer'].post(self.push_translation,
+            json.dumps(data), content_type='application/json')
+        self.assertEqual(resp.status_code, 200)
+        statuses = json.loads(resp.content)
+        self.assertEqual(statuses[str(self.source_string3.id)]['status'], 200)
+        self.assertEqual(statuses[str(self.source_string4.id)]['status'], 400)
+        self.assertEqual(Translation.objects.filter(
+            source_entity=self.source_entity3,
+            language=self.language_ar).count(), 1)
+        self.assertEqual(Translation.objects.filter(
+            source_entity=self.source_entity4,
+            language=self.language_ar).count(), 0)
+
     def test_dt_search_string(self):
         """Test the Datatable's search."""
         self.DataTable_params["sSearch"] = "ArabicTrans"
@@ -345,6 +369,30 @@ class LotteViewsTests(BaseTestCase):
             self.translate_content_arabic_url, self.DataTable_params)
         self.assertContains(resp, 'ArabicTrans', status_code=200)
 
+    def test_dt_keyset_pagination(self):
+        """Test that the pages fetched with the next page token are the
+        same as the ones fetched with an offset."""
+        self.DataTable_params["iDisplayLength"] = 2
+        resp = self.client['maintainer'].post(
+            self.translate_content_arabic_url, self.DataTable_params)
+        first_page = json.loads(resp.content)
+        self.assertTrue('sNextPage' in first_page)
+        self.DataTable_params["iDisplayStart"] = 2
+        resp = self.client['maintainer'].post(
+            self.translate_content_arabic_url, self.DataTable_params)
+        offset_page = json.loads(resp.content)
+        self.DataTable_params["sNextPage"] = first_page['sNextPage']
+        resp = self.client['maintainer'].post(
+            self.translate_content_arabic_url, self.DataTable_params)
+        keyset_page = json.loads(resp.content)
+        self.assertEqual(keyset_page['aaData'], offset_page['aaData'])
+        self.assertNotEqual(keyset_page['aaData'], first_page['aaData'])
+        # A token for another listing is ignored.
+        self.DataTable_params["sSearch"] = "String"
+        resp = self.client['maintainer'].post(
+            self.translate_content_arabic_url, self.DataTable_params)
+        self.assertEqual(resp.status_code, 200)
+
     def test_dt_show_num_entries(self):
         """Test the Datatable's show num entries mechanism."""
         self.DataTable_params["iDisplayLength"] = 20
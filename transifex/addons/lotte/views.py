@@ -16,11 +16,12 @@ from django.template import RequestContext
 from django.utils import simplejson
 from django.utils.translation import ugettext as _
 from django.utils.html import escape
+from django.utils.hashcompat import md5_constructor
 from django.views.generic import list_detail
 from django.db import transaction
 from authority.views import permission_denied
 
-from actionlog.models import action_logging
+from actionlog.models import ActionLogWriter
 from transifex.txcommon.log import logger
 from transifex.languages.models import Language
 from transifex.projects.models import Project
@@ -29,8 +30,8 @@ from transifex.projects.permissions.project import ProjectPermission
 from transifex.resources.models import Translation, Resource, SourceEntity, \
     ReviewHistory, get_source_language
 from transifex.resources.handlers import invalidate_stats_cache
-from transifex.resources.formats.validators import create_error_validators, \
-        create_warning_validators, ValidationError
+from transifex.resources.cache import bump_content_version
+from transifex.resources.formats.validators import ValidationEngine
 from transifex.teams.models import Team
 from transifex.txcommon.decorators import one_perm_required_or_403
 from transifex.txcommon.utils import normalize_query
@@ -224,6 +225,7 @@ def exit(request, project_slug, lang_code, resource_slug=None, *args, **kwargs):
     if data.get('updated'):
         modified = True
         # ActionLog & Notification
+        writer = ActionLogWriter()
         for resource in resources:
             nt = 'project_resource_translated'
             context = {'project': project,
@@ -233,7 +235,8 @@ def exit(request, project_slug, lang_code, resource_slug=None, *args, **kwargs):
             object_list = [project, resource, language]
             if team:
                 object_list.append(team)
-            action_logging(request.user, object_list, nt, context=context)
+            writer.add(request.user, object_list, nt, context=context)
+        writer.flush()
     else:
         modified = False
 
@@ -351,8 +354,10 @@ def _get_stringset(post_data, resources, language, review=False, session='', *ar
         resource__in=resources,
         language=language)
 
+    more_languages = []
+    # The default ordering of the model is not unique
+    ordering = (None, False)
     if not isinstance(source_strings, list):
-        more_languages = []
         if post_data and post_data.has_key('more_languages'):
             # rsplit is used to remove the trailing ','
             more_languages = post_data.get('more_languages').rstrip(',').split(',')
@@ -380,8 +385,10 @@ def _get_stringset(post_data, resources, language, review=False, session='', *ar
                 if post_data.has_key('sSortDir_'+str(i)) and \
                     post_data['sSortDir_'+str(i)] == 'asc':
                     source_strings=source_strings.order_by(SORTING_DICT[col])
+                    ordering = (SORTING_DICT[col], False)
                 else:
                     source_strings=source_strings.order_by(SORTING_DICT[col]).reverse()
+                    ordering = (SORTING_DICT[col], True)
 
         # for statistics
         total = source_strings.count()
@@ -395,9 +402,35 @@ def _get_stringset(post_data, resources, language, review=False, session='', *ar
     except ValueError, e:
         return HttpResponseBadRequest()
 
-    # NOTE: It's important to keep the translation string matching inside this
-    # iteration to prevent extra un-needed queries. In this iteration only the
-    # strings displayed are calculated, saving a lot of resources.
+    # Fetch the page with keyset pagination, if the client sent the token
+    # of the previous page and the strings are ordered by id. Otherwise,
+    # use an offset.
+    signature = _keyset_signature(post_data)
+    after_id = _keyset_after_id(post_data, dstart, signature)
+    if isinstance(source_strings, list):
+        page = []
+    else:
+        source_strings = source_strings.select_related('source_entity')
+        if after_id is not None and ordering[0] == 'id':
+            if ordering[1]:
+                source_strings = source_strings.filter(id__lt=after_id)
+            else:
+                source_strings = source_strings.filter(id__gt=after_id)
+            page = list(source_strings[:dlength])
+        else:
+            page = list(source_strings[dstart:dstart+dlength])
+
+    # NOTE: Everything needed for the displayed strings is fetched for the
+    # whole page at once, with one query for each kind of data.
+    source_entity_ids = [s.source_entity_id for s in page]
+    page_source_strings = _get_source_strings(
+        page, source_language, more_languages
+    )
+    page_strings, reviewed = _get_strings(
+        source_entity_ids, language, page
+    )
+    suggestion_counts = _get_suggestion_counts(source_entity_ids, language)
+
     response_dict = {
         'sEcho': post_data.get('sEcho','1'),
         'iTotalRecords': total,
@@ -410,13 +443,13 @@ def _get_stringset(post_data, resources, language, review=False, session='', *ar
                 s.source_entity.string,
                 # 3. Get all the necessary source strings, including plurals and
                 # similar langs, all in a dictionary (see also below)
-                _get_source_strings(s, source_language, language.code, more_languages),
+                page_source_strings[s.source_entity_id],
                 # 4. Get all the Translation strings mapped with plural rules
                 # in a single dictionary (see docstring of function)
-                _get_strings(translated_strings, language, s.source_entity),
+                page_strings[s.source_entity_id],
                 # 5. A number which indicates the number of Suggestion objects
                 # attached to this row of the table.
-                Suggestion.objects.filter(source_entity=s.source_entity, language__code=language.code).count(),
+                suggestion_counts.get(s.source_entity_id, 0),
                 # 6. save buttons and hidden context (ready to inject snippet)
                 # It includes the following content, wrapped in span tags:
                 # * SourceEntity object's "context" value
@@ -426,19 +459,19 @@ def _get_stringset(post_data, resources, language, review=False, session='', *ar
                  '<span class="undo edit-panel inactive" id="undo_' + str(counter) + '" style="border:0" title="' + _("Undo to initial text") + '"></span>'
                  '<span class="context" id="context_' + str(counter) + '" style="display:none;">' + escape(str(s.source_entity.context_string.encode('UTF-8'))) + '</span>'
                  '<span class="source_id" id="sourceid_' + str(counter) + '"style="display:none;">' + str(s.source_entity.id) + '</span>'),
-            ] for counter,s in enumerate(source_strings[dstart:dstart+dlength])
+            ] for counter,s in enumerate(page)
         ],
     }
+    if page:
+        response_dict['sNextPage'] = '%s:%s:%s' % (
+            dstart + len(page), page[-1].id, signature
+        )
 
     if review:
-        for counter, s in enumerate(source_strings[dstart:dstart+dlength]):
-            try:
-                translation = Translation.objects.get(
-                    source_entity__id=s.source_entity.id,
-                    language__code=language.code, rule=5
-                )
-                review_snippet = '<span><input class="review-check" title="' + _("Reviewed string") + '" id="review_source_' + str(s.source_entity.id) + '" type="checkbox" name="review" ' + ('checked="checked"' if translation.reviewed else '') + ' value="Review"/></span>',
-            except Translation.DoesNotExist:
+        for counter, s in enumerate(page):
+            if s.source_entity_id in reviewed:
+                review_snippet = '<span><input class="review-check" title="' + _("Reviewed string") + '" id="review_source_' + str(s.source_entity.id) + '" type="checkbox" name="review" ' + ('checked="checked"' if reviewed[s.source_entity_id] else '') + ' value="Review"/></span>',
+            else:
                 review_snippet = '<span><input class="review-check" title="' + _("Reviewed string") + '" id="review_source_' + str(s.source_entity.id) + '" type="checkbox" name="review" disabled="disabled" value="Review"/></span>',
 
             response_dict['aaData'][counter].append(review_snippet)
@@ -669,69 +702,152 @@ def _get_user_filtered_source_strings(resources, users, language, *args, **kwarg
     return Translation.objects.user_translated_strings(resources, language, users)
 
 
-def _get_source_strings(source_string, source_language, lang_code, more_languages):
+def _keyset_signature(post_data):
+    """Return a signature of the request parameters, which select and order
+    the source strings.
+
+    A keyset pagination token is valid only for requests with the same
+    signature.
+    """
+    params = [
+        (key, post_data.get(key, '')) for key in (
+            'filters', 'user_filters', 'resource_filters', 'sSearch',
+            'iSortingCols', 'iDisplayLength',
+        )
+    ]
+    params.extend(sorted(
+        (key, value) for key, value in post_data.items()
+        if key.startswith('iSortCol_') or key.startswith('sSortDir_')
+    ))
+    return md5_constructor(simplejson.dumps(params)).hexdigest()
+
+
+def _keyset_after_id(post_data, dstart, signature):
+    """Return the id of the last string before the requested page.
+
+    The id is known only if the request has the ``sNextPage`` token returned
+    for the previous page of the same listing.
     """
-    Get all the necessary source strings, including plurals and similar langs.
+    try:
+        start, last_id, token_signature = post_data.get(
+            'sNextPage', ''
+        ).split(':')
+        if int(start) == dstart and token_signature == signature:
+            return int(last_id)
+    except ValueError, e:
+        pass
+    return None
+
 
-    Returns a dictionary with the keys:
+def _get_source_strings(page, source_language, more_languages):
+    """
+    Get all the necessary source strings, including plurals and similar langs,
+    for the source strings of a page.
+
+    Returns a dictionary from source entity ids to dictionaries with the keys:
     'source_strings' : {"one":<string>, "two":<string>, ... , "other":<string>}
     'similar_lang_strings' :
         {"lang1": {"one":<string>, ... , "other":<string>},
          "lang2": {"one":<string>, "two":<string>, ... , "other":<string>}}
     """
-    source_entity = source_string.source_entity
-    # This is the rule 5 ('other')
-    source_strings = { "other":source_string.string }
-    # List that will contain all the similar translations
-    similar_lang_strings = {}
-
-    if source_entity.pluralized:
-        # These are the remaining plural forms of the source string.
+    result = {}
+    for s in page:
+        result[s.source_entity_id] = {
+            # This is the rule 5 ('other')
+            'source_strings': {"other": s.string},
+            # All the similar translations
+            'similar_lang_strings': {},
+        }
+    if not page:
+        return result
+
+    # These are the remaining plural forms of the source strings.
+    pluralized_ids = [
+        s.source_entity_id for s in page if s.source_entity.pluralized
+    ]
+    if pluralized_ids:
         plural_strings = Translation.objects.filter(
-            source_entity = source_entity,
-            language = source_language).exclude(rule=5).order_by('rule')
-        for pl_string in plural_strings:
-            plural_name = source_language.get_rule_name_from_num(pl_string.rule)
-            source_strings[plural_name] = pl_string.string
-
-    # for each similar language fetch all the translation strings
-    for lang_id in more_languages:
-        l = Language.objects.get(pk=lang_id)
-        similar_lang_strings[l.name] = {}
-        for t in Translation.objects.filter(source_entity=source_entity, language=l).order_by('rule'):
-            plural_name = source_language.get_rule_name_from_num(t.rule)
-            similar_lang_strings[l.name][plural_name] = t.string
-    return { 'source_strings' : source_strings,
-             'similar_lang_strings' : similar_lang_strings }
-
-
-def _get_strings(query, target_language, source_entity):
+            source_entity__in=pluralized_ids, language=source_language
+        ).exclude(rule=5).order_by('rule').values_list(
+            'source_entity_id', 'rule', 'string'
+        )
+        for se_id, rule, string in plural_strings:
+            plural_name = source_language.get_rule_name_from_num(rule)
+            result[se_id]['source_strings'][plural_name] = string
+
+    # Fetch the translation strings of all similar languages
+    if more_languages:
+        languages = dict(
+            Language.objects.filter(pk__in=more_languages).values_list(
+                'id', 'name'
+            )
+        )
+        for se_id in result:
+            for name in languages.itervalues():
+                result[se_id]['similar_lang_strings'][name] = {}
+        similar_strings = Translation.objects.filter(
+            source_entity__in=result.keys(), language__in=languages.keys()
+        ).order_by('rule').values_list(
+            'source_entity_id', 'language_id', 'rule', 'string'
+        )
+        for se_id, lang_id, rule, string in similar_strings:
+            plural_name = source_language.get_rule_name_from_num(rule)
+            result[se_id]['similar_lang_strings'][languages[lang_id]][
+                plural_name] = string
+    return result
+
+
+def _get_strings(source_entity_ids, target_language, page):
     """
-    Helper function for returning all the Translation strings or an empty dict.
+    Helper function for returning all the Translation strings of the source
+    strings of a page.
 
-    Used in the list concatenation above to preserve code sanity.
-    Returns a dictionary in the following form:
+    Returns a tuple with a dictionary from source entity ids to dictionaries
+    in the following form:
     {"zero":<string>, "one":<string>, ... , "other":<string>},
     where the 'zero', 'one', ... are the plural names of the corresponding
-    plural forms.
+    plural forms, and a dictionary from source entity ids to the reviewed
+    flag of their translations, for those that are translated.
     """
     # It includes the plural translations, too!
     translation_strings = {}
-    if source_entity.pluralized:
-        translations = query.filter(source_entity=source_entity).order_by('rule')
-        # Fill with empty strings to have the Untranslated entries!
-        for rule in target_language.get_pluralrules():
-            translation_strings[rule] = ""
-        for translation in translations:
-            plural_name = target_language.get_rule_name_from_num(translation.rule)
-            translation_strings[plural_name] = translation.string
-    else:
-        try:
-            translation_strings["other"] = query.get(source_entity=source_entity,
-                                                     rule=5).string
-        except Translation.DoesNotExist:
-            translation_strings["other"] = ""
-    return translation_strings
+    reviewed = {}
+    for s in page:
+        if s.source_entity.pluralized:
+            # Fill with empty strings to have the Untranslated entries!
+            translation_strings[s.source_entity_id] = dict(
+                (rule, "") for rule in target_language.get_pluralrules()
+            )
+        else:
+            translation_strings[s.source_entity_id] = {"other": ""}
+    if not source_entity_ids:
+        return translation_strings, reviewed
+
+    translations = Translation.objects.filter(
+        source_entity__in=source_entity_ids, language=target_language
+    ).order_by('rule').values_list(
+        'source_entity_id', 'rule', 'string', 'reviewed'
+    )
+    pluralized = set(s.source_entity_id for s in page
+            if s.source_entity.pluralized)
+    for se_id, rule, string, is_reviewed in translations:
+        if rule == 5:
+            reviewed[se_id] = is_reviewed
+        if se_id in pluralized:
+            plural_name = target_language.get_rule_name_from_num(rule)
+            translation_strings[se_id][plural_name] = string
+        elif rule == 5:
+            translation_strings[se_id]["other"] = string
+    return translation_strings, reviewed
+
+
+def _get_suggestion_counts(source_entity_ids, language):
+    """Return the number of suggestions for each of the source entities."""
+    if not source_entity_ids:
+        return {}
+    return dict(Suggestion.objects.filter(
+        source_entity__in=source_entity_ids, language=language
+    ).values_list('source_entity').annotate(Count('id')).order_by())
 
 
 # Restrict access only to : (The checks are done in the view's body)
@@ -783,14 +899,26 @@ def push_translation(request, project_slug, lang_code, *args, **kwargs):
     # translations-> translation strings (includes all plurals)
     # context-> source_entity context
     # occurrence-> occurrence (not yet well supported)
+    # Fetch the source strings of all rows at once.
+    source_strings = {}
+    source_ids = [int(row['id']) for row in strings]
+    if source_ids:
+        source_strings = dict(
+            (t.pk, t) for t in Translation.objects.select_related(
+                'source_entity', 'resource', 'resource__project',
+                'resource__source_language'
+            ).filter(id__in=source_ids)
+        )
+
+    # The translations of each source string, which are to be saved. If a
+    # source string is sent twice, the later translations override the
+    # earlier ones.
+    rows = {}
     # Iterate through all the row data that have been sent.
     for row in strings:
         source_id = int(row['id'])
-        try:
-            source_string = Translation.objects.select_related(depth=1).get(
-                id=source_id
-            )
-        except Translation.DoesNotExist:
+        source_string = source_strings.get(source_id)
+        if source_string is None:
             # TODO: Log or inform here
             push_response_dict[source_id] = { 'status':400,
                  'message':_("Source string cannot be identified in the DB")}
@@ -827,25 +955,20 @@ def push_translation(request, project_slug, lang_code, *args, **kwargs):
                                "completely specified or entirely empty!"))}
                 # Skip the save as we hit on an error.
                 continue
-        try:
-            msgs = _save_translation(
-                source_string, row['translations'],
-                target_language, request.user
-            )
-            if not msgs:
-                push_response_dict[source_id] = {'status': 200}
-            else:
-                push_response_dict[source_id] = {
-                    'status': 200, 'message': msgs[-1]
-                }
-        except LotteBadRequestError, e:
-            push_response_dict[source_id] = {
-                'status': 400, 'message': e.message
-            }
-        except Exception, e:
-            logger.error(
-                "Unexpected exception raised: %s" % e.message, exc_info=True
-            )
+        if source_id in rows:
+            rows[source_id][1].update(row['translations'])
+        else:
+            rows[source_id] = (source_string, dict(row['translations']))
+
+    try:
+        push_response_dict.update(
+            _save_translations(rows.values(), target_language, request.user)
+        )
+    except Exception, e:
+        logger.error(
+            "Unexpected exception raised: %s" % e.message, exc_info=True
+        )
+        for source_id in rows:
             push_response_dict[source_id] = {
                 'status': 400, 'message': e.message
             }
@@ -854,123 +977,204 @@ def push_translation(request, project_slug, lang_code, *args, **kwargs):
     return HttpResponse(json_dict, mimetype='application/json')
 
 
-@transaction.commit_on_success
-def _save_translation(source_string, translations, target_language, user):
-    """Save a translation string to the database.
+def _save_translations(rows, target_language, user):
+    """Save the translations of many source strings to the database.
+
+    See ``_write_translations``. The compiled files of the changed
+    resources are marked as stale after the transaction is committed, so
+    that no one caches their old content under the new version.
+    """
+    results, resources = _write_translations(rows, target_language, user)
+    for resource in resources:
+        bump_content_version(resource, target_language)
+    return results
 
-    This functions handle a signle source entity translation
-    (could be pluralized).
 
-    Currently, the function only returns warning strings.
-    There is no message for success.
+@transaction.commit_on_success
+def _write_translations(rows, target_language, user):
+    """Write the translations of many source strings in a transaction.
+
+    Each row handles a single source entity translation (could be
+    pluralized). The existing translations of all rows are fetched at once,
+    the changes are written with bulk queries and the statistics of each
+    resource are updated once, at the end. A row with errors is not saved
+    at all, but the rest of the rows are.
 
     Args:
-        source_string: A Translation object of the string in the source
-            language.
-        translations: A (rule, string) tuple.
-        target_language: The language the string is translated to.
+        rows: A list of (source_string, translations) tuples, where
+            source_string is a Translation object of the string in the
+            source language and translations is a dictionary from plural
+            names to translation strings.
+        target_language: The language the strings are translated to.
         user: The translator.
     Returns:
-        A list if strings to display to the user.
+        A tuple of a dictionary from the ids of the source strings to the
+        status of their save, in the form sent to the client, and a list of
+        the resources that changed.
     Raises:
-        An LotteBadRequestError exception in case of errors.
+        Any exception raised while writing to the database.
     """
-    source_id = source_string.pk
-    resource = source_string.resource
-    source_language = resource.source_language
-    warnings = []
-
-    check = ProjectPermission(user)
-    review_perm = check.proofread(resource.project, target_language)
-
-    for rule, target_string in translations.items():
-        rule = target_language.get_rule_num_from_name(rule)
-        if rule != 5:
-            # fetch correct source string for plural rule
-            try:
-                source_string = Translation.objects.get(
-                    source_entity=source_string.source_entity,
-                    language=source_language, rule=rule
-                )
-            except Translation.DoesNotExist:
-                # target language has extra plural forms
-                pass
+    results = {}
+    if not rows:
+        return results, []
+    se_ids = [source_string.source_entity_id for source_string, t in rows]
+
+    # The source strings of the plural forms, for each source language.
+    pluralized = {}
+    for source_string, translations in rows:
+        if source_string.source_entity.pluralized:
+            pluralized.setdefault(
+                source_string.resource.source_language_id, []
+            ).append(source_string.source_entity_id)
+    source_plurals = {}
+    for language_id, ids in pluralized.iteritems():
+        plural_strings = Translation.objects.filter(
+            source_entity__in=ids, language=language_id
+        ).exclude(rule=5).values_list('source_entity_id', 'rule', 'string')
+        for se_id, rule, string in plural_strings:
+            source_plurals[(se_id, rule)] = string
+
+    existing = dict(
+        ((t.source_entity_id, t.rule), t)
+        for t in Translation.objects.filter(
+            source_entity__in=se_ids, language=target_language
+        )
+    )
 
-        # check for errors
-        try:
-            for ErrorValidator in create_error_validators(resource.i18n_method):
-                v = ErrorValidator(source_language, target_language, rule)
-                v(source_string.string, target_string)
-        except ValidationError, e:
-            raise LotteBadRequestError(e.message)
-        # check for warnings
-        for WarningValidator in create_warning_validators(resource.i18n_method):
-            v = WarningValidator(source_language, target_language, rule)
-            try:
-                v(source_string.string, target_string)
-            except ValidationError, e:
-                warnings.append(e.message)
-        try:
-            # TODO: Implement get based on context and/or on context too!
-            translation_string = Translation.objects.get(
-                source_entity=source_string.source_entity,
-                language=target_language, rule=rule
+    review_perms = {}
+    engines = {}
+    new_translations = []
+    updated_translations = []
+    deleted_ids = []
+    # The changed resources and how their stats change
+    resources = {}
+    deltas = {}
+    for source_string, translations in rows:
+        source_id = source_string.pk
+        se_id = source_string.source_entity_id
+        resource = source_string.resource
+        source_language = resource.source_language
+        if resource.project_id not in review_perms:
+            check = ProjectPermission(user)
+            review_perms[resource.project_id] = check.proofread(
+                resource.project, target_language
             )
+        review_perm = review_perms[resource.project_id]
+        if resource.pk not in engines:
+            engines[resource.pk] = ValidationEngine(
+                resource.i18n_method, source_language, target_language
+            )
+        engine = engines[resource.pk]
 
-            if translation_string.reviewed:
-                if not review_perm:
+        # Check the whole row, before changing anything.
+        warnings = []
+        changes = []
+        try:
+            rules = [
+                (target_language.get_rule_num_from_name(rule), target_string)
+                for rule, target_string in translations.items()
+            ]
+            batch = []
+            for rule, target_string in rules:
+                # fetch correct source string for plural rule, unless the
+                # target language has extra plural forms
+                string = source_string.string
+                if rule != 5:
+                    string = source_plurals.get((se_id, rule), string)
+                batch.append((string, target_string, rule, (se_id, rule)))
+            for error, rule_warnings in engine.validate_many(batch):
+                if error is not None:
+                    raise LotteBadRequestError(error)
+                warnings.extend(rule_warnings)
+            for rule, target_string in rules:
+                translation = existing.get((se_id, rule))
+                if translation is not None:
+                    if translation.reviewed and not review_perm:
+                        raise LotteBadRequestError(
+                            _('You are not allowed to edit a reviewed string.')
+                        )
+                    changes.append((rule, target_string, translation))
+                elif target_string != "":
+                    changes.append((rule, target_string, None))
+                elif not source_string.source_entity.pluralized:
+                    # In cases of pluralized translations, sometimes only
+                    # one translation will exist and the rest plural forms
+                    # will be empty. If the user wants to delete all of
+                    # them, we need to let by the ones that don't already
+                    # have a translation.
                     raise LotteBadRequestError(
-                        _('You are not allowed to edit a reviewed string.')
+                        _("The translation string is empty")
                     )
+        except LotteBadRequestError, e:
+            logger.debug("%s" % e, exc_info=True)
+            results[source_id] = {'status': 400, 'message': e.message}
+            continue
 
-            # FIXME: Maybe we don't want to permit anyone to delete!!!
-            # If an empty string has been issued then we delete the translation.
-            if target_string == "":
-                translation_string.delete()
-            else:
-                translation_string.string = target_string
-                translation_string.user = user
-                translation_string.save()
-
-            _add_copyright(source_string, target_language, user)
-            invalidate_stats_cache(resource, target_language, user=user)
-        except Translation.DoesNotExist:
-            # Only create new if the translation string sent, is not empty!
-            if target_string != "":
-                Translation.objects.create(
+        if changes:
+            resources[resource.pk] = resource
+            delta = deltas.setdefault(
+                resource.pk, {'added': [], 'deleted': [], 'reviewed': 0}
+            )
+        for rule, target_string, translation in changes:
+            if translation is None:
+                new_translations.append(Translation(
                     source_entity=source_string.source_entity, user=user,
                     language=target_language, rule=rule, string=target_string,
                     resource=resource
-                )
-                _add_copyright(source_string, target_language, user)
-                invalidate_stats_cache(resource, target_language, user=user)
+                ))
+                if rule == 5:
+                    delta['added'].append(se_id)
+            # FIXME: Maybe we don't want to permit anyone to delete!!!
+            # If an empty string has been issued then we delete the translation.
+            elif target_string == "":
+                deleted_ids.append(translation.pk)
+                if rule == 5:
+                    delta['deleted'].append(se_id)
+                    if translation.reviewed:
+                        delta['reviewed'] += 1
             else:
-                # In cases of pluralized translations, sometimes only one
-                # translation will exist and the rest plural forms will be
-                # empty. If the user wants to delete all of them, we need
-                # to let by the ones that don't already have a translation.
-                if not source_string.source_entity.pluralized:
-                    raise LotteBadRequestError(
-                        _("The translation string is empty")
-                    )
-        except LotteBadRequestError, e:
-            logger.debug("%s" % e, exc_info=True)
-            raise
-        # catch-all. if we don't save we _MUST_ inform the user
-        except Exception, e:
-            msg = _(
-                "Error occurred while trying to save translation: %s" % unicode(e)
-            )
-            logger.error(msg, exc_info=True)
-            raise LotteBadRequestError(msg)
-    return warnings
+                translation.string = target_string
+                translation.user = user
+                updated_translations.append(translation)
+
+        if not warnings:
+            results[source_id] = {'status': 200}
+        else:
+            results[source_id] = {'status': 200, 'message': warnings[-1]}
+
+    if deleted_ids:
+        Translation.objects.filter(id__in=deleted_ids).delete()
+    if updated_translations:
+        Translation.objects.bulk_update(updated_translations)
+    if new_translations:
+        Translation.objects.bulk_insert(new_translations)
+
+    # Keep track of how the stats change, so that we need not
+    # recalculate them.
+    for resource_id, delta in deltas.iteritems():
+        resource = resources[resource_id]
+        stats_delta = {
+            'translated': len(delta['added']) - len(delta['deleted']),
+            'reviewed': -delta['reviewed'],
+            'translated_wordcount': Translation.objects.source_wordcount(
+                resource, delta['added']
+            ) - Translation.objects.source_wordcount(
+                resource, delta['deleted']
+            ),
+        }
+        _add_copyright(resource, target_language, user)
+        invalidate_stats_cache(
+            resource, target_language, user=user, stats_delta=stats_delta,
+            bump_version=False
+        )
+    return results, [resources[resource_id] for resource_id in deltas]
 
 
-def _add_copyright(source_string, target_language, user):
+def _add_copyright(resource, target_language, user):
     from transifex.addons.copyright.handlers import lotte_copyrights
     lotte_save_translation.connect(lotte_copyrights)
     lotte_save_translation.send(
-        None, resource=source_string.resource,
+        None, resource=resource,
         language=target_language, user=user
     )
 
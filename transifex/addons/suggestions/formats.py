@@ -5,7 +5,18 @@ from django.conf import settings
 from suggestions.models import Suggestion
 from transifex.txcommon.log import logger
 from transifex.resources.models import Translation, SourceEntity
-from transifex.resources.formats.utils.string_utils import percent_diff
+from transifex.resources.formats.utils.string_utils import \
+        find_similar_strings
+
+
+# The maximum number of values in an IN clause
+IN_QUERY_SIZE = 500
+
+
+def _in_chunks(values, size=IN_QUERY_SIZE):
+    """Split a list of values, so that they can be used in IN clauses."""
+    for i in xrange(0, len(values), size):
+        yield values[i:i + size]
 
 
 class SuggestionFormat(object):
@@ -25,29 +36,76 @@ class SuggestionFormat(object):
         The langs can contain a list of all languages for which the conversion
         will take place. Defaults to all available languages.
         """
-        if langs:
-            translations = Translation.objects.filter(source_entity=source,
-                language__in=langs, rule=5)
-        else:
-            translations = Translation.objects.filter(source_entity=source, rule=5)
-
-        for t in translations:
-            # Skip source language translations
-            if t.language == dest.resource.source_language:
-                continue
+        self._convert_many_to_suggestions([(source, dest)], user, langs)
+
+    def _convert_many_to_suggestions(self, pairs, user=None, langs=None):
+        """Add the translations of the source entities of each pair as
+        suggestions to the destination entity of the pair.
 
-            tr, created = Suggestion.objects.get_or_create(
-                string = t.string,
-                source_entity = dest,
-                language = t.language
+        The translations of all source entities are fetched at once and
+        only the suggestions that do not exist are created.
+
+        Args:
+            pairs: A list of (source, dest) SourceEntity tuples. The dest
+                entities must belong to the resource.
+            user: The user to assign the new suggestions to.
+            langs: The languages to convert the translations of. Defaults
+                to all languages.
+        """
+        dests = dict((source.pk, dest) for source, dest in pairs)
+        suggestions = []
+        for source_ids in _in_chunks(dests.keys()):
+            translations = Translation.objects.filter(
+                source_entity__in=source_ids, rule=5
+            ).exclude(
+                # Skip source language translations
+                language=self.resource.source_language
             )
+            if langs:
+                translations = translations.filter(language__in=langs)
+            for se_id, language_id, string in translations.values_list(
+                    'source_entity', 'language', 'string'):
+                suggestions.append(Suggestion(
+                    string=string, source_entity=dests[se_id],
+                    language_id=language_id, user=user
+                ))
+        self._insert_suggestions(suggestions)
+
+    def _insert_suggestions(self, suggestions):
+        """Save the suggestions, which do not exist already.
 
-            # If the suggestion was created and we have a user assign him as the
-            # one who made the suggestion
-            if created and user:
-                tr.user = user
-                tr.save()
-        return
+        Args:
+            suggestions: A list of unsaved Suggestion objects.
+        Returns:
+            The number of suggestions saved.
+        """
+        for s in suggestions:
+            s.presave()
+        se_ids = list(set(s.source_entity_id for s in suggestions))
+        existing = set()
+        # The position of the next suggestion of each source entity
+        orders = dict((se_id, 0) for se_id in se_ids)
+        for ids in _in_chunks(se_ids):
+            for key in Suggestion.objects.filter(
+                    source_entity__in=ids).values_list(
+                    'source_entity', 'language', 'string_hash'):
+                existing.add(key)
+                orders[key[0]] += 1
+
+        new_suggestions = []
+        for s in suggestions:
+            key = (s.source_entity_id, s.language_id, s.string_hash)
+            if key in existing:
+                continue
+            existing.add(key)
+            # The bulk insert bypasses the order_with_respect_to handling
+            # of save().
+            s._order = orders[s.source_entity_id]
+            orders[s.source_entity_id] += 1
+            new_suggestions.append(s)
+        if new_suggestions:
+            Suggestion.objects.bulk_insert(new_suggestions)
+        return len(new_suggestions)
 
     def create_suggestions(self, original, new):
         """Create new suggestions.
@@ -63,25 +121,46 @@ class SuggestionFormat(object):
     def add_from_strings(self, strings):
         """Add the strings as suggestions.
 
+        The source entities of the strings are looked up by their hash
+        and the suggestions, which do not exist, are inserted in bulk.
+
         Args:
             strings: An iterable of strings to add as suggestions
         """
+        entities = []
         for j in strings:
+            # An unsaved entity normalizes the context and calculates
+            # the hash the same way a saved one does.
+            se = SourceEntity(
+                string=j.source_entity, context=j.context or "None"
+            )
+            se.presave()
+            entities.append((se, j.translation))
+        if not entities:
+            return
+
+        hashes = list(set(se.string_hash for se, translation in entities))
+        se_ids = {}
+        for chunk in _in_chunks(hashes):
+            for se in SourceEntity.objects.filter(
+                    resource=self.resource, string_hash__in=chunk).only(
+                    'id', 'string', 'context'):
+                se_ids[(se.string, tuple(se.context))] = se.id
+
+        suggestions = []
+        for se, translation in entities:
             # Check SE existence
-            try:
-                se = SourceEntity.objects.get(
-                    string = j.source_entity, context = j.context or "None",
-                    resource = self.resource
-                )
-            except SourceEntity.DoesNotExist:
+            se_id = se_ids.get((se.string, tuple(se.context)))
+            if se_id is None:
                 logger.warning(
-                    "Source entity %s does not exist" % j.source_entity
+                    "Source entity %s does not exist" % se.string
                 )
                 continue
-            Suggestion.objects.get_or_create(
-                string = j.translation, source_entity = se,
-                language = self.language
-            )
+            suggestions.append(Suggestion(
+                string=translation, source_entity_id=se_id,
+                language=self.language
+            ))
+        self._insert_suggestions(suggestions)
 
 
 class KeySuggestionFormat(SuggestionFormat):
@@ -97,21 +176,37 @@ class ContentSuggestionFormat(SuggestionFormat):
     """
 
     def create_suggestions(self, original, new):
-        iterations = len(original)*len(new)
-        # If it's not over the limit, then do it
-        if iterations < settings.MAX_STRING_ITERATIONS:
-            for se in original:
-                for ne in new:
-                    try:
-                        old_trans = Translation.objects.get(source_entity=se,
-                            language=se.resource.source_language, rule=5)
-                        new_trans = Translation.objects.get(source_entity=ne,
-                            language=se.resource.source_language, rule=5)
-                    except Translation.DoesNotExist:
-                        # Source language translation should always exist
-                        # but just in case...
-                        continue
-                    # find Levenshtein distance
-                    if percent_diff(old_trans.string, new_trans.string) < settings.MAX_STRING_DISTANCE:
-                        self._convert_to_suggestions(se, ne, self.user)
-                        break
+        """Create new suggestions.
+
+        The translations of each original entity are added as suggestions
+        to the first new entity, the source string of which is similar
+        to the source string of the original one.
+
+        The source strings are fetched with one query and only the pairs of
+        strings that may be similar are compared. At most
+        MAX_STRING_ITERATIONS pairs are compared.
+
+        Args:
+            original: Original set of resources.
+            new: Set of new resources.
+        """
+        if not original or not new or not settings.MAX_STRING_ITERATIONS:
+            return
+        strings = dict(Translation.objects.filter(
+            resource=self.resource, language=self.resource.source_language,
+            rule=5
+        ).values_list('source_entity_id', 'string'))
+        # Source language translation should always exist
+        # but just in case...
+        original = dict((se.pk, se) for se in original if se.pk in strings)
+        new = [ne for ne in new if ne.pk in strings]
+        new_by_id = dict((ne.pk, ne) for ne in new)
+        pairs = find_similar_strings(
+            [(pk, strings[pk]) for pk in original],
+            [(ne.pk, strings[ne.pk]) for ne in new],
+            settings.MAX_STRING_DISTANCE, settings.MAX_STRING_ITERATIONS
+        )
+        self._convert_many_to_suggestions(
+            [(original[se_id], new_by_id[ne_id]) for se_id, ne_id in pairs],
+            self.user
+        )
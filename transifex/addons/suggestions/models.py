@@ -4,11 +4,22 @@ from hashlib import md5
 from django.contrib.auth.models import User
 from django.db import models
 from django.utils.translation import ugettext_lazy as _
+from djangobulk.bulk import insert_many
 
 from transifex.languages.models import Language
 from transifex.resources.models import Resource, SourceEntity
 
 
+class SuggestionManager(models.Manager):
+
+    def bulk_insert(self, records):
+        """Bulk insert suggestions.
+
+        The records must have been prepared with ``presave``.
+        """
+        insert_many(Suggestion, records)
+
+
 class Suggestion(models.Model):
     """
     The representation of a suggestion for a translation on a source string.
@@ -45,6 +56,8 @@ class Suggestion(models.Model):
         verbose_name=_('User'), blank=False, null=True,
         help_text=_("The user who committed the specific suggestion."))
 
+    objects = SuggestionManager()
+
     def __unicode__(self):
         return self.string
 
@@ -93,9 +106,13 @@ class Suggestion(models.Model):
         """Return a nice, rounded (integer) version of the score."""
         return int(self.score)
 
-    def save(self, *args, **kwargs):
+    def presave(self):
+        """Do any necessay work before saving the object."""
         # Encoding happens to support unicode characters
         self.string_hash = md5(self.string.encode('utf-8')).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.presave()
         super(Suggestion, self).save(*args, **kwargs)
 
 
@@ -2,6 +2,9 @@ from django.db import IntegrityError
 from django.core.urlresolvers import reverse
 from django.utils import simplejson as json
 from transifex.txcommon.tests.base import BaseTestCase
+from transifex.resources.formats.resource_collections import \
+        GenericTranslation
+from suggestions.formats import SuggestionFormat
 
 
 
@@ -123,3 +126,47 @@ class SuggestionsModelsTests(BaseTestCase):
         self.assertRaises(IntegrityError, self._create_suggestion)
 
 
+
+
+class SuggestionFormatTests(BaseTestCase):
+
+    def setUp(self):
+        super(SuggestionFormatTests, self).setUp()
+        self.handler = SuggestionFormat(
+            self.resource, self.language, self.user['registered']
+        )
+
+    def test_add_from_strings(self):
+        """Test that only new suggestions of existing entities are added."""
+        self.source_entity.suggestions.create(
+            language=self.language, string="Hey!"
+        )
+        strings = [
+            GenericTranslation('String1', 'Hey!', context='Context1'),
+            GenericTranslation('String1', 'Hello!', context='Context1'),
+            GenericTranslation('String1', 'Hi!', context='Other'),
+            GenericTranslation('Missing', 'Hi!', context='Context1'),
+        ]
+        self.handler.add_from_strings(strings)
+        self.handler.add_from_strings(strings)
+        self.assertEqual(
+            sorted(self.source_entity.suggestions.filter(
+                language=self.language
+            ).values_list('string', flat=True)),
+            [u'Hello!', u'Hey!']
+        )
+
+    def test_convert_to_suggestions(self):
+        """Test that the translations of an entity become suggestions of
+        another.
+        """
+        self.handler._convert_many_to_suggestions(
+            [(self.source_entity, self.source_entity_plural)],
+            self.user['registered']
+        )
+        suggestions = self.source_entity_plural.suggestions.all()
+        self.assertEqual(
+            [(s.string, s.language) for s in suggestions],
+            [(self.translation_ar.string, self.language_ar)]
+        )
+        self.assertEqual(suggestions[0].user, self.user['registered'])
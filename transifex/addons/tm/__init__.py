@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+
+"""
+Translation memory addon.
+
+The source strings of all resources are indexed by their hash, for exact
+matches, and by their trigrams, for fuzzy matches. The translations of
+the matching strings are looked up in the Translation table, so that they
+are always up to date.
+"""
+
+class Meta:
+    title = "Translation memory"
+    author = "Transifex"
+    description = "Suggests translations of similar strings from the translation memory."
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+"""
+API handler for the translation memory.
+"""
+
+from piston.handler import BaseHandler
+from piston.utils import rc
+from transifex.languages.models import Language
+from transifex.api.utils import BAD_REQUEST
+from transifex.addons.tm.models import TMSource
+
+
+class TMHandler(BaseHandler):
+    """
+    Handler to look up translations in the translation memory.
+
+    The string to translate is passed in the ``string`` parameter. The
+    ``min_score``, ``limit`` and ``budget`` parameters override the
+    defaults of the lookup.
+    """
+    allowed_methods = ('GET', )
+
+    def read(self, request, source_code, target_code, api_version=2):
+        """
+        Return the translations of the string and of similar strings.
+        """
+        string = request.GET.get('string')
+        if not string:
+            return BAD_REQUEST("No string specified.")
+        try:
+            source_language = Language.objects.by_code_or_alias(source_code)
+            target_language = Language.objects.by_code_or_alias(target_code)
+        except Language.DoesNotExist:
+            return rc.NOT_FOUND
+        kwargs = {}
+        for param in ('min_score', 'limit', 'budget'):
+            if param in request.GET:
+                try:
+                    kwargs[param] = int(request.GET[param])
+                except ValueError:
+                    return BAD_REQUEST("Parameter %s must be a number." % param)
+                if kwargs[param] < 0:
+                    return BAD_REQUEST("Parameter %s must be positive." % param)
+        if kwargs.get('min_score', 0) > 100:
+            return BAD_REQUEST("Parameter min_score must be at most 100.")
+        return TMSource.objects.lookup(
+            string, source_language, target_language, user=request.user,
+            **kwargs
+        )
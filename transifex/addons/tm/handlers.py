@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+from django.db.models import get_model
+from transifex.resources.signals import post_save_translation
+
+
+def index_source_strings(sender, **kwargs):
+    """Update the translation memory index after a source file is saved.
+
+    Translations are read from the Translation table when looking up the
+    translation memory, so only the source strings need to be indexed.
+    """
+    resource = kwargs['resource']
+    language = kwargs['language']
+    if language != resource.source_language:
+        return
+    TMSource = get_model('tm', 'TMSource')
+    TMSource.objects.index_resource(resource)
+
+
+def connect():
+    post_save_translation.connect(index_source_strings)
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from django.core.management.base import LabelCommand
+from transifex.resources.models import Resource
+from transifex.addons.tm.models import TMSource
+
+_HELP_TEXT = """Index the source strings of resources in the translation memory.
+
+Only the strings, which are not indexed or have changed, are indexed again.
+Project slugs can be passed, in order to index the resources of specific
+projects only.
+
+Example::
+    python manage.py txtmindex project-foo"""
+
+
+class Command(LabelCommand):
+    help = (_HELP_TEXT)
+
+    args = '[project_slug, project_slug, ...]'
+
+    def handle(self, *args, **options):
+        """Override default method to make it work without arguments."""
+        resources = Resource.objects.select_related(
+            'project', 'source_language'
+        )
+        if args:
+            resources = resources.filter(project__slug__in=args)
+        verbosity = int(options.get('verbosity', 1))
+        for resource in resources.iterator():
+            indexed = TMSource.objects.index_resource(resource)
+            if verbosity > 1:
+                self.stdout.write("Indexed %s strings of %s.\n" % (
+                    indexed, resource.full_name
+                ))
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+
+"""
+Models for the translation memory addon.
+"""
+
+import time
+from hashlib import md5
+from django.conf import settings
+from django.db import models
+from django.db.models import Count
+from django.utils.translation import ugettext_lazy as _
+from djangobulk.bulk import insert_many
+from transifex.languages.models import Language
+from transifex.projects.models import Project
+from transifex.resources.models import SourceEntity, Translation
+from transifex.resources.formats.utils.string_utils import percent_diff
+from transifex.txcommon.log import logger
+
+
+# The length of the n-grams of the index
+NGRAM_LENGTH = 3
+
+
+def string_hash(string):
+    """Return the hash of a string, as used in the index."""
+    return md5(string.encode('utf-8')).hexdigest()
+
+
+def ngrams_of(string):
+    """Return the set of n-grams of a string, as used in the index.
+
+    The n-grams are case insensitive.
+    """
+    string = string.lower()
+    return set(
+        string[i:i + NGRAM_LENGTH]
+        for i in xrange(len(string) - NGRAM_LENGTH + 1)
+    )
+
+
+class TMSourceManager(models.Manager):
+
+    def index_resource(self, resource):
+        """Update the index with the source strings of a resource.
+
+        Only the strings, which are new or have changed, are indexed again.
+        The strings of deleted source entities are removed from the index
+        along with them.
+
+        Args:
+            resource: The resource to index.
+        Returns:
+            The number of strings indexed.
+        """
+        source_language = resource.source_language
+        indexed = dict(
+            (se_id, (hash_, language_id)) for se_id, hash_, language_id in
+            self.filter(source_entity__resource=resource).values_list(
+                'source_entity', 'string_hash', 'language'
+            )
+        )
+        strings = Translation.objects.filter(
+            resource=resource, language=source_language, rule=5
+        ).values_list('source_entity', 'string')
+
+        sources = []
+        ngrams = []
+        for se_id, string in strings:
+            hash_ = string_hash(string)
+            if indexed.get(se_id) == (hash_, source_language.pk):
+                continue
+            sources.append(TMSource(
+                source_entity_id=se_id, language=source_language,
+                project_id=resource.project_id, string_hash=hash_,
+                length=len(string)
+            ))
+            ngrams.extend(
+                TMNgram(source_id=se_id, ngram=ngram)
+                for ngram in ngrams_of(string)
+            )
+        if not sources:
+            return 0
+        changed = [s.source_entity_id for s in sources
+                   if s.source_entity_id in indexed]
+        if changed:
+            TMNgram.objects.filter(source__in=changed).delete()
+            self.filter(source_entity__in=changed).delete()
+        insert_many(TMSource, sources)
+        insert_many(TMNgram, ngrams)
+        return len(sources)
+
+    def lookup(self, string, source_language, target_language, user=None,
+               exclude=(), min_score=None, limit=None, budget=None):
+        """Find translations of the string and of similar strings.
+
+        First, the source strings with the same hash are looked up. Then,
+        if there are not enough of them, the source strings which share
+        enough trigrams with the string to possibly be similar (see
+        "Approximate string-matching with q-grams and maximal matches",
+        Ukkonen, 1992) are compared with it, most shared trigrams first,
+        until the time budget is exhausted.
+
+        Args:
+            string: The string to translate.
+            source_language: The language of the string.
+            target_language: The language of the translations.
+            user: The user asking. Only projects the user has access to
+                are searched.
+            exclude: The ids of source entities to leave out.
+            min_score: The minimum similarity of the strings, as a
+                percentage. Defaults to TM_MIN_SCORE.
+            limit: The maximum number of results. Defaults to
+                TM_MAX_RESULTS.
+            budget: The time budget of the lookup in milliseconds. Defaults
+                to TM_LATENCY_BUDGET.
+        Returns:
+            A list of dictionaries with the keys 'source_entity_id',
+            'source_string', 'translation' and 'score', the best matches
+            first.
+        """
+        if min_score is None:
+            min_score = settings.TM_MIN_SCORE
+        if limit is None:
+            limit = settings.TM_MAX_RESULTS
+        if budget is None:
+            budget = settings.TM_LATENCY_BUDGET
+        deadline = time.time() + budget / 1000.0
+        min_score = max(min_score, 1)
+        sources = self.filter(
+            language=source_language,
+            project__in=Project.objects.for_user(user)
+        ).exclude(source_entity__in=exclude)
+        translated = Translation.objects.filter(
+            language=target_language, rule=5
+        )
+
+        # source entity id -> score
+        scores = dict(
+            (se_id, 100) for se_id in sources.filter(
+                string_hash=string_hash(string),
+                source_entity__in=translated.values('source_entity')
+            ).values_list('source_entity', flat=True)[:limit]
+        )
+        if len(scores) < limit and min_score < 100:
+            self._add_fuzzy_scores(
+                string, source_language, sources, translated, min_score,
+                deadline, scores
+            )
+        if not scores:
+            return []
+
+        source_strings = dict(Translation.objects.filter(
+            source_entity__in=scores.keys(), language=source_language,
+            rule=5
+        ).values_list('source_entity', 'string'))
+        translations = translated.filter(
+            source_entity__in=scores.keys()
+        ).values_list('source_entity', 'string')
+        results = []
+        for se_id, translation in translations:
+            if se_id not in source_strings:
+                continue
+            results.append({
+                'source_entity_id': se_id,
+                'source_string': source_strings[se_id],
+                'translation': translation,
+                'score': scores[se_id],
+            })
+        results.sort(key=lambda r: (-r['score'], r['source_entity_id']))
+        # The same translation of the same string may be in many projects.
+        seen = set()
+        unique = []
+        for result in results:
+            key = (result['source_string'], result['translation'])
+            if key not in seen:
+                seen.add(key)
+                unique.append(result)
+        return unique[:limit]
+
+    def _add_fuzzy_scores(self, string, source_language, sources,
+                          translated, min_score, deadline, scores):
+        """Add the scores of the indexed strings similar to the string.
+
+        Args:
+            string: The string to translate.
+            source_language: The language of the string.
+            sources: The queryset of the indexed strings to search.
+            translated: The queryset of the translations in the target
+                language.
+            min_score: The minimum similarity of the strings.
+            deadline: The time to stop comparing strings at.
+            scores: A dictionary from the source entity ids to the scores
+                found so far, which is updated in place.
+        """
+        length = len(string)
+        ngrams = ngrams_of(string)
+        # The distance is at least the difference of the lengths.
+        min_length = (length * min_score + 99) // 100
+        max_length = length * 100 // min_score
+        sources = sources.filter(
+            length__gte=min_length, length__lte=max_length
+        )
+        # Each edit removes at most NGRAM_LENGTH of the n-grams of the string.
+        max_edits = (100 - min_score) * max_length // 100
+        min_shared = len(ngrams) - max_edits * NGRAM_LENGTH
+        if min_shared > 0:
+            candidates = TMNgram.objects.filter(
+                ngram__in=ngrams, source__in=sources
+            ).values('source').annotate(shared=Count('id')).filter(
+                shared__gte=min_shared
+            ).order_by('-shared').values_list('source', 'shared')
+            # The aggregate must stay selected for the ordering to work.
+            candidates = [row[0] for row in
+                          candidates[:settings.TM_MAX_CANDIDATES]]
+        else:
+            # Short strings may be similar without sharing any n-grams.
+            candidates = sources.values_list(
+                'source_entity', flat=True
+            )[:settings.TM_MAX_CANDIDATES]
+        candidates = [se_id for se_id in candidates if se_id not in scores]
+        if not candidates:
+            return
+        candidate_strings = dict(Translation.objects.filter(
+            source_entity__in=candidates, rule=5,
+            language=source_language
+        ).values_list('source_entity', 'string'))
+        candidates_translated = set(translated.filter(
+            source_entity__in=candidates
+        ).values_list('source_entity', flat=True))
+
+        for compared, se_id in enumerate(candidates):
+            if time.time() > deadline:
+                logger.debug(
+                    "Stopped the translation memory lookup after %s of %s "
+                    "candidates." % (compared, len(candidates))
+                )
+                break
+            if se_id not in candidates_translated or \
+                    se_id not in candidate_strings:
+                continue
+            score = int(100 - percent_diff(string, candidate_strings[se_id]))
+            if score >= min_score:
+                scores[se_id] = score
+
+
+class TMSource(models.Model):
+    """The index entry of a source string."""
+
+    source_entity = models.OneToOneField(
+        SourceEntity, primary_key=True, related_name='tm_source',
+        verbose_name=_('Source entity'),
+        help_text=_("The source entity of the indexed string.")
+    )
+    language = models.ForeignKey(
+        Language, verbose_name=_('Language'),
+        help_text=_("The language of the indexed string.")
+    )
+    project = models.ForeignKey(
+        Project, verbose_name=_('Project'),
+        help_text=_("The project of the indexed string.")
+    )
+    string_hash = models.CharField(
+        _('String hash'), max_length=32, db_index=True,
+        help_text=_("The md5 hash of the indexed string.")
+    )
+    length = models.PositiveIntegerField(
+        _('Length'), db_index=True,
+        help_text=_("The length of the indexed string.")
+    )
+
+    objects = TMSourceManager()
+
+    def __unicode__(self):
+        return u'%s (%s)' % (self.source_entity_id, self.string_hash)
+
+    class Meta:
+        verbose_name = _('translation memory source')
+        verbose_name_plural = _('translation memory sources')
+
+
+class TMNgram(models.Model):
+    """A trigram of an indexed source string."""
+
+    source = models.ForeignKey(
+        TMSource, related_name='ngrams', verbose_name=_('Source'),
+        help_text=_("The indexed string.")
+    )
+    ngram = models.CharField(
+        _('N-gram'), max_length=NGRAM_LENGTH, db_index=True,
+        help_text=_("A trigram of the indexed string, in lowercase.")
+    )
+
+    def __unicode__(self):
+        return self.ngram
+
+    class Meta:
+        verbose_name = _('translation memory n-gram')
+        verbose_name_plural = _('translation memory n-grams')
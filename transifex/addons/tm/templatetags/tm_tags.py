@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+from django import template
+from django.db.models import get_model
+
+from transifex.languages.models import Language
+from transifex.txcommon.templatetags.txcommontags import ResolverNode
+
+TMSource = get_model('tm', 'TMSource')
+
+register = template.Library()
+
+class TMMatchesNode(ResolverNode):
+
+    @classmethod
+    def handle_token(cls, parser, token, name):
+        bits = token.contents.split()
+        tag_name = bits[0]
+        kwargs = {
+            'source_entity': cls.next_bit_for(bits, tag_name),
+            'lang_code': cls.next_bit_for(bits, 'for'),
+            'var_name': cls.next_bit_for(bits, 'as', name),
+        }
+        return cls(**kwargs)
+
+    def __init__(self, source_entity, lang_code, var_name):
+        self.source_entity = source_entity
+        self.lang_code = lang_code
+        self.var_name = var_name
+
+    def render(self, context):
+        source_entity = self.resolve(self.source_entity, context)
+        lang_code = self.resolve(self.lang_code, context)
+        request = context.get('request')
+
+        context[self.var_name] = []
+        resource = source_entity.resource
+        source_string = source_entity.get_translation(
+            resource.source_language.code
+        )
+        target_language = Language.objects.by_code_or_alias_or_none(lang_code)
+        if source_string is None or target_language is None:
+            return ''
+        context[self.var_name] = TMSource.objects.lookup(
+            source_string.string, resource.source_language, target_language,
+            user=getattr(request, 'user', None), exclude=[source_entity.id]
+        )
+        return ''
+
+@register.tag
+def get_tm_matches(parser, token):
+    """
+    Retrieves the translations of the source string of the given
+    source_entity and of similar strings from the translation memory and
+    assigns them to a context variable.
+
+    Syntax::
+
+        {% get_tm_matches source_entity for lang_code %}
+        {% for m in tm_matches %}
+            {{ m.score }} {{ m.translation }}
+        {% endfor %}
+
+        {% get_tm_matches source_entity for lang_code as my_matches %}
+
+    """
+    return TMMatchesNode.handle_token(parser, token, name='tm_matches')
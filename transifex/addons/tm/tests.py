@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+from django.core.urlresolvers import reverse
+from django.db.models.loading import get_model
+from django.utils import simplejson
+from transifex.resources.models import SourceEntity
+from transifex.txcommon.tests.base import BaseTestCase
+
+from tm.models import ngrams_of
+
+TMSource = get_model('tm', 'TMSource')
+
+
+class TranslationMemoryTests(BaseTestCase):
+
+    def setUp(self):
+        super(TranslationMemoryTests, self).setUp()
+        self.source_entity_similar = SourceEntity.objects.create(
+            string='String2', context='Context1', resource=self.resource
+        )
+        self.source_entity_similar.translations.create(
+            string='Buy me some BEER!', rule=5, language=self.language_en,
+            resource=self.resource
+        )
+        self.source_entity_similar.translations.create(
+            string=u'Arabic text', rule=5, language=self.language_ar,
+            resource=self.resource
+        )
+        TMSource.objects.index_resource(self.resource)
+
+    def test_ngrams(self):
+        """Test the n-grams of the strings."""
+        self.assertEqual(ngrams_of(u'AbcD'), set([u'abc', u'bcd']))
+        self.assertEqual(ngrams_of(u'ab'), set())
+
+    def test_index_resource(self):
+        """Test that only new or changed strings are indexed."""
+        self.assertEqual(TMSource.objects.filter(
+            source_entity__resource=self.resource
+        ).count(), 2)
+        self.assertEqual(TMSource.objects.index_resource(self.resource), 0)
+        self.translation_en.string = 'Buy me some wine :)'
+        self.translation_en.save()
+        self.assertEqual(TMSource.objects.index_resource(self.resource), 1)
+        tm_source = TMSource.objects.get(source_entity=self.source_entity)
+        self.assertEqual(
+            set(tm_source.ngrams.values_list('ngram', flat=True)),
+            ngrams_of(self.translation_en.string)
+        )
+
+    def test_exact_and_fuzzy_lookup(self):
+        """Test the lookup of the translations of similar strings."""
+        matches = TMSource.objects.lookup(
+            self.translation_en.string, self.language_en, self.language_ar,
+            min_score=70, budget=1000
+        )
+        self.assertEqual(
+            [(m['source_entity_id'], m['score']) for m in matches],
+            [(self.source_entity.id, 100),
+             (self.source_entity_similar.id, 84)]
+        )
+        self.assertEqual(matches[0]['translation'], self.translation_ar.string)
+
+        matches = TMSource.objects.lookup(
+            self.translation_en.string, self.language_en, self.language_ar,
+            exclude=[self.source_entity.id], min_score=90, budget=1000
+        )
+        self.assertEqual(matches, [])
+
+    def test_fuzzy_lookup_with_shared_ngrams(self):
+        """Test the lookup of long strings, whose candidates must share
+        enough n-grams with the string.
+        """
+        source_entity = SourceEntity.objects.create(
+            string='String3', context='Context1', resource=self.resource
+        )
+        source_entity.translations.create(
+            string='The quick brown fox jumps over the lazy dog',
+            rule=5, language=self.language_en, resource=self.resource
+        )
+        source_entity.translations.create(
+            string=u'Arabic fox', rule=5, language=self.language_ar,
+            resource=self.resource
+        )
+        TMSource.objects.index_resource(self.resource)
+        matches = TMSource.objects.lookup(
+            'The quick brown fox jumps over the lazy cat',
+            self.language_en, self.language_ar, min_score=80, budget=1000
+        )
+        self.assertEqual(
+            [m['source_entity_id'] for m in matches], [source_entity.id]
+        )
+        self.assertTrue(80 <= matches[0]['score'] < 100)
+        self.assertEqual(matches[0]['translation'], u'Arabic fox')
+
+    def test_lookup_private_projects(self):
+        """Test that strings of private projects are not looked up for
+        anonymous users.
+        """
+        self.source_entity_private.translations.create(
+            string='Private string', rule=5, language=self.language_en,
+            resource=self.resource_private
+        )
+        self.source_entity_private.translations.create(
+            string='Private translation', rule=5,
+            language=self.language_ar, resource=self.resource_private
+        )
+        TMSource.objects.index_resource(self.resource_private)
+        self.assertEqual(TMSource.objects.lookup(
+            'Private string', self.language_en, self.language_ar,
+        ), [])
+        matches = TMSource.objects.lookup(
+            'Private string', self.language_en, self.language_ar,
+            user=self.user['maintainer']
+        )
+        self.assertEqual(len(matches), 1)
+
+    def test_api(self):
+        """Test the API of the translation memory."""
+        url = reverse('apiv2_tm', args=['en_US', 'ar'])
+        resp = self.client['registered'].get(url)
+        self.assertEqual(resp.status_code, 400)
+        resp = self.client['registered'].get(url, {
+            'string': self.translation_en.string, 'min_score': 'a'
+        })
+        self.assertEqual(resp.status_code, 400)
+        resp = self.client['registered'].get(url, {
+            'string': self.translation_en.string, 'min_score': 100
+        })
+        self.assertEqual(resp.status_code, 200)
+        matches = simplejson.loads(resp.content)
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0]['translation'], self.translation_ar.string)
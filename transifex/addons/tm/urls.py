@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from django.conf.urls.defaults import *
+from django.views.decorators.cache import never_cache
+from piston.resource import Resource
+from transifex.api.authentication import CustomHttpBasicAuthentication
+from transifex.addons.tm.api import TMHandler
+
+auth = CustomHttpBasicAuthentication(realm='Transifex API')
+
+tm_handler = Resource(TMHandler, authentication=auth)
+
+urlpatterns = patterns('',
+    url(
+        r'^api/2/tm/(?P<source_code>[\-_@\w\.]+)/(?P<target_code>[\-_@\w\.]+)/$',
+        never_cache(tm_handler),
+        {'api_version': 2},
+        name='apiv2_tm',
+    ),
+)
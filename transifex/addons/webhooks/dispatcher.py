@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+
+"""
+Delivery of web hook events.
+
+The statistics of a resource are updated once per language, so a single
+source file upload may trigger hundreds of events. Instead of visiting the
+URLs of the hooks during the request, the events are queued to a
+dispatcher, which coalesces the events of each (project, resource,
+language) over a short window and delivers them from a pool of worker
+threads, retrying the failed deliveries.
+"""
+
+from __future__ import with_statement
+import atexit
+import heapq
+import itertools
+import threading
+import time
+import Queue
+from collections import deque
+from django.conf import settings
+from transifex.txcommon.log import logger
+
+
+class _Delivery(object):
+    """A POST of an event to the URL of a hook."""
+
+    def __init__(self, url, data, created):
+        self.url = url
+        self.data = data
+        self.created = created
+        self.attempts = 0
+
+
+class WebHookDispatcher(object):
+    """Deliver web hook events in the background.
+
+    The events with the same key, that are queued in the same window, are
+    coalesced to the last one. Each event is sent to each URL with a POST
+    request from a pool of worker threads. Deliveries, which fail with a
+    connection error or a server error, are retried with an exponential
+    backoff. Client errors are not retried.
+
+    The threads are started with the first event, so that processes, which
+    are forked after the dispatcher is created, have their own threads.
+    """
+
+    # The number of delivery latencies kept for the statistics
+    latency_samples = 1000
+
+    def __init__(self, window=1.0, workers=4, max_retries=3, backoff=1.0,
+                 timeout=2.0, post_function=None):
+        """Initialize the dispatcher.
+
+        Args:
+            window: The seconds to wait for more events with the same key,
+                before delivering an event.
+            workers: The number of threads which send the requests.
+            max_retries: The number of times a failed delivery is retried.
+            backoff: The seconds to wait before the first retry. The wait
+                is doubled for each retry.
+            timeout: The timeout of each request in seconds.
+            post_function: The function which sends the POST requests.
+                Defaults to ``requests.post``.
+        """
+        self.window = window
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._post_function = post_function
+        self._cond = threading.Condition()
+        # The events waiting for their window to end, by key
+        self._pending = {}
+        # The (due time, sequence, job) tuples of the scheduled jobs. A job
+        # is either the key of a pending event or a delivery to retry.
+        self._timers = []
+        self._sequence = itertools.count()
+        self._queue = Queue.Queue()
+        self._threads = []
+        # The number of events and deliveries, which have not finished
+        self._unfinished = 0
+        self._flushing = False
+        self._stats = {
+            'delivered': 0, 'failed': 0, 'retried': 0, 'coalesced': 0,
+        }
+        self._latencies = deque(maxlen=self.latency_samples)
+
+    def enqueue(self, key, data, urls):
+        """Queue an event for delivery.
+
+        Args:
+            key: The key of the event. Events with the same key in the
+                same window are coalesced.
+            data: A dictionary with the POST data of the event.
+            urls: A list with the URLs to send the event to.
+        """
+        now = time.time()
+        with self._cond:
+            self._start()
+            event = self._pending.get(key)
+            if event is not None:
+                event['data'] = data
+                event['urls'] = urls
+                self._stats['coalesced'] += 1
+                return
+            self._pending[key] = {'data': data, 'urls': urls, 'created': now}
+            self._unfinished += 1
+            self._schedule(now + self.window, key)
+
+    def flush(self, timeout=None):
+        """Deliver the pending events now and wait for all deliveries to
+        finish.
+
+        Args:
+            timeout: The maximum number of seconds to wait.
+        Returns:
+            True, if all deliveries finished, False otherwise.
+        """
+        deadline = timeout is not None and time.time() + timeout or None
+        with self._cond:
+            self._flushing = True
+            self._cond.notify_all()
+            try:
+                while self._unfinished:
+                    if deadline is None:
+                        self._cond.wait()
+                    else:
+                        remaining = deadline - time.time()
+                        if remaining <= 0:
+                            return False
+                        self._cond.wait(remaining)
+                return True
+            finally:
+                self._flushing = False
+
+    def stats(self):
+        """Return the statistics of the deliveries.
+
+        Returns:
+            A dictionary with the number of the delivered, failed and
+            retried deliveries, the number of coalesced events, the number
+            of unfinished events and deliveries and the average and maximum
+            delivery latency in seconds of the latest deliveries.
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats['pending'] = self._unfinished
+            latencies = list(self._latencies)
+        if latencies:
+            stats['latency_avg'] = sum(latencies) / len(latencies)
+            stats['latency_max'] = max(latencies)
+        else:
+            stats['latency_avg'] = stats['latency_max'] = None
+        return stats
+
+    def _start(self):
+        """Start the threads, if they have not started yet.
+
+        Must be called with the lock held.
+        """
+        if self._threads:
+            return
+        threads = [threading.Thread(
+            target=self._run_scheduler, name='webhooks-scheduler'
+        )]
+        for i in xrange(self.workers):
+            threads.append(threading.Thread(
+                target=self._run_worker, name='webhooks-worker-%s' % i
+            ))
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        self._threads = threads
+
+    def _schedule(self, due, job):
+        """Schedule a job. Must be called with the lock held."""
+        heapq.heappush(self._timers, (due, self._sequence.next(), job))
+        self._cond.notify_all()
+
+    def _due_jobs(self):
+        """Wait for the next jobs that are due and return them.
+
+        Must be called with the lock held.
+        """
+        while True:
+            now = time.time()
+            jobs = []
+            if self._flushing:
+                # Do not wait for the window of the pending events to end.
+                timers = []
+                for timer in self._timers:
+                    if isinstance(timer[2], _Delivery):
+                        timers.append(timer)
+                    else:
+                        jobs.append(timer[2])
+                if jobs:
+                    heapq.heapify(timers)
+                    self._timers = timers
+            while self._timers and self._timers[0][0] <= now:
+                jobs.append(heapq.heappop(self._timers)[2])
+            if jobs:
+                return jobs
+            if self._timers:
+                self._cond.wait(self._timers[0][0] - now)
+            else:
+                self._cond.wait()
+
+    def _run_scheduler(self):
+        """Move the events, the window of which has ended, and the
+        deliveries to retry to the queue of the workers.
+        """
+        while True:
+            with self._cond:
+                jobs = self._due_jobs()
+                deliveries = []
+                for job in jobs:
+                    if isinstance(job, _Delivery):
+                        deliveries.append(job)
+                        continue
+                    event = self._pending.pop(job)
+                    for url in event['urls']:
+                        deliveries.append(
+                            _Delivery(url, event['data'], event['created'])
+                        )
+                    # The event is replaced by its deliveries.
+                    self._unfinished += len(event['urls']) - 1
+                if not self._unfinished:
+                    self._cond.notify_all()
+            for delivery in deliveries:
+                self._queue.put(delivery)
+
+    def _run_worker(self):
+        """Deliver the events in the queue."""
+        while True:
+            delivery = self._queue.get()
+            try:
+                self._deliver(delivery)
+            except Exception, e:
+                logger.error(
+                    "Error delivering web hook to %s: %s" % (delivery.url, e),
+                    exc_info=True
+                )
+                self._finish(delivery, False)
+
+    def _post(self, url, data):
+        """Send the POST request of a delivery."""
+        post_function = self._post_function
+        if post_function is None:
+            import requests
+            post_function = requests.post
+        return post_function(
+            url, data=data, allow_redirects=False, timeout=self.timeout
+        )
+
+    def _deliver(self, delivery):
+        """Send the event of a delivery and schedule a retry, if it fails."""
+        delivery.attempts += 1
+        try:
+            res = self._post(delivery.url, delivery.data)
+        except Exception, e:
+            # Connection errors and timeouts
+            error, retry = repr(e), True
+        else:
+            if res.ok:
+                self._finish(delivery, True)
+                return
+            error = "HTTP code is %s" % res.status_code
+            retry = res.status_code >= 500 or res.status_code == 429
+
+        if retry and delivery.attempts <= self.max_retries:
+            wait = self.backoff * 2 ** (delivery.attempts - 1)
+            logger.warning(
+                "Error visiting web hook %s: %s. Retrying in %s seconds." % (
+                    delivery.url, error, wait
+                )
+            )
+            with self._cond:
+                self._stats['retried'] += 1
+                self._schedule(time.time() + wait, delivery)
+            return
+        logger.error("Error visiting web hook %s: %s" % (delivery.url, error))
+        self._finish(delivery, False)
+
+    def _finish(self, delivery, delivered):
+        """Record the outcome of a delivery."""
+        latency = time.time() - delivery.created
+        if delivered:
+            logger.debug(
+                "POST for web hook %s successful after %s attempts in "
+                "%.3f seconds." % (delivery.url, delivery.attempts, latency)
+            )
+        with self._cond:
+            if delivered:
+                self._stats['delivered'] += 1
+                self._latencies.append(latency)
+            else:
+                self._stats['failed'] += 1
+            self._unfinished -= 1
+            if not self._unfinished:
+                self._cond.notify_all()
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    """Return the dispatcher of the process.
+
+    It is configured by the WEBHOOKS_* settings. The pending events are
+    delivered, when the process exits.
+    """
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                dispatcher = WebHookDispatcher(
+                    window=getattr(settings, 'WEBHOOKS_WINDOW', 1.0),
+                    workers=getattr(settings, 'WEBHOOKS_WORKERS', 4),
+                    max_retries=getattr(settings, 'WEBHOOKS_MAX_RETRIES', 3),
+                    backoff=getattr(settings, 'WEBHOOKS_RETRY_BACKOFF', 1.0),
+                    timeout=getattr(settings, 'WEBHOOKS_TIMEOUT', 2.0),
+                )
+                atexit.register(
+                    dispatcher.flush,
+                    getattr(settings, 'WEBHOOKS_EXIT_TIMEOUT', 5.0)
+                )
+                _dispatcher = dispatcher
+    return _dispatcher
@@ -4,7 +4,6 @@
 Handlers for the addon.
 """
 
-import requests
 from django.db.models import get_model
 from django import forms
 from django.utils.translation import ugettext_lazy as _
@@ -13,35 +12,33 @@ from transifex.txcommon.validators import validate_http_url
 from transifex.resources.signals import post_update_rlstats
 from transifex.projects.signals import project_form_init, post_proj_save_m2m
 from webhooks.models import WebHook
+from webhooks.dispatcher import get_dispatcher
 
 
 def visit_url(sender, **kwargs):
-    """Visit the URL for the project.
+    """Queue an event for the web hooks of the project.
 
     Send the slug of the project, the slug of the resource and the language
     of the translation as identifiers. Send the translation percentage
     as information.
 
+    The event is delivered in the background by the web hook dispatcher,
+    which coalesces the events of the same resource and language.
+
     Args:
         sender: The rlstats object itself.
-    Returns:
-        True of False for success (or not).
+        dispatcher: The dispatcher to queue the event to. Defaults to
+            the dispatcher of the process.
     """
-    # TODO make it a celery task
-    # TODO increase the timeout in celery
-
     stats = sender
     resource = stats.resource
     project = resource.project
     language = stats.language
 
-    if 'post_function' in kwargs:
-        post_function = kwargs['post_function']
-    else:
-        post_function = requests.post
-
-    hooks = WebHook.objects.filter(project=project)
-    if not hooks:
+    urls = list(
+        WebHook.objects.filter(project=project).values_list('url', flat=True)
+    )
+    if not urls:
         logger.debug("Project %s has no web hooks" % project.slug)
         return
 
@@ -55,16 +52,10 @@ def visit_url(sender, **kwargs):
         "POST data for %s: %s" % (stats.resource.project.slug, event_info)
     )
 
-    for hook in hooks:
-        res = post_function(hook.url,
-          data=event_info, allow_redirects=False, timeout=2.0)
-
-        if res.ok:
-            logger.debug("POST for project %s successful." % project)
-        else:
-            msg = "Error visiting webhook %s: HTTP code is %s" % (
-              hook, res.status_code)
-            logger.error(msg)
+    dispatcher = kwargs.get('dispatcher') or get_dispatcher()
+    dispatcher.enqueue(
+        (project.slug, resource.slug, language.code), event_info, urls
+    )
 
 
 def add_web_hook_field(sender, **kwargs):
@@ -5,12 +5,18 @@ Tests for the webhook addon.
 """
 
 from __future__ import with_statement
+import socket
+import threading
+import urlparse
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
 from mock import patch
+from django.utils import unittest
 from django.core.exceptions import ValidationError
 from transifex.txcommon.log import logger
 from transifex.txcommon.tests.base import BaseTestCase
 from webhooks.models import WebHook
 from webhooks.handlers import visit_url, add_web_hook_field, save_web_hook
+from webhooks.dispatcher import WebHookDispatcher
 from transifex.resources.models import RLStats
 from transifex.projects.forms import ProjectForm
 
@@ -49,9 +55,14 @@ class TestWebHooks(BaseTestCase):
         web_hook = WebHook.objects.create(
             project=self.resource.project, url='https://127.0.0.1'
         )
+        dispatcher = WebHookDispatcher(
+            window=0, post_function=_mock_error_request
+        )
         with patch.object(logger, 'error') as log_mock:
-            visit_url(stats, post_function=_mock_error_request)
+            visit_url(stats, dispatcher=dispatcher)
+            self.assertTrue(dispatcher.flush(5))
             self.assertTrue(log_mock.called)
+        self.assertEqual(dispatcher.stats()['failed'], 1)
 
     def test_successful_response(self):
         stats = RLStats.objects.get(
@@ -60,9 +71,14 @@ class TestWebHooks(BaseTestCase):
         web_hook = WebHook.objects.create(
             project=self.resource.project, url='https://127.0.0.1'
         )
+        dispatcher = WebHookDispatcher(
+            window=0, post_function=_mock_successful_request
+        )
         with patch.object(logger, 'error') as log_mock:
-            visit_url(stats, post_function=_mock_successful_request)
+            visit_url(stats, dispatcher=dispatcher)
+            self.assertTrue(dispatcher.flush(5))
             self.assertFalse(log_mock.called)
+        self.assertEqual(dispatcher.stats()['delivered'], 1)
 
 
 class TestWebHookHandlers(BaseTestCase):
@@ -74,6 +90,126 @@ class TestWebHookHandlers(BaseTestCase):
         self.assertIn('webhook', kwargs['form'].fields)
 
 
+class TestWebHookDispatcher(unittest.TestCase):
+    """Test the delivery of events against a local HTTP server."""
+
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), _RecordingHandler)
+        self.server.requests = []
+        self.server.failures = 0
+        self.url = 'http://127.0.0.1:%s/hook' % self.server.server_port
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _dispatcher(self, **kwargs):
+        kwargs.setdefault('window', 0.2)
+        kwargs.setdefault('backoff', 0.01)
+        kwargs.setdefault('timeout', 1.0)
+        return WebHookDispatcher(**kwargs)
+
+    def test_coalescing(self):
+        """Test that the events of the same key in a window are delivered
+        once with the latest data.
+        """
+        dispatcher = self._dispatcher(window=60)
+        for percent in (10, 20, 30):
+            dispatcher.enqueue(
+                ('p', 'r', 'el'), {'language': 'el', 'percent': percent},
+                [self.url]
+            )
+        dispatcher.enqueue(
+            ('p', 'r', 'fr'), {'language': 'fr', 'percent': 5}, [self.url]
+        )
+        self.assertEqual(self.server.requests, [])
+        self.assertTrue(dispatcher.flush(5))
+        self.assertEqual(
+            sorted(self.server.requests),
+            [{'language': ['el'], 'percent': ['30']},
+             {'language': ['fr'], 'percent': ['5']}]
+        )
+        stats = dispatcher.stats()
+        self.assertEqual(stats['delivered'], 2)
+        self.assertEqual(stats['coalesced'], 2)
+        self.assertEqual(stats['pending'], 0)
+
+    def test_window(self):
+        """Test that events are delivered, when their window ends."""
+        dispatcher = self._dispatcher(window=0.05)
+        dispatcher.enqueue('key', {'percent': 1}, [self.url, self.url])
+        for i in xrange(100):
+            if dispatcher.stats()['delivered'] == 2:
+                break
+            threading.Event().wait(0.05)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertTrue(dispatcher.stats()['latency_max'] >= 0.05)
+
+    def test_retries(self):
+        """Test that server errors are retried."""
+        self.server.failures = 2
+        dispatcher = self._dispatcher(max_retries=3)
+        dispatcher.enqueue('key', {'percent': 1}, [self.url])
+        self.assertTrue(dispatcher.flush(5))
+        self.assertEqual(len(self.server.requests), 3)
+        stats = dispatcher.stats()
+        self.assertEqual(stats['delivered'], 1)
+        self.assertEqual(stats['retried'], 2)
+        self.assertEqual(stats['failed'], 0)
+
+    def test_failure(self):
+        """Test that deliveries fail after the retries."""
+        self.server.failures = 10
+        dispatcher = self._dispatcher(max_retries=2)
+        with patch.object(logger, 'error') as log_mock:
+            dispatcher.enqueue('key', {'percent': 1}, [self.url])
+            self.assertTrue(dispatcher.flush(5))
+            self.assertTrue(log_mock.called)
+        self.assertEqual(len(self.server.requests), 3)
+        stats = dispatcher.stats()
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual(stats['delivered'], 0)
+
+    def test_connection_error(self):
+        """Test that connection errors are retried and recorded as
+        failures.
+        """
+        # A port nothing listens to
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        url = 'http://127.0.0.1:%s/hook' % sock.getsockname()[1]
+        sock.close()
+        dispatcher = self._dispatcher(max_retries=1)
+        dispatcher.enqueue('key', {'percent': 1}, [url])
+        self.assertTrue(dispatcher.flush(5))
+        stats = dispatcher.stats()
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual(stats['retried'], 1)
+
+
+class _RecordingHandler(BaseHTTPRequestHandler):
+    """Record the POST data and fail as many times as the server is told
+    to.
+    """
+
+    def do_POST(self):
+        length = int(self.headers.getheader('content-length') or 0)
+        data = urlparse.parse_qs(self.rfile.read(length))
+        self.server.requests.append(data)
+        if self.server.failures:
+            self.server.failures -= 1
+            self.send_response(503)
+        else:
+            self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
 def _mock_successful_request(*args, **kwargs):
     """Mock a request and return a success status code."""
     return MockResponse(200)
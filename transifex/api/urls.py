@@ -12,7 +12,7 @@ from transifex.languages.api import LanguageHandler
 from transifex.projects.api import ProjectHandler
 from transifex.resources.api import ResourceHandler, StatsHandler, \
         TranslationHandler, FormatsHandler, TranslationObjectsHandler,\
-        SingleTranslationHandler
+        SingleTranslationHandler, ImportJobHandler
 from transifex.releases.api import ReleaseHandler
 from transifex.actionlog.api import ActionlogHandler
 from transifex.api.views import reject_legacy_api
@@ -30,6 +30,7 @@ translation_objects_handler = Resource(TranslationObjectsHandler,
         authentication=auth)
 single_translation_handler = Resource(SingleTranslationHandler,
         authentication=auth)
+import_job_handler = Resource(ImportJobHandler, authentication=auth)
 
 urlpatterns = patterns('',
     url(
@@ -92,6 +93,11 @@ urlpatterns = patterns('',
         never_cache(translation_handler),
         {'api_version': 2},
         name='apiv2_translation',
+    ), url(
+        r'^2/project/(?P<project_slug>[-\w]+)/resource/(?P<resource_slug>[-\w]+)/import/(?P<job_id>\d+)/$',
+        never_cache(import_job_handler),
+        {'api_version': 2},
+        name='apiv2_import_job',
     ), url(
         r'^2/project/(?P<project_slug>[-\w]+)/resource/(?P<resource_slug>[-\w]+)/stats/$',
         never_cache(stats_handler),
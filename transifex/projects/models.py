@@ -29,6 +29,8 @@ from userena.models import upload_to_mugshot
 from easy_thumbnails.fields import ThumbnailerImageField
 
 from transifex.actionlog.models import LogEntry
+from transifex.actionlog.queues import check_project_privacy, \
+        invalidate_private_projects
 from transifex.txcommon.db.models import ChainerManager
 from transifex.txcommon.log import log_model, logger
 from transifex.languages.models import Language
@@ -395,3 +397,6 @@ class HubRequest(models.Model):
 
 # Connect to signals
 project_outsourced_changed.connect(on_outsource_change)
+models.signals.pre_save.connect(check_project_privacy, sender=Project)
+models.signals.post_save.connect(invalidate_private_projects, sender=Project)
+models.signals.post_delete.connect(invalidate_private_projects, sender=Project)
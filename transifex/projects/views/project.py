@@ -28,7 +28,7 @@ from transifex.projects.permissions.project import ProjectPermission
 from transifex.projects.signals import project_outsourced_changed
 from transifex.releases.handlers import update_all_release
 from transifex.resources.models import Resource, RLStats
-from transifex.resources.utils import invalidate_template_cache
+from transifex.resources.utils import invalidate_resource_templates
 from transifex.teams.forms import TeamRequestSimpleForm
 from transifex.projects.models import Permission
 
@@ -245,10 +245,7 @@ def handle_stats_on_access_control_edit(project):
             for stat in new_stats:
                 RLStats.objects.get_or_create(resource=resource,
                     language=stat.language)
-            invalidate_template_cache("project_resource_details",
-                project.slug, resource.slug)
-            invalidate_template_cache("resource_details",
-                project.slug, resource.slug)
+            invalidate_resource_templates(resource)
     else:
         teams = project.team_set.all()
         for resource in project.resources.all():
@@ -256,10 +253,7 @@ def handle_stats_on_access_control_edit(project):
                 Q(translated=0) & ~Q(language__in=teams.values('language')))
             for stat in old_stats:
                 stat.delete()
-            invalidate_template_cache("project_resource_details",
-                project.slug, resource.slug)
-            invalidate_template_cache("resource_details",
-                project.slug, resource.slug)
+            invalidate_resource_templates(resource)
 
 
 def _delete_project(request, project):
@@ -363,7 +357,7 @@ def project_resources(request, project_slug):
     statslist = Resource.objects.filter(
         project=project
     ).values(
-        'slug', 'name', 'category', 'priority__level',
+        'id', 'slug', 'name', 'category', 'priority__level',
         'total_entities', 'wordcount'
     ).annotate(
         last_update=Max('rlstats__last_update')
@@ -12,7 +12,7 @@ from django.db.models import permalink
 from django.utils.html import escape
 
 from transifex.txcommon.log import log_model
-from transifex.resources.utils import invalidate_template_cache
+from transifex.txcommon.cache import bump_generation
 
 RLStats = get_model('resources', 'RLStats')
 
@@ -98,9 +98,7 @@ class Release(models.Model):
         #TODO: Find way to update the object accordingly if *_date fields change
         rn = ReleaseNotifications.objects.get_or_create(release=self)[0]
 
-        for stat in RLStats.objects.by_release_aggregated(self):
-            invalidate_template_cache("release_details",
-                self.pk, stat.object.id)
+        bump_generation("release", self.pk)
 
     @permalink
     def get_absolute_url(self):
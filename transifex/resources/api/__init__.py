@@ -8,13 +8,14 @@ from itertools import ifilter
 from django.db import transaction, IntegrityError, DatabaseError
 from django.conf import settings
 from django.forms import ValidationError
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseNotModified
 from django.core.urlresolvers import reverse
 from django.core.exceptions import ObjectDoesNotExist
 from django.template.defaultfilters import slugify
 from django.contrib.auth.models import User
 from django.utils import simplejson
 from django.utils.encoding import smart_unicode
+from django.utils.http import parse_etags, quote_etag
 from django.utils.translation import ugettext_lazy as _
 
 from piston.handler import BaseHandler, AnonymousBaseHandler
@@ -32,10 +33,12 @@ from transifex.projects.signals import post_submit_translation, post_resource_sa
 
 from transifex.resources.decorators import method_decorator
 from transifex.resources.models import Resource, SourceEntity, \
-        Translation as TranslationModel, RLStats
+        Translation as TranslationModel, RLStats, ImportJob
 from transifex.resources.backends import ResourceBackend, FormatsBackend, \
-        ResourceBackendError, content_from_uploaded_file, \
-        filename_of_uploaded_file
+        ResourceBackendError, FormatsBackendError, \
+        content_from_uploaded_file, filename_of_uploaded_file
+from transifex.resources.cache import compiled_translation_etag, \
+        bump_content_version
 from transifex.resources.formats import Mode
 from transifex.resources.formats.registry import registry
 from transifex.resources.formats.core import ParseError
@@ -470,6 +473,18 @@ class TranslationHandler(BaseHandler):
             except AttributeError, e:
                 return BAD_REQUEST(unicode(e))
 
+        # Unchanged translations are not compiled again. Clients that
+        # send back the tag they got get a 304 response instead. The file
+        # and the JSON responses have different tags.
+        representation = 'file' if 'file' in request.GET else 'json'
+        etag = compiled_translation_etag(
+            r, language, mode or Mode.DEFAULT, pseudo_type, representation
+        )
+        if etag is not None:
+            etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+            if etag in etags or '*' in etags:
+                return HttpResponseNotModified()
+
         translation = Translation.get_object("get", request, r, language)
         try:
             res = translation.get(pseudo_type=pseudo_type, mode=mode)
@@ -477,9 +492,12 @@ class TranslationHandler(BaseHandler):
             return BAD_REQUEST(unicode(e))
         except FormatsBackendError, e:
             return BAD_REQUEST(unicode(e))
-        return translation.__class__.to_http_for_get(
+        response = translation.__class__.to_http_for_get(
             translation, res
         )
+        if etag is not None:
+            response['ETag'] = quote_etag(etag)
+        return response
 
     def _update(self, request, project_slug, resource_slug, lang_code=None):
         # Permissions handling
@@ -550,6 +568,9 @@ class TranslationHandler(BaseHandler):
 
         t = Translation.get_object("delete", request, resource, language)
         t.delete()
+        # Bump after committing, so that no one caches the old content
+        # under the new version.
+        bump_content_version(resource, language)
         return rc.DELETED
 
 
@@ -609,7 +630,9 @@ class Translation(object):
         Returns:
             A HttpResponse with the result.
         """
-        return cls._to_http_response(translation, result, status=200)
+        # Imports that run in the background are only accepted yet.
+        status = 202 if getattr(translation, 'job', None) else 200
+        return cls._to_http_response(translation, result, status=status)
 
     def __init__(self, request, resource=None, language=None):
         """
@@ -625,6 +648,8 @@ class Translation(object):
         self.data = getattr(request, 'data', 'None')
         self.resource = resource
         self.language = language
+        # The ImportJob of an asynchronous import, if one was scheduled
+        self.job = None
 
     def create(self):
         """
@@ -645,7 +670,8 @@ class Translation(object):
             language=self.language
         ).delete()
         invalidate_stats_cache(
-            self.resource, self.language, user=self.request.user
+            self.resource, self.language, user=self.request.user,
+            bump_version=False
         )
 
     def get(self, pseudo_type, mode=None):
@@ -657,22 +683,57 @@ class Translation(object):
         """
         raise NotImplementedError
 
+    def _import(self, parser, filename=None):
+        """
+        Import the content bound to the parser.
+
+        If the request asked for an asynchronous import (``async``
+        parameter), the content is only stored and imported in the
+        background. Otherwise, it is imported right away.
+        """
+        if self.request.GET.get('async'):
+            return self._schedule_import(parser, filename)
+        return self._parse_translation(parser)
+
+    def _schedule_import(self, parser, filename=None):
+        """
+        Schedule the import of a source/translation file.
+
+        Returns:
+            A dict with the id of the job and the url to poll its status.
+        """
+        is_source = self.resource.source_language == self.language
+        fb = FormatsBackend(self.resource, self.language, self.request.user)
+        try:
+            self.job = fb.schedule_import(
+                parser.content, is_source, filename=filename
+            )
+        except FormatsBackendError, e:
+            raise BadRequestError("Could not import file: %s" % e)
+        return {
+            'job_id': self.job.id,
+            'status': self.job.status,
+            'status_url': reverse(
+                'apiv2_import_job',
+                args=[self.resource.project.slug, self.resource.slug,
+                      self.job.id]
+            )
+        }
+
     def _parse_translation(self, parser):
         """
         Parses a source/translation file.
 
         We assume the content has been checked for validity
-        by now.
+        by now. The import goes through the backend, so that pushing a
+        file, which has not changed since the last import, is skipped.
         """
         strings_added, strings_updated = 0, 0
-        parser.bind_resource(self.resource)
-        parser.set_language(self.language)
-
         is_source = self.resource.source_language == self.language
+        fb = FormatsBackend(self.resource, self.language, self.request.user)
         try:
-            parser.parse_file(is_source)
-            strings_added, strings_updated = parser.save2db(
-                is_source, user=self.request.user
+            strings_added, strings_updated = fb.import_handler_content(
+                parser, is_source
             )
         except Exception, e:
             raise BadRequestError("Could not import file: %s" % e)
@@ -794,7 +855,7 @@ class FileTranslation(Translation):
                 raise BadRequestError("A strange error happened.")
 
             parser.bind_file(file_.name)
-            res = self._parse_translation(parser)
+            res = self._import(parser, filename=name)
         finally:
             os.unlink(file_.name)
         return res
@@ -874,7 +935,7 @@ class StringTranslation(Translation):
                 raise BadRequestError("A strange error has happened.")
 
             parser.bind_file(file_.name)
-            res = self._parse_translation(parser)
+            res = self._import(parser)
         finally:
             os.unlink(file_.name)
         return res
@@ -890,3 +951,39 @@ class FormatsHandler(BaseHandler):
         Get details of supported i18n formats.
         """
         return registry.available_methods
+
+
+class ImportJobHandler(BaseHandler):
+    """
+    Handler to report the status of asynchronous imports.
+    """
+    allowed_methods = ('GET', )
+
+    @method_decorator(one_perm_required_or_403(
+            pr_project_private_perm,
+            (Project, 'slug__exact', 'project_slug')
+    ))
+    def read(self, request, project_slug, resource_slug, job_id,
+             api_version=2):
+        """
+        Return the status, the progress and the results of an import.
+        """
+        try:
+            job = ImportJob.objects.select_related('language').get(
+                id=job_id, resource__slug=resource_slug,
+                resource__project__slug=project_slug
+            )
+        except ImportJob.DoesNotExist:
+            return rc.NOT_FOUND
+        return {
+            'id': job.id,
+            'language': job.language.code,
+            'status': job.status,
+            'progress': job.progress,
+            'strings_added': job.strings_added,
+            'strings_updated': job.strings_updated,
+            'strings_deleted': job.strings_deleted,
+            'error': job.error,
+            'created': job.created,
+            'last_update': job.last_update,
+        }
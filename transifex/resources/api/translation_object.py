@@ -425,6 +425,31 @@ class BaseTranslationHandler(BaseHandler):
                     'context': translation.get('context')})
         return is_pluralized
 
+    def _get_stats_delta(self, updated_translations):
+        """Calculate how the stats change by updating the translations.
+
+        No translation is added or deleted, so only changes in the
+        reviewed flag matter. This must be called before the updated
+        translations are saved.
+
+        Args:
+            updated_translations: A list of updated Translation objects
+        Returns:
+            A dictionary with the changes of the RLStats counters.
+        """
+        translations = dict(
+            (t.id, t) for t in updated_translations if t.rule == 5
+        )
+        previously_reviewed = Translation.objects.filter(
+            id__in=translations.keys(), reviewed=True
+        ).count()
+        reviewed = len(filter(lambda t: t.reviewed, translations.values()))
+        return {
+            'translated': 0,
+            'reviewed': reviewed - previously_reviewed,
+            'translated_wordcount': 0,
+        }
+
     @transaction.commit_on_success
     def _update_translations(self, updated_translations):
         """Bulk update translations
@@ -680,7 +705,11 @@ class SingleTranslationHandler(BaseTranslationHandler):
                     language, team, check, is_maintainer, request.user,
                     se_ids, updated_translations, trans_obj_dict)
             # Updated translations are saved to db
+            stats_delta = self._get_stats_delta(updated_translations)
             self._update_translations(updated_translations)
+            if updated_translations:
+                invalidate_stats_cache(resource, language,
+                        user=request.user, stats_delta=stats_delta)
 
             translations = Translation.objects.filter(
                     source_entity=source_entity, language=language)
@@ -776,7 +805,11 @@ class TranslationObjectsHandler(BaseTranslationHandler):
                         language, team, check, is_maintainer, request.user,
                         se_ids, updated_translations, trans_obj_dict)
 
+            stats_delta = self._get_stats_delta(updated_translations)
             self._update_translations(updated_translations)
+            if updated_translations:
+                invalidate_stats_cache(resource, language,
+                        user=request.user, stats_delta=stats_delta)
 
             keys = ['key', 'context', 'translation',
                     'reviewed', 'pluralized', 'wordcount',
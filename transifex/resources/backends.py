@@ -6,15 +6,20 @@ Various backend commands for resource models.
 These are used by views and the API.
 """
 
+from hashlib import sha1
 from itertools import ifilter
 from django.utils.translation import ugettext as _
 from django.db import IntegrityError, DatabaseError
+from django.utils import simplejson as json
 from transifex.txcommon.log import logger
-from transifex.resources.models import Resource
+from transifex.resources.models import Resource, ImportJob, ImportDigest
+from transifex.resources.cache import compiled_translation_etag, \
+        get_compiled_translation, set_compiled_translation
 from transifex.resources.formats.exceptions import FormatError
 from transifex.resources.formats.registry import registry
 from transifex.resources.formats.compilation import Mode
 from transifex.resources.formats.utils.decorators import need_language
+from transifex.resources.tasks import import_content
 
 
 class BackendError(Exception):
@@ -158,18 +163,99 @@ class FormatsBackend(object):
             raise FormatsBackendError(msg % self.resource.i18n_method)
         return self._import_content(handler, content, False)
 
+    def import_handler_content(self, handler, is_source):
+        """Import the content bound to a handler, which the caller has
+        already picked and checked.
+
+        Args:
+            handler: The handler, with the content bound to it.
+            is_source: A flag to indicate a source or a translation file.
+        Returns:
+            A two element tuple(pair). The first element is the number of
+            strings added and the second one is the number of those upadted.
+        """
+        return self._import_content(handler, None, is_source)
+
     def _get_handler(self, resource, language, filename=None):
         """Get the appropriate hanlder for the resource."""
         return registry.appropriate_handler(
             resource, language, filename=filename
         )
 
-    def _import_content(self, handler, content, is_source):
+    def schedule_import(self, content, is_source, filename=None):
+        """Store some content to be imported in the background.
+
+        The import is done by a celery task, so that big files do not
+        block the caller. Its progress and results are recorded in the
+        returned job.
+
+        Args:
+            content: The content to import.
+            is_source: A flag to indicate a source or a translation file.
+            filename: The filename of the uploaded content (if any).
+        Returns:
+            The ImportJob of the import.
+        """
+        if self.language is None:
+            msg = _("No language specified, when importing a file.")
+            logger.error(msg)
+            raise FormatsBackendError(msg)
+        handler = self._get_handler(
+            self.resource, self.language, filename=filename
+        )
+        if handler is None:
+            msg = "Files of type %s are not supported."
+            logger.error(msg % self.resource.i18n_method)
+            raise FormatsBackendError(msg % self.resource.i18n_method)
+        job = ImportJob.objects.create(
+            resource=self.resource, language=self.language, user=self.user,
+            is_source=is_source, filename=filename, content=content
+        )
+        import_content.delay(job.id)
+        return job
+
+    def run_import_job(self, job):
+        """Import the content of a job created by ``schedule_import``.
+
+        Errors are not raised; they are recorded in the job instead.
+
+        Args:
+            job: The ImportJob to run.
+        """
+        job.start()
+        handler = self._get_handler(
+            self.resource, self.language, filename=job.filename
+        )
+        if handler is None:
+            job.fail("Files of type %s are not supported." % (
+                    self.resource.i18n_method
+            ))
+            return
+        try:
+            added, updated = self._import_content(
+                handler, job.content, job.is_source, job=job
+            )
+        except FormatsBackendError, e:
+            job.fail(unicode(e))
+            return
+        except Exception, e:
+            logger.error(
+                "Unexamined exception raised in import job %s: %s" % (
+                    job.id, e
+                ), exc_info=True
+            )
+            job.fail(unicode(e))
+            return
+        job.finish(added, updated, handler.strings_deleted)
+
+    def _import_content(self, handler, content, is_source, job=None):
         """Import content to the database.
 
         Args:
-            content: The content to save.
+            content: The content to save. If None, the content already
+                bound to the handler is saved.
             is_source: A flag to indicate a source or a translation file.
+            job: The ImportJob to report the progress to, if any.
         Returns:
             A two element tuple(pair). The first element is the number of
             strings added and the second one is the number of those upadted.
@@ -177,12 +263,42 @@ class FormatsBackend(object):
         try:
             handler.bind_resource(self.resource)
             handler.set_language(self.language)
-            handler.bind_content(content)
+            if content is not None:
+                handler.bind_content(content)
+            last_import = self._last_import(is_source)
+            digest = _content_digest(handler.content)
+            if last_import is not None and \
+                    last_import.content_digest == digest:
+                logger.debug("Skipping import of unchanged file to %s (%s)."
+                    % (self.resource, self.language.code))
+                return (0, 0)
             handler.parse_file(is_source=is_source)
+            if job is not None:
+                job.set_progress(job.PROGRESS_PARSED)
+            stringset_digest = _stringset_digest(handler, is_source)
+            if last_import is not None and \
+                    last_import.stringset_digest == stringset_digest:
+                logger.debug("Skipping import of file with unchanged strings "
+                    "to %s (%s)." % (self.resource, self.language.code))
+                return (0, 0)
+            handler.import_digests = (digest, stringset_digest)
             return handler.save2db(is_source=is_source, user=self.user)
         except FormatError, e:
             raise FormatsBackendError(unicode(e))
 
+    def _last_import(self, is_source):
+        """Return the ImportDigest of the last import of the same kind to
+        the resource and language, if nothing has changed their strings
+        since then, or None.
+        """
+        try:
+            return ImportDigest.objects.get(
+                resource=self.resource, language=self.language,
+                is_source=is_source
+            )
+        except ImportDigest.DoesNotExist:
+            return None
+
     def compile_translation(self, pseudo_type=None, mode=None):
         """Compile the translation for a resource in a specified language.
 
@@ -194,6 +310,9 @@ class FormatsBackend(object):
         it. This is necessary for formats that do not fallback to the source
         language in case of empty translations.
 
+        Compiled files are cached, until the resource or the translation
+        changes.
+
         Args:
             pseudo_type: The pseudo_type (if any).
             mode: The mode for compiling this translation.
@@ -202,13 +321,62 @@ class FormatsBackend(object):
         """
         if mode is None:
             mode = Mode.DEFAULT
+        # Get the tag before compiling, so that a concurrent update
+        # cannot be hidden behind a newer version.
+        etag = compiled_translation_etag(
+            self.resource, self.language, mode, pseudo_type
+        )
+        if etag is not None:
+            content = get_compiled_translation(etag)
+            if content is not None:
+                return content
         handler = registry.appropriate_handler(
             resource=self.resource, language=self.language
         )
         handler.bind_resource(self.resource)
         handler.set_language(self.language)
         content = handler.compile(pseudo=pseudo_type, mode=mode)
-        return content if isinstance(content, basestring) else ''
+        content = content if isinstance(content, basestring) else ''
+        if etag is not None:
+            set_compiled_translation(etag, content)
+        return content
+
+
+def _content_digest(content):
+    """Return the digest of the content of a file.
+
+    The content is normalized first, so that a byte order mark, the style
+    of the line endings and trailing whitespace at the end of the file do
+    not change the digest.
+    """
+    if content.startswith(u'\ufeff'):
+        content = content[1:]
+    content = content.replace(u'\r\n', u'\n').replace(u'\r', u'\n')
+    return sha1(content.rstrip().encode('UTF-8')).hexdigest()
+
+
+def _stringset_digest(handler, is_source):
+    """Return the digest of the strings a handler has parsed.
+
+    Files, which differ only in their formatting, have the same digest.
+    The digest of a source file includes its template, too, since the
+    template is saved with the strings.
+    """
+    h = sha1()
+    for stringset in (handler.stringset, handler.suggestions):
+        for s in stringset:
+            h.update(json.dumps([
+                s.source_entity, s.translation, s.context, s.rule,
+                s.pluralized, s.fuzzy, s.obsolete, s.occurrences, s.comment,
+                s.flags
+            ]))
+        h.update('\n')
+    if is_source and handler.template is not None:
+        template = handler.template
+        if isinstance(template, unicode):
+            template = template.encode('UTF-8')
+        h.update(template)
+    return h.hexdigest()
 
 
 def content_from_uploaded_file(files, encoding='UTF-8'):
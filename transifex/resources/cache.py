@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+"""
+Caching of compiled translation files.
+
+A compiled file is cached under a key, which includes the content
+versions of its resource and language. The version of a resource is
+bumped, whenever its source strings or template change, and the version
+of a (resource, language) pair, whenever its translations change.
+
+Bumping a version makes all files cached for the old one unreachable, so
+there is no need to delete them; they simply expire.
+"""
+
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.hashcompat import md5_constructor
+
+
+def _timeout():
+    return settings.COMPILED_TRANSLATIONS_CACHE_SECONDS
+
+
+def _version_key(resource_id, language_id=None):
+    """Return the cache key of the content version of an object."""
+    if language_id is None:
+        return 'compiled.version.%s' % resource_id
+    return 'compiled.version.%s.%s' % (resource_id, language_id)
+
+
+def _new_version():
+    """Return a version number to start counting from.
+
+    We use the current time, so that a version that has been evicted
+    from the cache does not start again from a value used before.
+    """
+    return int(time.time() * 1000)
+
+
+def _get_version(key):
+    """Get the version stored under ``key``.
+
+    Initialize it, if it does not exist. If the cache backend does not
+    keep values at all (e.g. the dummy backend), return None.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), _timeout())
+        version = cache.get(key)
+    return version
+
+
+def bump_content_version(resource, language=None):
+    """Mark the compiled files of a resource as stale.
+
+    If a language is given (and it is not the source language), only the
+    files for that language are affected. Otherwise, the files of all
+    languages of the resource are.
+
+    Args:
+        resource: The resource that has been changed.
+        language: The language that has been changed, if any.
+    """
+    if language is None or language == resource.source_language:
+        key = _version_key(resource.id)
+    else:
+        key = _version_key(resource.id, language.id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), _timeout())
+
+
+def compiled_translation_etag(resource, language, mode, pseudo_type=None,
+                              representation=None):
+    """Return the entity tag of a compiled translation.
+
+    The tag changes, whenever the content of the compiled file changes.
+    It is also used as the key to cache the compiled file.
+
+    Args:
+        resource: The resource of the translation.
+        language: The language of the translation.
+        mode: The mode of the compilation.
+        pseudo_type: The pseudo type object used, if any.
+        representation: The name of the representation of the file sent
+            to the client, if any.
+    Returns:
+        The tag as a string or None, if it could not be computed.
+    """
+    if language is None:
+        return None
+    resource_version = _get_version(_version_key(resource.id))
+    language_version = _get_version(_version_key(resource.id, language.id))
+    if resource_version is None or language_version is None:
+        return None
+    pseudo_name = pseudo_type.__class__.__name__ if pseudo_type else ''
+    parts = [
+        resource.id, language.id, unicode(mode), pseudo_name,
+        resource_version, language_version,
+    ]
+    if representation is not None:
+        parts.append(representation)
+    return md5_constructor(
+        ':'.join(unicode(p) for p in parts).encode('UTF-8')
+    ).hexdigest()
+
+
+def get_compiled_translation(etag):
+    """Return the cached compiled file with the specified tag or None."""
+    return cache.get('compiled.file.%s' % etag)
+
+
+def set_compiled_translation(etag, content):
+    """Cache the content of a compiled file under the specified tag."""
+    cache.set('compiled.file.%s' % etag, content, _timeout())
@@ -10,7 +10,8 @@ from __future__ import absolute_import
 import re
 from transifex.resources.models import SourceEntity
 from ..exceptions import UninitializedCompilerError
-from ..utils.hash_tag import hash_regex, pluralized_hash_regex
+from ..utils.hash_tag import hash_regex, pluralized_hash_regex, \
+        replace_hashes
 
 
 class Compiler(object):
@@ -24,8 +25,14 @@ class Compiler(object):
     type of translation we want (``tdecorator). This allows for
     full customization of those steps. See
     http://en.wikipedia.org/wiki/Builder_pattern.
+
+    If the ``placeholder_index`` of the template (see
+    ``Template.placeholder_index``) is set, the hashes of the template
+    are not searched for, as long as the template is compiled unchanged.
     """
 
+    placeholder_index = None
+
     def __init__(self, resource, **kwargs):
         """Set the variables of the object.
 
@@ -73,13 +80,28 @@ class Compiler(object):
         if self._tset is None or self._tdecorator is None:
             msg = "One of the builders has not been set."
             raise UninitializedCompilerError(msg)
+        self._template = template
         self._pre_compile(template)
         content = self._examine_content(template)
         self._compile(content)
         self._post_compile()
         del self.language
+        self._template = None
         return self.compiled_template
 
+    def _hash_offsets(self, text):
+        """Return the offsets of the hashes in the text, if they are known.
+
+        They are known only if the text is the template itself.
+        """
+        index = self.placeholder_index
+        if index is None or text is not getattr(self, '_template', None):
+            return None
+        length, offsets = index
+        if length != len(text):
+            return None
+        return offsets
+
     def _apply_translations(self, translations, text):
         """Apply the translations to the text.
 
@@ -89,9 +111,8 @@ class Compiler(object):
         Returns:
             The text with the translations applied.
         """
-        regex = hash_regex()
-        return regex.sub(
-            lambda m: translations.get(m.group(0), m.group(0)), text
+        return replace_hashes(
+            text, translations, self._hash_offsets(text), hash_regex()
         )
 
     def _compile(self, content):
@@ -152,9 +173,9 @@ class PluralCompiler(Compiler):
         Returns:
             The text with the translations applied.
         """
-        regex = pluralized_hash_regex()
-        return regex.sub(
-            lambda m: translations.get(m.group(0), m.group(0)), text
+        return replace_hashes(
+            text, translations, self._hash_offsets(text),
+            pluralized_hash_regex()
         )
 
     def _compile(self, content):
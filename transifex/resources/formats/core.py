@@ -16,8 +16,11 @@ from suggestions.models import Suggestion
 from suggestions.formats import ContentSuggestionFormat
 from transifex.actionlog.models import action_logging
 from transifex.resources.handlers import invalidate_stats_cache
+from transifex.resources.cache import bump_content_version
 from transifex.resources.formats.exceptions import FormatError, ParseError, \
         CompileError
+from transifex.resources.formats.validators import ValidationEngine
+from transifex.resources.models import IN_QUERY_SIZE
 from .compilation import Compiler, NormalDecoratorBuilder, \
         PseudoDecoratorBuilder, AllTranslationsBuilder, \
         SourceTranslationsBuilder, ReviewedTranslationsBuilder, Mode
@@ -25,7 +28,8 @@ from transifex.resources.formats.pseudo import PseudoTypeMixin
 from transifex.resources.formats.utils.decorators import *
 from transifex.resources.signals import post_save_translation
 from transifex.resources.formats.resource_collections import StringSet, \
-        GenericTranslation, SourceEntityCollection, TranslationCollection
+        GenericTranslation, SourceEntityCollection, TranslationCollection, \
+        TranslationRow
 from transifex.teams.models import Team
 from transifex.resources.tasks import send_notices_for_formats
 
@@ -44,6 +48,7 @@ Resource = get_model('resources', 'Resource')
 Translation = get_model('resources', 'Translation')
 SourceEntity = get_model('resources', 'SourceEntity')
 Template = get_model('resources', 'Template')
+ImportDigest = get_model('resources', 'ImportDigest')
 
 
 class CustomSerializer(json.JSONEncoder):
@@ -116,6 +121,12 @@ class Handler(object):
             self.language = language
 
         self.key_dict = {}
+        self._stats_delta = None
+        # The number of strings deleted by the last save2db call
+        self.strings_deleted = 0
+        # The (content, stringset) digests to record, when the parsed
+        # strings are saved.
+        self.import_digests = None
 
         # Hold warning messages from the parser in a sorted dict way to avoid
         # duplicated messages and keep them in the order they were added.
@@ -206,9 +217,13 @@ class Handler(object):
         Returns:
             The template as a unicode string.
         """
-        return Template.objects.get(
-            resource=resource
-        ).content.decode(self.default_encoding)
+        return self._template_of(resource).content.decode(
+            self.default_encoding
+        )
+
+    def _template_of(self, resource):
+        """Return the Template object of the specified resource."""
+        return Template.objects.get(resource=resource)
 
     def set_language(self, language):
         """Set the language for the handler."""
@@ -310,8 +325,10 @@ class Handler(object):
         """
         if language is None:
             language = self.language
-        content = self._content_from_template(self.resource)
+        template = self._template_of(self.resource)
+        content = template.content.decode(self.default_encoding)
         compiler = self.construct_compiler(language, pseudo, mode)
+        compiler.placeholder_index = template.get_placeholder_index()
         try:
             return compiler.compile(
                 content, language
@@ -384,7 +401,9 @@ class Handler(object):
     def _init_translation_collection(self, se_ids):
         """Initialize the translations collections.
 
-        Get a collection of translation objects for the current language.
+        Get a collection of the translations for the current language. Only
+        the fields needed to compare them to the parsed strings are loaded,
+        as TranslationRow tuples.
 
         Args:
             se_ids: An iterable of source entities ids the translation
@@ -393,12 +412,33 @@ class Handler(object):
             A TranslationCollection object.
         """
         qs = Translation.objects.filter(
-            language=self.language, source_entity__in=se_ids).iterator()
+            language=self.language, source_entity__in=se_ids
+        ).values_list(*TranslationRow._fields).iterator()
         translations = TranslationCollection()
         for t in qs:
-            translations.add(t)
+            translations.add(TranslationRow._make(t))
         return translations
 
+    def _update_translations(self, strings, user):
+        """Update the string of translations.
+
+        Only the translations, which change, are loaded.
+
+        Args:
+            strings: A dictionary with the new strings by translation id.
+            user: The user that made the commit.
+        """
+        ids = strings.keys()
+        chunk_size = 500
+        for i in xrange(0, len(ids), chunk_size):
+            translations = list(Translation.objects.filter(
+                id__in=ids[i:i + chunk_size]
+            ))
+            for tr in translations:
+                tr.string = strings[tr.id]
+                tr.user = user
+            Translation.objects.bulk_update(translations)
+
     def _pre_save2db(self, *args, **kwargs):
         """
         This is called before doing any actual work. Override in inherited
@@ -465,7 +505,8 @@ class Handler(object):
             for j in self.stringset:
                 if j in source_entities:
                     se = source_entities.get(j)
-                    if se in new_entities:
+                    if se.pk is None:
+                        # A new entity, added for another plural form
                         continue
                     # update source string attributes.
                     se.flags = j.flags or ""
@@ -492,13 +533,12 @@ class Handler(object):
                     new_entities.append(se)
                     source_entities.add(se)
 
-            SourceEntity.objects.bulk_insert(new_entities)
+            # The new entities get their ids, so that there is no need to
+            # read the entities of the resource again.
+            SourceEntity.objects.bulk_insert_with_ids(new_entities)
             SourceEntity.objects.bulk_update(updated_entities)
-            qs = SourceEntity.objects.filter(resource=self.resource).iterator()
-            new_sources = list(qs) # TODO Use set() instead? Hash by pk
-            source_entities = self._init_source_entity_collection(new_sources)
             new_translations = []
-            updated_translations = set([])
+            updated_translations = {}
             for j in self.stringset:
                 se = source_entities.get(j)
                 if self._should_skip_translation(se, j):
@@ -506,10 +546,9 @@ class Handler(object):
                 if (se, j) in translations:
                     tr = translations.get((se, j))
                     if overwrite_translations and tr.string != j.translation:
-                        tr.string = j.translation
-                        tr.user = user
-                        updated_translations.add(tr)
-                        strings_updated += 1
+                        if tr.id not in updated_translations:
+                            strings_updated += 1
+                        updated_translations[tr.id] = j.translation
                 else:
                     tr = Translation(
                         source_entity=se, language=self.language, rule=j.rule,
@@ -521,7 +560,7 @@ class Handler(object):
                     if j.rule==5:
                         strings_added += 1
             Translation.objects.bulk_insert(new_translations)
-            Translation.objects.bulk_update(updated_translations)
+            self._update_translations(updated_translations, user)
         except Exception, e:
             msg = "Error importing the entries into the database: %s"
             logger.error(msg % e)
@@ -529,20 +568,13 @@ class Handler(object):
 
         sg_handler = self.SuggestionFormat(self.resource, self.language, user)
         sg_handler.add_from_strings(self.suggestions)
-        new_entities = SourceEntity.objects.exclude(
-            pk__in=[s.pk for s in original_sources]
-        ).filter(
-            resource=self.resource
-        ).iterator()
         untouched_ses = set(original_sources) - updated_entities
-        sg_handler.create_suggestions(untouched_ses, list(new_entities))
-        for se in untouched_ses:
-            se.delete()
+        sg_handler.create_suggestions(untouched_ses, new_entities)
+        SourceEntity.objects.bulk_delete([se.pk for se in untouched_ses])
         self._update_template(self.template)
 
         strings_deleted = len(untouched_ses)
         del new_entities, original_sources, updated_entities, untouched_ses
-        del new_sources
         return strings_added, strings_updated, strings_deleted
 
     def _save_translation(self, user, overwrite_translations):
@@ -569,7 +601,10 @@ class Handler(object):
         source_entities = self._init_source_entity_collection(qs)
         translations = self._init_translation_collection(source_entities.se_ids)
         new_translations = []
-        updated_translations = set([])
+        updated_translations = {}
+        # The (source entity, translation, existing Translation) tuples to
+        # save, if they are valid
+        changes = []
 
         strings_added = 0
         strings_updated = 0
@@ -601,16 +636,18 @@ class Handler(object):
                             if tr.reviewed:
                                 if not review_perm:
                                     continue
-                            tr.string = j.translation
-                            tr.user = user
-                            updated_translations.add(tr)
-                            strings_updated += 1
+                            changes.append((se, j, tr))
                     else:
                         if overwrite_translations and tr.string != j.translation:
-                            tr.string = j.translation
-                            tr.user = user
-                            updated_translations.add(tr)
-                            strings_updated += 1
+                            changes.append((se, j, tr))
+                else:
+                    changes.append((se, j, None))
+
+            for se, j, tr in self._validate_translations(changes):
+                if tr is not None:
+                    if tr.id not in updated_translations:
+                        strings_updated += 1
+                    updated_translations[tr.id] = j.translation
                 else:
                     tr = Translation(
                         source_entity=se, language=self.language, rule=j.rule,
@@ -620,7 +657,18 @@ class Handler(object):
                     if j.rule==5:
                         strings_added += 1
             Translation.objects.bulk_insert(new_translations)
-            Translation.objects.bulk_update(updated_translations)
+            self._update_translations(updated_translations, user)
+            # Updated translations keep their state, so only new ones
+            # change the stats.
+            added_se_ids = [t.source_entity_id for t in new_translations
+                            if t.rule == 5]
+            self._stats_delta = {
+                'translated': len(added_se_ids),
+                'reviewed': 0,
+                'translated_wordcount': Translation.objects.source_wordcount(
+                    self.resource, added_se_ids
+                ),
+            }
         except Exception, e:
             logger.error(
                 "There was a problem while importing the entries into the "
@@ -632,14 +680,74 @@ class Handler(object):
         sg_handler = self.SuggestionFormat(self.resource, self.language, user)
         sg_handler.add_from_strings(self.suggestions)
         del new_translations, updated_translations, source_entities, translations
+        del changes
         return strings_added, strings_updated, strings_deleted
 
+    def _validate_translations(self, changes):
+        """Validate the translations of a file in a single batch.
+
+        The tokens of each source string are extracted once. If any plural
+        form of a source entity has an error, all its forms are left out,
+        so that no half translated plurals are saved. The skipped strings
+        are reported as warnings.
+
+        Args:
+            changes: A list of (source entity, translation row, existing
+                Translation object or None) tuples.
+        Returns:
+            The list of the changes without errors.
+        """
+        if not changes:
+            return changes
+        source_language = self.resource.source_language
+        se_ids = list(set(se.id for se, j, tr in changes))
+        source_strings = {}
+        for i in xrange(0, len(se_ids), IN_QUERY_SIZE):
+            source_strings.update(
+                ((se_id, rule), string) for se_id, rule, string in
+                Translation.objects.filter(
+                    source_entity__in=se_ids[i:i + IN_QUERY_SIZE],
+                    language=source_language
+                ).values_list('source_entity', 'rule', 'string')
+            )
+        engine = ValidationEngine(
+            self.resource.i18n_method, source_language, self.language
+        )
+        batch = []
+        for se, j, tr in changes:
+            # The target language may have more plural forms.
+            string = source_strings.get(
+                (se.id, j.rule), source_strings.get((se.id, 5), se.string)
+            )
+            batch.append((string, j.translation, j.rule, (se.id, j.rule)))
+
+        # source entity id -> the first error of its translations
+        errors = {}
+        for (se, j, tr), (error, warnings) in zip(
+                changes, engine.validate_many(batch)):
+            if error is not None and se.id not in errors:
+                errors[se.id] = error
+                self._set_warning_message('validation_%s' % se.id,
+                    _("The translation of '%(string)s' was skipped: "
+                      "%(error)s") % {'string': se.string, 'error': error})
+        if errors:
+            logger.info("Skipped the translations of %s strings in %s of "
+                "resource %s, because of errors." % (
+                    len(errors), self.language, self.resource
+            ))
+        return [change for change in changes if change[0].id not in errors]
+
     def _update_stats_of_resource(self, resource, language, user):
         """Update the statistics for the resource.
 
-        Also, invalidate any caches.
+        If the save methods have calculated how the stats changed, only
+        the difference is applied. Also, invalidate any caches.
+        The content version is bumped by ``save2db`` after committing.
         """
-        invalidate_stats_cache(resource, language, user=user)
+        invalidate_stats_cache(
+            resource, language, user=user, stats_delta=self._stats_delta,
+            bump_version=False
+        )
 
     def _update_template(self, content):
         """Update the template of the resource.
@@ -660,6 +768,9 @@ class Handler(object):
         Saves parsed file contents to the database. duh
         """
         self._pre_save2db(is_source, user, overwrite_translations)
+        # The save methods may set this to the changes in the stats.
+        self._stats_delta = None
+        self.strings_deleted = 0
         try:
             if is_source:
                 (added, updated, deleted) = self._save_source(
@@ -686,6 +797,11 @@ class Handler(object):
             )
             if added + updated + deleted > 0:
                 self._handle_update_of_resource(user)
+            if self.import_digests is not None:
+                ImportDigest.objects.record(
+                    self.resource, self.language, is_source,
+                    *self.import_digests
+                )
         except Exception, e:
             logger.error("Unhandled exception: %s" % e, exc_info=True)
             transaction.rollback()
@@ -693,6 +809,12 @@ class Handler(object):
         finally:
             gc.collect()
         transaction.commit()
+        self.strings_deleted = deleted
+        # Bump after committing, so that no one caches the old content
+        # under the new version. Source pushes may change the template
+        # even when no string changed.
+        if is_source or added + updated + deleted > 0:
+            bump_content_version(self.resource, self.language)
         return (added, updated)
 
     ####################
@@ -29,6 +29,8 @@ from .compilation import SimpleCompilerFactory, PluralCompiler, \
         EmptyDecoratorBuilder, EmptyTranslationsBuilder
 from .resource_collections import StringSet, GenericTranslation
 from .utils.string_utils import split_by_newline
+from .utils.po_stream import iter_po_entries, PoTemplateWriter, \
+        PoSyntaxError
 
 
 Resource = get_model('resources', 'Resource')
@@ -87,35 +89,38 @@ class GettextHandler(SimpleCompilerFactory, Handler):
     HandlerCompileError = PoCompileError
 
     def _check_content(self, content):
-        try:
-            po = polib.pofile(content)
-        except IOError, e:
-            logger.warning("Parse error: %s" % e, exc_info=True)
-            raise PoParseError(unicode(e))
-
         # If file is empty, the method hangs so we should bail out.
         if not content:
             logger.warning("Pofile: File '%s' is empty." % self.filename)
             raise PoParseError("Uploaded file is empty.")
 
+        # Only the header is needed here. Any syntax errors in the rest
+        # of the file are found, while parsing it.
+        try:
+            header = iter_po_entries(content).next()
+        except PoSyntaxError, e:
+            logger.warning("Parse error: %s" % e, exc_info=True)
+            raise PoParseError(unicode(e))
+        except StopIteration:
+            header = None
+        metadata = header.metadata if header and header.is_header else {}
+
         # Msgfmt check
         if settings.FILECHECKS['POFILE_MSGFMT']:
             msgfmt_check(content, self.is_pot)
 
         # Check required header fields
         required_metadata = ['Content-Type', 'Content-Transfer-Encoding']
-        for metadata in required_metadata:
-            if not metadata in po.metadata:
+        for metadata_key in required_metadata:
+            if not metadata_key in metadata:
                 logger.warning(
-                    "pofile: Required metadata '%s' not found." % metadata
+                    "pofile: Required metadata '%s' not found." % metadata_key
                 )
                 raise PoParseError(
-                    "Uploaded file header doesn't have '%s' metadata!" % metadata
+                    "Uploaded file header doesn't have '%s' metadata!" %
+                    metadata_key
                 )
 
-        # Save to avoid parsing it again
-        self._po = po
-
     def __init__(self, filename=None, resource=None, language=None,
                  content=None):
         super(GettextHandler, self).__init__(
@@ -179,129 +184,143 @@ class GettextHandler(SimpleCompilerFactory, Handler):
     def _parse(self, is_source, lang_rules):
         """
         Parse a PO file and create a stringset with all PO entries in the file.
+
+        The file is read one entry at a time. For source files, the
+        template is written along, with the translations replaced by
+        the hashes of the entries.
         """
         if lang_rules:
             nplural = len(lang_rules)
         else:
             nplural = self.language.get_pluralrules_numbers()
 
-        if not hasattr(self, '_po'):
-            self.is_content_valid()
-
         self._parse_copyrights(self.content)
+        if is_source:
+            template = PoTemplateWriter(skip_line=self._is_copyright_line)
+        else:
+            template = None
         try:
-            self._po = polib.pofile(self.content)
-        except IOError, e:
+            for entry in iter_po_entries(self.content):
+                # skip the header and obsolete entries
+                if entry.is_header or entry.obsolete:
+                    if template is not None:
+                        template.write(entry)
+                    continue
+                for translation in self._entry_translations(
+                        entry, is_source, nplural):
+                    self.stringset.add(translation)
+                if template is not None:
+                    self._write_template_entry(template, entry)
+        except PoSyntaxError, e:
             raise PoParseError(unicode(e))
+        return template
 
-        for entry in self._po:
-            pluralized = False
-            same_nplural = True
-
-            # skip obsolete entries
-            if entry.obsolete:
-                continue
-
-            # treat fuzzy translation as nonexistent
-            if "fuzzy" in entry.flags:
-                if not is_source:
-                    if not entry.msgid_plural:
-                        self._add_suggestion_string(
-                            entry.msgid, entry.msgstr,
-                            context=escape_context(entry.msgctxt) or '',
-                            occurrences=self._serialize_occurrences(entry.occurrences)
-                        )
-                    continue
-                else:
-                    # Drop fuzzy flag from template
-                    entry.flags.remove("fuzzy")
-
-            if entry.msgid_plural:
-                pluralized = True
-                if is_source:
-                    nplural_file = len(entry.msgstr_plural.keys())
-                    if nplural_file != 2:
-                        raise PoParseError("Your source file is not a POT file and"
-                            " the translation file you're using has more"
-                            " than two plurals which is not supported."
-                        )
-                    # English plural rules
-                    messages = [(1, entry.msgstr_plural['0'] or entry.msgid),
-                                (5, entry.msgstr_plural['1'] or entry.msgid_plural)]
-                    plural_keys = [0,1]
-                else:
-                    message_keys = entry.msgstr_plural.keys()
-                    message_keys.sort()
-                    nplural_file = len(message_keys)
-                    messages = []
-                    if nplural:
-                        if len(nplural) != nplural_file:
-                            logger.warning("Passed plural rules has nplurals=%s"
-                                ", but '%s' file has nplurals=%s. String '%s'"
-                                "skipped." % (len(nplural), self.filename,
-                                nplural_file, entry.msgid))
-                            self._set_warning_message('nplural',
-                                ugettext("Pluralized entries of the file were "
-                                "skipped because the nplural of the upload file "
-                                "differs from the nplural (%s) for the given "
-                                "language available in the system." %
-                                len(nplural)))
-                            same_nplural = False
-                    else:
-                        same_nplural = False
+    def _entry_translations(self, entry, is_source, nplural):
+        """
+        Yield the translation strings of a PO entry.
 
-                    if not same_nplural:
-                        # Skip half translated plurals
-                        continue
-                        # plural_keys = message_keys
+        Fuzzy translations are added as suggestions instead.
+        """
+        pluralized = False
+        same_nplural = True
+
+        # treat fuzzy translation as nonexistent
+        if "fuzzy" in entry.flags:
+            if not is_source:
+                if not entry.msgid_plural:
+                    self._add_suggestion_string(
+                        entry.msgid, entry.msgstr,
+                        context=escape_context(entry.msgctxt) or '',
+                        occurrences=self._serialize_occurrences(entry.occurrences)
+                    )
+                return
+            else:
+                # Drop fuzzy flag from template
+                entry.flags.remove("fuzzy")
 
-                    for n, key in enumerate(message_keys):
-                        messages.append((nplural[n], entry.msgstr_plural['%s' % n]))
+        if entry.msgid_plural:
+            pluralized = True
+            if is_source:
+                nplural_file = len(entry.msgstr_plural.keys())
+                if nplural_file != 2:
+                    raise PoParseError("Your source file is not a POT file and"
+                        " the translation file you're using has more"
+                        " than two plurals which is not supported."
+                    )
+                # English plural rules
+                messages = [(1, entry.msgstr_plural['0'] or entry.msgid),
+                            (5, entry.msgstr_plural['1'] or entry.msgid_plural)]
             else:
-                # pass empty strings for non source files
-                if not is_source and entry.msgstr in ["", None]:
-                    continue
-                # Not pluralized, so no plural rules. Use 5 as 'other'.
-                if is_source:
-                    messages = [(5, entry.msgstr or entry.msgid)]
+                message_keys = entry.msgstr_plural.keys()
+                message_keys.sort()
+                nplural_file = len(message_keys)
+                messages = []
+                if nplural:
+                    if len(nplural) != nplural_file:
+                        logger.warning("Passed plural rules has nplurals=%s"
+                            ", but '%s' file has nplurals=%s. String '%s'"
+                            "skipped." % (len(nplural), self.filename,
+                            nplural_file, entry.msgid))
+                        self._set_warning_message('nplural',
+                            ugettext("Pluralized entries of the file were "
+                            "skipped because the nplural of the upload file "
+                            "differs from the nplural (%s) for the given "
+                            "language available in the system." %
+                            len(nplural)))
+                        same_nplural = False
                 else:
-                    messages = [(5, entry.msgstr)]
+                    same_nplural = False
 
-            # Add messages with the correct number (plural)
-            for number, msgstr in enumerate(messages):
-                if entry.comment:
-                    comment = entry.comment
-                else:
-                    comment = None
-                if entry.flags:
-                    flags = ', '.join( f for f in entry.flags)
-                else:
-                    flags = None
-                context=escape_context(entry.msgctxt) or ''
-                self._add_translation_string(
-                    entry.msgid, msgstr[1], context=context,
-                    occurrences=self._serialize_occurrences(entry.occurrences),
-                    rule=msgstr[0], pluralized=pluralized, comment=comment,
-                    flags=flags
-                )
+                if not same_nplural:
+                    # Skip half translated plurals
+                    return
 
+                for n, key in enumerate(message_keys):
+                    messages.append((nplural[n], entry.msgstr_plural['%s' % n]))
+        else:
+            # pass empty strings for non source files
+            if not is_source and entry.msgstr in ["", None]:
+                return
+            # Not pluralized, so no plural rules. Use 5 as 'other'.
             if is_source:
-                entry.msgstr = "%(hash)s_tr" % {
-                    'hash': hash_tag(entry.msgid, context)
-                }
-
-                if entry.msgid_plural:
-                    for n, rule in enumerate(plural_keys):
-                        entry.msgstr_plural['%s' % n] = (
-                            "%(hash)s_pl_%(key)s" % {
-                                'hash':hash_tag(entry.msgid, context),
-                                'key':n
-                            }
-                        )
-        return self._po
-
-    def _generate_template(self, po):
-        return self.get_po_contents(po)
+                messages = [(5, entry.msgstr or entry.msgid)]
+            else:
+                messages = [(5, entry.msgstr)]
+
+        # Add messages with the correct number (plural)
+        comment = entry.comment or None
+        if entry.flags:
+            flags = ', '.join(f for f in entry.flags)
+        else:
+            flags = None
+        context = escape_context(entry.msgctxt) or ''
+        occurrences = self._serialize_occurrences(entry.occurrences)
+        for rule, msgstr in messages:
+            yield GenericTranslation(
+                entry.msgid, msgstr, context=context,
+                occurrences=occurrences, rule=rule, pluralized=pluralized,
+                comment=comment, flags=flags
+            )
+
+    def _write_template_entry(self, template, entry):
+        """Write a source entry to the template with its hashes."""
+        string_hash = hash_tag(
+            entry.msgid, escape_context(entry.msgctxt) or ''
+        )
+        if entry.msgid_plural:
+            msgstr_plural = dict(
+                ('%s' % n, "%s_pl_%s" % (string_hash, n)) for n in range(2)
+            )
+            template.write(
+                entry, msgstr_plural=msgstr_plural, flags=entry.flags
+            )
+        else:
+            template.write(
+                entry, msgstr="%s_tr" % string_hash, flags=entry.flags
+            )
+
+    def _generate_template(self, template):
+        return template.getvalue().encode(self.default_encoding)
 
     def _parse_copyrights(self, content):
         """Read the copyrights (if any) from a gettext file."""
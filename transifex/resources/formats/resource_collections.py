@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """A series of classes that hold collections of the resources' app objects."""
 
+from collections import namedtuple
 from django.utils import simplejson as json
 from transifex.resources.models import SourceEntity, Translation
 from transifex.resources.formats.utils.hash_tag import hash_tag
@@ -147,6 +148,13 @@ class SourceEntityCollection(ResourceItems):
         return set(map(lambda se: se.id, self._items.itervalues()))
 
 
+# The fields of a translation, which the import of a file needs. Loading
+# these instead of Translation objects keeps the memory an import needs low.
+TranslationRow = namedtuple(
+    'TranslationRow', 'id source_entity_id rule string reviewed'
+)
+
+
 class TranslationCollection(ResourceItems):
     """A collection of translations."""
 
@@ -158,7 +166,7 @@ class TranslationCollection(ResourceItems):
             t: a translation (sort of) object.
             se_id: The id of the source entity of this translation.
         """
-        if isinstance(t, Translation):
+        if isinstance(t, (Translation, TranslationRow)):
             return self._create_unique_key(t.source_entity_id, t.rule)
         elif isinstance(t, tuple):
             return self._create_unique_key(t[0].id, t[1].rule)
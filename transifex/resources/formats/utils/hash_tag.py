@@ -70,3 +70,54 @@ class _HashRegex(object):
 
 hash_regex = _HashRegex()
 pluralized_hash_regex = _HashRegex(plurals=True)
+
+
+def index_hashes(text):
+    """Find the hashes in a template.
+
+    The index is stored along with the template, so that compiling it does
+    not need to search it for hashes again.
+
+    Args:
+        text: The template as a unicode string.
+    Returns:
+        A tuple with the length of the text and the list of the offsets
+        of the (plural or not) hashes in it.
+    """
+    return (
+        len(text), [m.start() for m in pluralized_hash_regex().finditer(text)]
+    )
+
+
+def replace_hashes(text, translations, offsets=None, regex=None):
+    """Replace the hashes in the text with their translations.
+
+    The text is split at the hashes and joined again with the translations
+    in their place. Hashes without a translation are kept as they are.
+
+    Args:
+        text: The text with the hashes.
+        translations: A dictionary from hashes to translations.
+        offsets: The offsets of the hashes in the text, if known.
+        regex: The regular expression to search for the hashes with, if
+            their offsets are not known.
+    Returns:
+        The text with the translations applied.
+    """
+    if offsets is None:
+        offsets = [m.start() for m in regex.finditer(text)]
+    get = translations.get
+    chunks = []
+    last = 0
+    for start in offsets:
+        # 32 hexadecimal digits followed by either _tr or _pl_N
+        if text[start + 33] in 'tT':
+            end = start + 35
+        else:
+            end = start + 37
+        key = text[start:end]
+        chunks.append(text[last:start])
+        chunks.append(get(key, key))
+        last = end
+    chunks.append(text[last:])
+    return ''.join(chunks)
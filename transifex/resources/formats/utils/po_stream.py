@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+
+"""
+Incremental reading and writing of gettext PO files.
+
+``polib.pofile`` builds an object for every entry of a file, before the
+first one can be used, and the only way to get the content back is to
+serialize the whole object graph again. For big files this means keeping
+several copies of the content in memory.
+
+Here, the content is read line by line and each entry is yielded as soon
+as it has been read. Entries keep their raw lines, so that a modified
+copy of the file (like the template of a resource) can be written
+progressively, one entry at a time.
+
+The grammar is the one of the state machine in polib, so that files are
+read the same way.
+"""
+
+from polib import escape, unescape
+from .string_utils import split_by_newline
+
+
+class PoSyntaxError(Exception):
+    pass
+
+
+# The states each symbol may follow. The symbols are:
+#   HE: a header comment, TC: a translator comment,
+#   GC: a generated comment, OC: a file:line occurrence,
+#   FL: a flags line, CT: a msgctxt, PC: a previous msgctxt,
+#   PM: a previous msgid, PP: a previous msgid_plural,
+#   MI: a msgid, MP: a msgid_plural, MS: a msgstr,
+#   MX: a msgstr plural, MC: a continuation line.
+_ALL_STATES = (
+    'ST', 'HE', 'GC', 'OC', 'FL', 'CT', 'PC', 'PM', 'PP', 'TC', 'MS', 'MP',
+    'MX', 'MI',
+)
+_TRANSITIONS = {
+    'TC': _ALL_STATES,
+    'GC': _ALL_STATES,
+    'OC': _ALL_STATES,
+    'FL': _ALL_STATES,
+    'PC': _ALL_STATES,
+    'PM': _ALL_STATES,
+    'PP': _ALL_STATES,
+    'CT': ('ST', 'HE', 'GC', 'OC', 'FL', 'TC', 'PC', 'PM', 'PP', 'MS', 'MX'),
+    'MI': ('ST', 'HE', 'GC', 'OC', 'FL', 'CT', 'TC', 'PC', 'PM', 'PP', 'MS',
+           'MX'),
+    'MP': ('TC', 'GC', 'PC', 'PM', 'PP', 'MI'),
+    'MS': ('MI', 'MP', 'TC'),
+    'MX': ('MI', 'MX', 'MP', 'TC'),
+    'MC': ('CT', 'MI', 'MP', 'MS', 'MX', 'PM', 'PP', 'PC'),
+}
+
+# Symbols which start a new entry, when they follow a msgstr
+_ENTRY_START = ('TC', 'GC', 'OC', 'FL', 'CT', 'PC', 'PM', 'PP', 'MI', )
+
+
+def _symbol_of(line):
+    """Return the symbol of a stripped line or None to ignore it."""
+    if line[:2] == '#:':
+        return 'OC'
+    elif line[:9] == 'msgctxt "':
+        return 'CT'
+    elif line[:7] == 'msgid "':
+        return 'MI'
+    elif line[:8] == 'msgstr "':
+        return 'MS'
+    elif line[:1] == '"' or line[:4] == '#| "':
+        return 'MC'
+    elif line[:14] == 'msgid_plural "':
+        return 'MP'
+    elif line[:7] == 'msgstr[':
+        return 'MX'
+    elif line[:3] == '#, ':
+        return 'FL'
+    elif line[:2] == '# ' or line == '#':
+        return 'TC'
+    elif line[:2] == '#.':
+        return 'GC'
+    elif line[:15] == '#| msgid_plural':
+        return 'PP'
+    elif line[:8] == '#| msgid':
+        return 'PM'
+    elif line[:10] == '#| msgctxt':
+        return 'PC'
+    return None
+
+
+class PoEntry(object):
+    """An entry of a PO file.
+
+    It has the attributes of ``polib.POEntry`` used by the handlers. The
+    raw lines of the entry are kept in ``lines`` as ``(field, line)``
+    tuples, where ``field`` is the name of the field the line belongs to
+    (e.g. ``msgstr`` or ``msgstr[1]``) or None.
+    """
+
+    def __init__(self):
+        self.msgctxt = None
+        self.msgid = u''
+        self.msgid_plural = u''
+        self.msgstr = u''
+        self.msgstr_plural = {}
+        self.comment = u''
+        self.tcomment = u''
+        self.occurrences = []
+        self.flags = []
+        self.obsolete = False
+        self.is_header = False
+        self.lines = []
+
+    @property
+    def metadata(self):
+        """Return the metadata of a header entry as a dictionary."""
+        metadata = {}
+        key = None
+        for msg in self.msgstr.splitlines():
+            try:
+                key, val = msg.split(':', 1)
+                metadata[key] = val.strip()
+            except ValueError:
+                if key is not None:
+                    metadata[key] += '\n' + msg.strip()
+        return metadata
+
+
+def iter_po_entries(content):
+    """Yield the entries of a PO file one at a time.
+
+    The first entry is marked as the header, if it has an empty msgid.
+    Comments at the start of the file belong to the first entry.
+
+    Args:
+        content: The content of the PO file as a unicode string.
+    Raises:
+        PoSyntaxError: The content is not a valid PO file.
+    """
+    entry = PoEntry()
+    state = 'ST'
+    field = None
+    first = True
+    for num, (index, raw_line) in enumerate(split_by_newline(content)):
+        raw_line = raw_line.rstrip('\r')
+        line = raw_line.strip()
+        if not line:
+            entry.lines.append((None, raw_line))
+            continue
+        obsolete = line[:3] == '#~ '
+        if obsolete:
+            line = line[3:]
+        symbol = _symbol_of(line)
+        if symbol is None:
+            entry.lines.append((None, raw_line))
+            continue
+        if symbol == 'TC' and state in ('ST', 'HE'):
+            symbol = 'HE'
+        elif state not in _TRANSITIONS[symbol]:
+            raise PoSyntaxError(
+                "Syntax error in po file (line %s)" % (num + 1)
+            )
+        if symbol in _ENTRY_START and state in ('MS', 'MX'):
+            if first:
+                entry.is_header = entry.msgid == u''
+                first = False
+            yield entry
+            entry = PoEntry()
+
+        try:
+            if symbol == 'HE':
+                field = None
+            elif symbol == 'TC':
+                field = 'tcomment'
+                if entry.tcomment:
+                    entry.tcomment += u'\n'
+                entry.tcomment += line[2:]
+            elif symbol == 'GC':
+                field = 'comment'
+                if entry.comment:
+                    entry.comment += u'\n'
+                entry.comment += line[3:]
+            elif symbol == 'OC':
+                field = 'occurrences'
+                for occurrence in line[3:].split():
+                    try:
+                        fil, lineno = occurrence.split(':')
+                        if not lineno.isdigit():
+                            fil = fil + lineno
+                            lineno = ''
+                        entry.occurrences.append((fil, lineno))
+                    except ValueError:
+                        entry.occurrences.append((occurrence, ''))
+            elif symbol == 'FL':
+                field = 'flags'
+                entry.flags += line[3:].split(', ')
+            elif symbol in ('PC', 'PM', 'PP'):
+                field = 'previous'
+            elif symbol == 'CT':
+                field = 'msgctxt'
+                entry.msgctxt = unescape(line[9:-1])
+            elif symbol == 'MI':
+                field = 'msgid'
+                entry.obsolete = obsolete
+                entry.msgid = unescape(line[7:-1])
+            elif symbol == 'MP':
+                field = 'msgid_plural'
+                entry.msgid_plural = unescape(line[14:-1])
+            elif symbol == 'MS':
+                field = 'msgstr'
+                entry.msgstr = unescape(line[8:-1])
+            elif symbol == 'MX':
+                end = line.index(']')
+                key = line[7:end]
+                field = 'msgstr[%s]' % key
+                entry.msgstr_plural[key] = unescape(line[end + 3:-1])
+            elif symbol == 'MC':
+                token = unescape(line[1:-1])
+                if state == 'CT':
+                    entry.msgctxt += token
+                elif state == 'MI':
+                    entry.msgid += token
+                elif state == 'MP':
+                    entry.msgid_plural += token
+                elif state == 'MS':
+                    entry.msgstr += token
+                elif state == 'MX':
+                    key = field[7:-1]
+                    entry.msgstr_plural[key] += token
+        except (IndexError, ValueError, KeyError):
+            raise PoSyntaxError(
+                "Syntax error in po file (line %s)" % (num + 1)
+            )
+        entry.lines.append((field, raw_line))
+        if symbol != 'MC':
+            state = symbol
+
+    if entry.lines:
+        if first:
+            entry.is_header = entry.msgid == u''
+        yield entry
+
+
+class PoTemplateWriter(object):
+    """Write a copy of a PO file, entry by entry.
+
+    The translations and the flags of an entry can be replaced, while
+    everything else is written as it was read.
+    """
+
+    def __init__(self, skip_line=None):
+        """Initializer.
+
+        Args:
+            skip_line: A function to check whether a line must be left
+                out of the copy.
+        """
+        self._chunks = []
+        self._skip_line = skip_line
+
+    def write(self, entry, msgstr=None, msgstr_plural=None, flags=None):
+        """Write an entry.
+
+        Args:
+            entry: The PoEntry to write.
+            msgstr: The msgstr to write instead of the original one.
+            msgstr_plural: A dictionary with the plural forms to write
+                instead of the original ones.
+            flags: The flags to write instead of the original ones.
+        """
+        lines = []
+        written = set()
+        for field, line in entry.lines:
+            if self._skip_line is not None and self._skip_line(line):
+                continue
+            if field == 'flags' and flags is not None:
+                if field not in written and flags:
+                    lines.append(u'#, ' + u', '.join(flags))
+            elif field == 'msgstr' and msgstr is not None:
+                if field not in written:
+                    lines.append(u'msgstr "%s"' % escape(msgstr))
+            elif field is not None and field.startswith('msgstr[') \
+                    and msgstr_plural is not None:
+                if field not in written:
+                    key = field[7:-1]
+                    lines.append(u'%s "%s"' % (
+                            field, escape(msgstr_plural.get(key, u''))
+                    ))
+            else:
+                lines.append(line)
+            written.add(field)
+        self._chunks.append(u'\n'.join(lines))
+
+    def getvalue(self):
+        """Return the content written so far as a unicode string."""
+        return u'\n'.join(self._chunks) + u'\n'
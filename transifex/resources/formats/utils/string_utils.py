@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from Levenshtein import distance
+from transifex.txcommon.log import logger
 
 def percent_diff(a, b):
     try:
@@ -10,6 +11,125 @@ def percent_diff(a, b):
         else: return 100
 
 
+# The length of the n-grams used to find similar strings
+NGRAM_LENGTH = 3
+
+
+def _ngrams(string, n=NGRAM_LENGTH):
+    """Return a dictionary with the number of times each n-gram appears in
+    the string.
+    """
+    ngrams = {}
+    for i in xrange(len(string) - n + 1):
+        gram = string[i:i + n]
+        ngrams[gram] = ngrams.get(gram, 0) + 1
+    return ngrams
+
+
+def _max_edits(length, max_distance):
+    """Return the largest Levenshtein distance, for which two strings, the
+    longest of which has the specified length, are similar, or -1.
+    """
+    if max_distance <= 0:
+        return -1
+    edits = min(length, int(max_distance * length / 100.0) + 1)
+    while edits >= 0 and 100 * edits / float(length) >= max_distance:
+        edits -= 1
+    return edits
+
+
+def find_similar_strings(originals, candidates, max_distance,
+                         max_comparisons=None):
+    """Find a similar candidate string for each of the original strings.
+
+    Two strings are similar, if their ``percent_diff`` is less than
+    ``max_distance``. Instead of comparing every original string with
+    every candidate, the candidates are indexed by length and by n-grams.
+
+    Each edit changes at most n of the n-grams of a string, so similar
+    strings must share a minimum number of n-grams (see "Approximate
+    string-matching with q-grams and maximal matches", Ukkonen, 1992). It
+    is enough then to look up the candidates which have one of the rarest
+    n-grams of an original string, leaving out as many of its n-grams as
+    they are less than that minimum. Candidates with a length too
+    different are skipped, too.
+
+    The function works on plain data, so that it can run in a worker
+    process.
+
+    Args:
+        originals: A list of (key, string) tuples.
+        candidates: A list of (key, string) tuples.
+        max_distance: The percentage of difference over which strings are
+            not similar.
+        max_comparisons: The maximum number of strings to compare, if any.
+    Returns:
+        A list of (original key, candidate key) tuples. The candidate for
+        each original string is the first similar one in the candidates.
+    """
+    n = NGRAM_LENGTH
+    by_length = {}
+    index = {}
+    for position, (key, string) in enumerate(candidates):
+        by_length.setdefault(len(string), []).append(position)
+        for gram in _ngrams(string, n):
+            index.setdefault(gram, []).append(position)
+
+    pairs = []
+    comparisons = 0
+    for key, string in originals:
+        length = len(string)
+        positions = set()
+        # The lengths of the candidates to look up by n-grams
+        lookup_lengths = set()
+        min_shared = None
+        for other_length, length_positions in by_length.iteritems():
+            longest = max(length, other_length)
+            if longest == 0:
+                positions.update(length_positions)
+                continue
+            # The distance is at least the difference of the lengths.
+            if 100 * abs(length - other_length) / float(longest) >= \
+                    max_distance:
+                continue
+            shared = longest - n + 1 - _max_edits(longest, max_distance) * n
+            if shared <= 0:
+                positions.update(length_positions)
+            else:
+                lookup_lengths.add(other_length)
+                if min_shared is None or shared < min_shared:
+                    min_shared = shared
+
+        if lookup_lengths:
+            ngrams = sorted(
+                _ngrams(string, n).iteritems(),
+                key=lambda item: len(index.get(item[0], ()))
+            )
+            remaining = sum(count for gram, count in ngrams)
+            for gram, count in ngrams:
+                if remaining < min_shared:
+                    break
+                remaining -= count
+                for position in index.get(gram, ()):
+                    if len(candidates[position][1]) in lookup_lengths:
+                        positions.add(position)
+
+        for position in sorted(positions):
+            if max_comparisons is not None and \
+                    comparisons >= max_comparisons:
+                logger.warning(
+                    "Stopped looking for similar strings after %s "
+                    "comparisons." % comparisons
+                )
+                return pairs
+            comparisons += 1
+            other_key, other_string = candidates[position]
+            if percent_diff(string, other_string) < max_distance:
+                pairs.append((key, other_key))
+                break
+    return pairs
+
+
 def split_by_newline(text, start=0):
     """Generator to split the text in newlines.
 
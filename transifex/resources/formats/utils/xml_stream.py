@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+"""
+Incremental processing of XML files, one unit at a time.
+
+``xml.dom.minidom.parseString`` builds the DOM of the whole file, before
+any of it can be used, and a DOM takes many times the size of the file in
+memory. The handlers, though, only look at one unit (e.g. a message of a
+Qt file or a trans-unit of a XLIFF file) at a time.
+
+Here, the file is read with the same expat builder minidom uses, so that
+the nodes are exactly the ones ``parseString`` would create. As soon as a
+unit has been read, it is passed to a callback, which may inspect and
+modify it. Then, it is serialized and replaced in the document by its XML
+text. This way, the document never keeps more than one unit as nodes and
+``toxml()`` still returns what it would return for the full DOM.
+"""
+
+from xml.dom import Node
+from xml.dom.expatbuilder import ExpatBuilderNS
+
+
+class SerializedNode(object):
+    """A node, which holds the serialized XML of a unit.
+
+    It is written as is by ``writexml`` and it is neither an element nor
+    a text node, so that neither ``getElementsByTagName`` returns it nor
+    the builder merges any text into it.
+    """
+
+    nodeType = Node.DOCUMENT_FRAGMENT_NODE
+    nodeName = '#serialized-unit'
+    attributes = None
+    parentNode = previousSibling = nextSibling = None
+
+    def __init__(self, xml):
+        self.xml = xml
+        self.childNodes = []
+
+    def writexml(self, writer, indent="", addindent="", newl=""):
+        writer.write(self.xml)
+
+    def toxml(self, encoding=None):
+        if encoding is None:
+            return self.xml
+        return self.xml.encode(encoding)
+
+    def cloneNode(self, deep):
+        return SerializedNode(self.xml)
+
+    def unlink(self):
+        self.parentNode = self.previousSibling = self.nextSibling = None
+
+
+class _UnitBuilder(ExpatBuilderNS):
+    """Build a DOM, which keeps the units in serialized form only."""
+
+    def __init__(self, is_unit, handle_unit, handle_start=None):
+        ExpatBuilderNS.__init__(self)
+        self._is_unit = is_unit
+        self._handle_unit = handle_unit
+        self._handle_start = handle_start
+
+    def start_element_handler(self, name, attributes):
+        ExpatBuilderNS.start_element_handler(self, name, attributes)
+        if self._handle_start is not None:
+            self._handle_start(self.curNode)
+
+    def end_element_handler(self, name):
+        node = self.curNode
+        ExpatBuilderNS.end_element_handler(self, name)
+        if self._is_unit(node):
+            self._handle_unit(node)
+            self._serialize(node)
+
+    def _serialize(self, node):
+        """Replace ``node`` with its serialized XML in its parent."""
+        serialized = SerializedNode(node.toxml())
+        parent = node.parentNode
+        children = parent.childNodes
+        index = len(children) - 1
+        while children[index] is not node:
+            index -= 1
+        children[index] = serialized
+        serialized.parentNode = parent
+        serialized.previousSibling = node.previousSibling
+        serialized.nextSibling = node.nextSibling
+        if serialized.previousSibling is not None:
+            serialized.previousSibling.nextSibling = serialized
+        if serialized.nextSibling is not None:
+            serialized.nextSibling.previousSibling = serialized
+        node.parentNode = node.previousSibling = node.nextSibling = None
+        node.unlink()
+
+
+def parse_units(content, is_unit, handle_unit, handle_start=None):
+    """Parse a XML file, handling its units as soon as they are read.
+
+    Units must not contain other units. Nodes outside the units are
+    kept in the document, so ``is_unit`` and ``handle_unit`` may look at
+    the ancestors of a unit and at the nodes before it.
+
+    Args:
+        content: The content of the file as a byte string.
+        is_unit: A function, which tells whether an element is a unit.
+            It is called when the element has been read.
+        handle_unit: A function called with each unit, when it has been
+            read.
+        handle_start: A function called with each element, after its
+            start tag has been read, if any.
+    Returns:
+        The document. Units are kept in it as SerializedNode objects.
+    Raises:
+        xml.parsers.expat.ExpatError: The content is not valid XML.
+        Any exception raised by the callbacks.
+    """
+    builder = _UnitBuilder(is_unit, handle_unit, handle_start)
+    return builder.parseString(content)
@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
 """
 Validator classes for individual strings.
+
+The validators find the same kinds of tokens (e.g. urls or printf
+specifiers) in a source string and its translation. The tokens of a string
+are extracted by a StringTokens object the first time a validator needs
+them, so that each regex runs at most once for each string. The
+ValidationEngine keeps the tokens of the source strings, so that many
+translations of the same strings can be validated in one go.
 """
 
 import re
@@ -14,6 +21,87 @@ class ValidationError(Exception):
     pass
 
 
+_urls_re = re.compile(
+    'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\),]|'
+    '(?:%[0-9a-fA-F][0-9a-fA-F]))+'
+)
+_emails_re = re.compile("([\w\-\.+]+@[\w\w\-]+\.+[\w\-]+)")
+_numbers_re = re.compile("[-+]?[0-9]*\.?[0-9]+")
+_printf_re = re.compile(
+    '%((?:(?P<ord>\d+)\$|\((?P<key>\w+)\))?(?P<fullvar>[+#-]*(?:\d+)?'\
+        '(?:\.\d+)?(hh\|h\|l\|ll)?(?P<type>[\w%])))'
+)
+
+
+class StringTokens(object):
+    """The tokens of a string, which the validators check.
+
+    Each kind of tokens is extracted the first time it is asked for and
+    kept for later validators.
+    """
+
+    def __init__(self, string):
+        self.string = string
+        self._tokens = {}
+
+    def _get(self, kind, extract):
+        try:
+            return self._tokens[kind]
+        except KeyError:
+            value = self._tokens[kind] = extract()
+            return value
+
+    @property
+    def unescaped(self):
+        """The string with the escape sequences replaced."""
+        return self._get('unescaped', lambda: unescape(self.string))
+
+    @property
+    def urls(self):
+        return self._get('urls', lambda: _urls_re.findall(self.unescaped))
+
+    @property
+    def emails(self):
+        return self._get(
+            'emails', lambda: _emails_re.findall(self.unescaped)
+        )
+
+    @property
+    def numbers(self):
+        return self._get(
+            'numbers', lambda: _numbers_re.findall(self.unescaped)
+        )
+
+    @property
+    def printf(self):
+        """A list of (expression, key, conversion specifier) tuples for
+        the printf-format specifiers of the unescaped string.
+        """
+        return self._get('printf', lambda: self._printf_of(self.unescaped))
+
+    @property
+    def raw_printf(self):
+        """The printf-format specifiers of the string, as is."""
+        return self._get('raw_printf', lambda: self._printf_of(self.string))
+
+    def bracket_count(self, c):
+        """Return the number of times the bracket ``c`` appears in the
+        unescaped string.
+        """
+        counts = self._get('brackets', dict)
+        try:
+            return counts[c]
+        except KeyError:
+            count = counts[c] = self.unescaped.count(c)
+            return count
+
+    def _printf_of(self, string):
+        return [
+            (m.group(0), m.group('key'), m.group('type'))
+            for m in _printf_re.finditer(string)
+        ]
+
+
 class BaseValidator(object):
     """Base class for validators.
 
@@ -40,6 +128,22 @@ class BaseValidator(object):
             return
         self.validate(old, new)
 
+    def check(self, old, new):
+        """Validate the tokens of the `new` translation against the
+        tokens of the `old` one.
+
+        Validators that find tokens in the strings override this method
+        instead of validate, so that the tokens of a string can be shared
+        with the rest of the validators (see ValidationEngine).
+
+        Args:
+            old: The StringTokens of the old translation.
+            new: The StringTokens of the new translation.
+        Raises:
+            A ValidationError with an appropriate message.
+        """
+        self.validate(old.string, new.string)
+
     def precondition(self):
         """Check whether this validator is applicable to the situation."""
         return True
@@ -47,7 +151,7 @@ class BaseValidator(object):
     def validate(self, old, new):
         """Actual validation method.
 
-        Subclasses must override this method.
+        Subclasses must override this method or check.
 
         Args:
             old: The old translation.
@@ -55,7 +159,8 @@ class BaseValidator(object):
         Raises:
             A ValidationError with an appropriate message.
         """
-        pass
+        if type(self).check.im_func is not BaseValidator.check.im_func:
+            self.check(StringTokens(old), StringTokens(new))
 
 
 class PluralOnlyValidator(BaseValidator):
@@ -72,9 +177,8 @@ class PluralOnlyValidator(BaseValidator):
 class SpaceValidator(BaseValidator):
     """Validator that checks if the translation is just spaces."""
 
-    def validate(self, old, new):
-        new = unescape(new)
-        if len(new.strip()) == 0:
+    def check(self, old, new):
+        if len(new.unescaped.strip()) == 0:
             raise ValidationError(
                 _("Translation string only contains whitespaces.")
             )
@@ -86,11 +190,9 @@ class MatchingBracketsValidator(BaseValidator):
     """
     bracket_chars = '[{()}]'
 
-    def validate(self, old, new):
-        old = unescape(old)
-        new = unescape(new)
+    def check(self, old, new):
         for c in self.bracket_chars:
-            if new.count(c) != old.count(c):
+            if new.bracket_count(c) != old.bracket_count(c):
                 raise ValidationError(
                     _("Translation string doesn't contain the same "
                       "number of '%s' as the source string." % c)
@@ -102,15 +204,11 @@ class UrlsValidator(BaseValidator):
     translation.
     """
 
-    urls = re.compile('http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\),]|'
-                      '(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-    )
+    urls = _urls_re
 
-    def validate(self, old, new):
-        old = unescape(old)
-        new = unescape(new)
-        for url in self.urls.findall(old):
-            if url not in new:
+    def check(self, old, new):
+        for url in old.urls:
+            if url not in new.unescaped:
                 raise ValidationError(
                     _("The following url is either missing from the"
                       " translation or has been translated: '%s'." % url)
@@ -122,13 +220,11 @@ class EmailAddressesValidator(BaseValidator):
     the translation.
     """
 
-    emails = re.compile("([\w\-\.+]+@[\w\w\-]+\.+[\w\-]+)")
+    emails = _emails_re
 
-    def validate(self, old, new):
-        old = unescape(old)
-        new = unescape(new)
-        for email in self.emails.findall(old):
-            if email not in new:
+    def check(self, old, new):
+        for email in old.emails:
+            if email not in new.unescaped:
                 raise ValidationError(
                     _("The following email is either missing from the"
                       " translation or has been translated: '%s'." % email)
@@ -140,10 +236,9 @@ class NewLineAtBeginningValidator(BaseValidator):
     has been preserved.
     """
 
-    def validate(self, old, new):
-        old = unescape(old)
-        old_has_newline = old[0] == '\n'
-        new_has_newline = new[0] == '\n'
+    def check(self, old, new):
+        old_has_newline = old.unescaped[0] == '\n'
+        new_has_newline = new.string[0] == '\n'
         if old_has_newline != new_has_newline:
             if old_has_newline:
                 msg = _("Translation must start with a newline (\\n)")
@@ -157,11 +252,9 @@ class NewLineAtEndValidator(BaseValidator):
     preserved.
     """
 
-    def validate(self, old, new):
-        old = unescape(old)
-        new = unescape(new)
-        old_has_newline = old[-1] == '\n'
-        new_has_newline = new[-1] == '\n'
+    def check(self, old, new):
+        old_has_newline = old.unescaped[-1] == '\n'
+        new_has_newline = new.unescaped[-1] == '\n'
         if old_has_newline != new_has_newline:
             if old_has_newline:
                 msg = _("Translation must end with a newline (\\n)")
@@ -175,12 +268,11 @@ class NumbersValidator(BaseValidator):
     translation.
     """
 
-    numbers = re.compile("[-+]?[0-9]*\.?[0-9]+")
+    numbers = _numbers_re
 
-    def validate(self, old, new):
-        old = unescape(old)
-        new = unescape(new)
-        for num in self.numbers.findall(old):
+    def check(self, old, new):
+        new = new.unescaped
+        for num in old.numbers:
             if num not in new:
                 num = num.replace('.', ',', 1)
                 if num not in new:
@@ -197,22 +289,15 @@ class PrintfFormatNumberValidator(BaseValidator):
     This is valid only if the plurals in the two languages are the same.
     """
 
-    printf_re = re.compile(
-        '%((?:(?P<ord>\d+)\$|\((?P<key>\w+)\))?(?P<fullvar>[+#-]*(?:\d+)?'\
-            '(?:\.\d+)?(hh\|h\|l\|ll)?(?P<type>[\w%])))'
-    )
+    printf_re = _printf_re
 
     def precondition(self):
         """Check if the number of plurals in the two languages is the same."""
         return self.tlang.nplurals == self.slang.nplurals and \
                 super(PrintfFormatNumberValidator, self).precondition()
 
-    def validate(self, old, new):
-        old = unescape(old)
-        new = unescape(new)
-        old_matches = list(self.printf_re.finditer(old))
-        new_matches = list(self.printf_re.finditer(new))
-        if len(old_matches) != len(new_matches):
+    def check(self, old, new):
+        if len(old.printf) != len(new.printf):
             raise ValidationError(
                 _('The number of arguments seems to differ '
                   'between the source string and the translation.')
@@ -234,12 +319,9 @@ class PrintfFormatSourceValidator(BaseValidator):
     are preserved in the translation.
     """
 
-    printf_re = re.compile(
-        '%((?:(?P<ord>\d+)\$|\((?P<key>\w+)\))?(?P<fullvar>[+#-]*(?:\d+)?'\
-            '(?:\.\d+)?(hh\|h\|l\|ll)?(?P<type>[\w%])))'
-    )
+    printf_re = _printf_re
 
-    def validate(self, source_trans, target_trans):
+    def check(self, source_trans, target_trans):
         """Check, if all printf-format expressions in the source translation
         are in the target translation, too.
 
@@ -256,15 +338,12 @@ class PrintfFormatSourceValidator(BaseValidator):
         conditions is not met.
 
         Args:
-            source_trans: The source translation.
-            target_trans: The target translation.
+            source_trans: The StringTokens of the source translation.
+            target_trans: The StringTokens of the target translation.
         Raises:
             ValidationError, in case the translation is not valid.
         """
-        source_trans = unescape(source_trans)
-        target_trans = unescape(target_trans)
-        source_matches = list(self.printf_re.finditer(source_trans))
-        target_matches = list(self.printf_re.finditer(target_trans))
+        target_matches = target_trans.printf
 
         # We could use just one list comprehension:
         #
@@ -279,21 +358,19 @@ class PrintfFormatSourceValidator(BaseValidator):
         # but that would probably be less efficient, since target_matches
         # should ususally have 0 - 5 elements, and much less readable.
         # So, we do it in two steps.
-        target_specifiers = [pat.group('type') for pat in target_matches]
-        target_keys = [pattern.group('key') for pattern in target_matches]
+        target_specifiers = [type_ for expr, key, type_ in target_matches]
+        target_keys = [key for expr, key, type_ in target_matches]
 
-        for pattern in source_matches:
-            key = pattern.group('key')
+        for expression, key, conversion_specifier in source_trans.printf:
             if key not in target_keys:
                 msg = "The expression '%s' is not present in the translation."
-                raise ValidationError( _(msg  % pattern.group(0)))
+                raise ValidationError( _(msg  % expression))
 
-            conversion_specifier = pattern.group('type')
             try:
                 target_specifiers.remove(conversion_specifier)
             except ValueError:
                 msg = "The expression '%s' is not present in the translation."
-                raise ValidationError( _(msg  % pattern.group(0)))
+                raise ValidationError( _(msg  % expression))
 
 
 class PrintfFormatPluralizedSourceValidator(PluralOnlyValidator, \
@@ -311,12 +388,9 @@ class PrintfFormatTranslationValidator(BaseValidator):
     string show up in the source string.
     """
 
-    printf_re = re.compile(
-        '%((?:(?P<ord>\d+)\$|\((?P<key>\w+)\))?(?P<fullvar>[+#-]*(?:\d+)?'\
-            '(?:\.\d+)?(hh\|h\|l\|ll)?(?P<type>[\w%])))'
-    )
+    printf_re = _printf_re
 
-    def validate(self, source_trans, target_trans):
+    def check(self, source_trans, target_trans):
         """Check, if all printf-format expressions in the target translation
         are in the source translation, too.
 
@@ -333,31 +407,27 @@ class PrintfFormatTranslationValidator(BaseValidator):
         conditions is not met.
 
         Args:
-            source_trans: The source translation.
-            target_trans: The target translation.
+            source_trans: The StringTokens of the source translation.
+            target_trans: The StringTokens of the target translation.
         Raises:
             ValidationError, in case the translation is not valid.
         """
-        source_matches = list(self.printf_re.finditer(source_trans))
-        target_trans_matches = list(self.printf_re.finditer(target_trans))
-
+        source_matches = source_trans.raw_printf
 
         # Look at PrintfFormatSourceValidator for a comment on optimizing this
-        source_conv_specifiers = [pat.group('type') for pat in source_matches]
-        source_keys = [pattern.group('key') for pattern in source_matches]
+        source_conv_specifiers = [type_ for expr, key, type_ in source_matches]
+        source_keys = [key for expr, key, type_ in source_matches]
 
-        for pattern in target_trans_matches:
-            key = pattern.group('key')
+        for expression, key, conversion_specifier in target_trans.raw_printf:
             if key not in source_keys:
                 msg = "The expression '%s' is not present in the source_string."
-                raise ValidationError( _(msg  % pattern.group(0)))
+                raise ValidationError( _(msg  % expression))
 
-            conversion_specifier = pattern.group('type')
             try:
                 source_conv_specifiers.remove(conversion_specifier)
             except ValueError:
                 msg = "The expression '%s' is not present in the source string."
-                raise ValidationError( _(msg  % pattern.group(0)))
+                raise ValidationError( _(msg  % expression))
 
 
 def create_error_validators(i18n_type):
@@ -387,3 +457,106 @@ def _create_validators(i18n_type, type_):
     else:
         key = 'DEFAULT'
     return (import_to_python(klass) for klass in type_validators[key])
+
+
+class ValidationEngine(object):
+    """Validate many translations against their source strings.
+
+    The validators of the i18n type are imported once and created once for
+    each plural rule, leaving out those that do not apply. The tokens of
+    each source string are extracted once and kept, so that all
+    translations of a file or of a Lotte push can be validated in one call.
+    """
+
+    def __init__(self, i18n_type, source_language=None, target_language=None):
+        """Initializer.
+
+        Args:
+            i18n_type: The i18n type of the resource.
+            source_language: The source language of the resource.
+            target_language: The language of the translations.
+        """
+        self.slang = source_language
+        self.tlang = target_language
+        self._error_classes = list(create_error_validators(i18n_type))
+        self._warning_classes = list(create_warning_validators(i18n_type))
+        self._validators = {}
+        self._source_tokens = {}
+
+    def _validators_for(self, rule):
+        """Return the error and the warning validators for a plural rule."""
+        try:
+            return self._validators[rule]
+        except KeyError:
+            validators = self._validators[rule] = tuple(
+                [v for v in (
+                    klass(self.slang, self.tlang, rule) for klass in classes
+                ) if v.precondition()]
+                for classes in (self._error_classes, self._warning_classes)
+            )
+            return validators
+
+    def source_tokens(self, source_string, key=None):
+        """Return the StringTokens of a source string.
+
+        Args:
+            source_string: The source string.
+            key: The key to keep the tokens with, like the id of the
+                source entity and the rule. By default, the string itself.
+        """
+        if key is None:
+            key = source_string
+        try:
+            return self._source_tokens[key]
+        except KeyError:
+            tokens = self._source_tokens[key] = StringTokens(source_string)
+            return tokens
+
+    def validate(self, source_string, translation, rule=5, key=None):
+        """Validate a translation.
+
+        Args:
+            source_string: The source string.
+            translation: The translation string.
+            rule: The plural rule of the translation.
+            key: The key of the source string (see source_tokens).
+        Returns:
+            A list with the warnings for the translation.
+        Raises:
+            A ValidationError for the first error found.
+        """
+        # No checks are needed for deleted translations
+        if not translation:
+            return []
+        old = self.source_tokens(source_string, key)
+        new = StringTokens(translation)
+        error_validators, warning_validators = self._validators_for(rule)
+        for v in error_validators:
+            v.check(old, new)
+        warnings = []
+        for v in warning_validators:
+            try:
+                v.check(old, new)
+            except ValidationError, e:
+                warnings.append(e.message)
+        return warnings
+
+    def validate_many(self, translations):
+        """Validate a batch of translations.
+
+        Args:
+            translations: An iterable of (source_string, translation, rule,
+                key) tuples, like the arguments of validate.
+        Returns:
+            A list with an (error, warnings) tuple for each translation,
+            where error is the message of the error found or None.
+        """
+        results = []
+        for source_string, translation, rule, key in translations:
+            try:
+                results.append(
+                    (None, self.validate(source_string, translation, rule, key))
+                )
+            except ValidationError, e:
+                results.append((e.message, []))
+        return results
@@ -23,7 +23,8 @@ from .compilation import PluralCompiler, SimpleCompilerFactory
 from .resource_collections import StringSet, GenericTranslation
 from .utils.decorators import *
 from .utils.hash_tag import hash_tag, escape_context, hash_regex,\
-        pluralized_hash_regex, _HashRegex
+        pluralized_hash_regex, replace_hashes, _HashRegex
+from .utils.xml_stream import parse_units
 
 # Resources models
 Resource = get_model('resources', 'Resource')
@@ -60,9 +61,9 @@ class XliffCompiler(PluralCompiler):
     def _apply_translations(self, translations, text):
         if isinstance(text, str):
             text = text.decode('UTF-8')
-        regex = pluralized_hash_regex()
-        return regex.sub(
-            lambda m: translations.get(m.group(0), m.group(0)), text
+        return replace_hashes(
+            text, translations, self._hash_offsets(text),
+            pluralized_hash_regex()
         )
 
     def _update_plural_hashes(self, translations, content):
@@ -70,75 +71,89 @@ class XliffCompiler(PluralCompiler):
         i18n_type = self.resource.i18n_type
         if isinstance(content, unicode):
             content = content.encode('utf-8')
-        doc = xml.dom.minidom.parseString(content)
-        root = doc.documentElement
+        if self.language == self.resource.source_language:
+            return content
+        # Only the plural groups are needed as DOM trees.
+        doc = parse_units(content, self._is_plural_group,
+                self._update_plural_group)
+        content = doc.toxml()
+        return content
+
+    def _is_plural_group(self, node):
+        return node.localName == "group" and\
+                node.attributes.has_key('restype') and \
+                node.attributes['restype'].value == "x-gettext-plurals"
+
+    def _update_plural_group(self, group_node):
+        """Add the trans-units of the target language to a plural group."""
         source_language = self.resource.source_language
         rules = self.language.get_pluralrules_numbers()
         source_rules = source_language.get_pluralrules_numbers()
-        if self.language == self.resource.source_language:
-            return content
-        for group_node in root.getElementsByTagName("group"):
-            if group_node.attributes.has_key('restype') and \
-                    group_node.attributes['restype'].value == "x-gettext-plurals":
-                trans_unit_nodes = group_node.getElementsByTagName("trans-unit")
+        trans_unit_nodes = group_node.getElementsByTagName("trans-unit")
+        if not trans_unit_nodes:
+            return
+        cont = False
+        for n, node in enumerate(trans_unit_nodes):
+            node_id = node.attributes.get('id') and\
+                    node.attributes.get('id').value
+            try:
+                target = self.getElementByTagName(node, 'target')
+            except XliffCompileError, e:
+                cont = True
+                break
+            if target:
+                target_text = target.firstChild.data or ''
+                if not plural_regex.match(target_text):
+                    cont = True
+                    break
+            if n == 0:
+                id_text = node_id[:-3]
             else:
-                continue
-            cont = False
-            for n, node in enumerate(trans_unit_nodes):
-                node_id = node.attributes.get('id') and\
-                        node.attributes.get('id').value
-                try:
-                    target = self.getElementByTagName(node, 'target')
-                except XliffCompileError, e:
+                if id_text != node_id[:-3]:
                     cont = True
                     break
-                if target:
-                    target_text = target.firstChild.data or ''
-                    if not plural_regex.match(target_text):
-                        cont = True
-                        break
-                if n == 0:
-                    id_text = node_id[:-3]
-                else:
-                    if id_text != node_id[:-3]:
-                        cont = True
+        if n != len(source_rules) - 1:
+            return
+        if cont:
+            return
+        for count,rule in enumerate(rules):
+            index = self.get_plural_index(count, rule)
+            if rule in source_rules:
+                clone = trans_unit_nodes[source_rules.index(rule)
+                        ]
+            else:
+                clone = trans_unit_nodes[source_rules.index(5)
+                        ].cloneNode(deep=True)
+            target = self.getElementByTagName(clone, "target")
+            clone.setAttribute("id", id_text + '[%d]'%count)
+            target.firstChild.data = target.firstChild.data[:-1] +\
+                    '%d' % index
+            if rule not in source_rules:
+                for n, r in enumerate(source_rules):
+                    if rule < r:
                         break
-            if n != len(source_rules) - 1:
-                continue
-            if cont:
-                continue
-            for count,rule in enumerate(rules):
-                index = self.get_plural_index(count, rule)
-                if rule in source_rules:
-                    clone = trans_unit_nodes[source_rules.index(rule)
-                            ]
-                else:
-                    clone = trans_unit_nodes[source_rules.index(5)
-                            ].cloneNode(deep=True)
-                target = self.getElementByTagName(clone, "target")
-                clone.setAttribute("id", id_text + '[%d]'%count)
-                target.firstChild.data = target.firstChild.data[:-1] +\
-                        '%d' % index
-                if rule not in source_rules:
-                    for n, r in enumerate(source_rules):
-                        if rule < r:
-                            break
-                    indent_node = trans_unit_nodes[
-                            n].previousSibling.cloneNode(deep=True)
-                    group_node.insertBefore(
-                        indent_node, trans_unit_nodes[n].previousSibling)
-                    group_node.insertBefore(
-                            clone, trans_unit_nodes[n].previousSibling)
-        content = doc.toxml()
-        return content
+                indent_node = trans_unit_nodes[
+                        n].previousSibling.cloneNode(deep=True)
+                group_node.insertBefore(
+                    indent_node, trans_unit_nodes[n].previousSibling)
+                group_node.insertBefore(
+                        clone, trans_unit_nodes[n].previousSibling)
 
     def _post_compile(self):
         super(XliffCompiler, self)._post_compile()
-        doc = xml.dom.minidom.parseString(
-            self.compiled_template.encode('UTF-8')
+        # Targets are removed one trans-unit at a time, so that the
+        # compiled file is never kept as a whole DOM tree.
+        doc = parse_units(
+            self.compiled_template.encode('UTF-8'),
+            lambda node: node.localName == "trans-unit",
+            self._remove_empty_targets
         )
-        root = doc.documentElement
-        for node in root.getElementsByTagName("target"):
+        self._remove_empty_targets(doc.documentElement)
+        self.compiled_template = doc.toxml()
+
+    def _remove_empty_targets(self, element):
+        """Remove the empty <target> nodes under ``element``."""
+        for node in element.getElementsByTagName("target"):
             value = ""
             for child in node.childNodes:
                 value += child.toxml()
@@ -146,7 +161,6 @@ class XliffCompiler(PluralCompiler):
                 parent = node.parentNode
                 parent.removeChild(node.previousSibling)
                 parent.removeChild(node)
-        self.compiled_template = doc.toxml()
 
 
 class XliffHandler(SimpleCompilerFactory, Handler):
@@ -182,30 +196,41 @@ class XliffHandler(SimpleCompilerFactory, Handler):
         """
         Parses XLIFF file and exports all entries as GenericTranslations.
         """
-        resource = self.resource
-
-        context = []
         content = self.content.encode('utf-8')
+        # Each group or trans-unit of a body is parsed as soon as it has
+        # been read, so that only one of them is kept as a DOM tree.
         try:
-            self.doc = xml.dom.minidom.parseString(content)
-            root = self.doc.documentElement
+            self.doc = parse_units(content, self._is_body_unit,
+                    lambda node: self.parse_tag_body_unit(node, is_source),
+                    lambda node: self.parse_start_tag(node, is_source))
+        except Exception, e:
+            raise self.HandlerParseError(e.message)
+
+        return self.doc.toxml()
 
+    def _is_body_unit(self, node):
+        parent = node.parentNode
+        return node.localName in ("group", "trans-unit") and \
+                parent.nodeType == parent.ELEMENT_NODE and \
+                parent.localName == "body" and \
+                parent.parentNode.parentNode is node.ownerDocument.documentElement and \
+                parent.parentNode.localName == "file"
+
+    def parse_start_tag(self, node, is_source=False):
+        """Check the root and the <file> elements, when they start."""
+        root = node.ownerDocument.documentElement
+        if node is root:
+            self.doc = node.ownerDocument
             if root.tagName != "xliff":
                 raise XliffParseError(_("Root element is not 'xliff'"))
             if not root.attributes.get('version', None):
                 raise self.HandlerParseError(_("Root element 'xliff' "\
                         "does not have a 'version' attribute"))
-            for node in root.childNodes:
-                if node.nodeType == node.ELEMENT_NODE and \
-                        node.localName == "file":
-                    self.parse_tag_file(node, is_source)
-        except Exception, e:
-            raise self.HandlerParseError(e.message)
-
-        return self.doc.toxml()
+        elif node.parentNode is root and node.localName == "file":
+            self.parse_tag_file(node, is_source)
 
     def parse_tag_file(self, file_node, is_source=False):
-        self.trans_unit_id_list = []
+        self.trans_unit_id_list = set()
         xliff_source_language_code = file_node.attributes.get(
                 'source-language').value
         source_language = Language.objects.by_code_or_alias_or_none(
@@ -233,20 +258,18 @@ class XliffHandler(SimpleCompilerFactory, Handler):
                     'target_lang_code': xliff_target_language_code,
                     'translation_language': self.language
                 })
-        context = [original, source_language, datatype]
-        for node in file_node.childNodes:
-            if node.nodeType == node.ELEMENT_NODE and node.localName == "body":
-                self.parse_tag_body(node, is_source, context=copy(context))
-
-    def parse_tag_body(self, body_node, is_source=False, context=[]):
-        for node in body_node.childNodes:
-            if node.nodeType == node.ELEMENT_NODE and node.localName == "group":
-                self.parse_tag_group(node, is_source, context=copy(context),
-                        occurrence=[])
-            if node.nodeType == node.ELEMENT_NODE and node.localName == "trans-unit":
-                self.parse_tag_trans_unit(node, is_source, context=copy(context),
-                        occurrence=[])
-            # there is no way to handle bin-unit in transifex
+        self.file_context = [original, source_language, datatype]
+
+    def parse_tag_body_unit(self, node, is_source=False):
+        """Parse a group or a trans-unit of the <body> of the current file."""
+        context = self.file_context
+        if node.localName == "group":
+            self.parse_tag_group(node, is_source, context=copy(context),
+                    occurrence=[])
+        if node.localName == "trans-unit":
+            self.parse_tag_trans_unit(node, is_source, context=copy(context),
+                    occurrence=[])
+        # there is no way to handle bin-unit in transifex
 
     def parse_tag_group(self, group_node, is_source=False, context=[],
             comment=[], occurrence=[]):
@@ -321,7 +344,7 @@ class XliffHandler(SimpleCompilerFactory, Handler):
         if trans_unit_id in self.trans_unit_id_list:
             return
         else:
-            self.trans_unit_id_list.append(trans_unit_id)
+            self.trans_unit_id_list.add(trans_unit_id)
         source_node = trans_unit_node.getElementsByTagName("source")[0]
         if len(source_node.childNodes)>1:
             for i in source_node.childNodes:
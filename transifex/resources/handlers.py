@@ -5,11 +5,14 @@ from django.db.models.signals import pre_save
 from transifex.actionlog.models import action_logging
 from transifex.projects.signals import post_resource_save, post_resource_delete
 from transifex.txcommon import notifications as txnotification
-from transifex.resources.utils import invalidate_template_cache
+from transifex.resources.utils import invalidate_resource_templates
+from transifex.txcommon.cache import bump_generation
+from transifex.resources.cache import bump_content_version
 from transifex.teams.models import Team
 
 RLStats = get_model('resources', 'RLStats')
 Translation = get_model('resources', 'Translation')
+ImportDigest = get_model('resources', 'ImportDigest')
 
 def get_project_teams(project):
     if project.outsource:
@@ -21,6 +24,16 @@ def invalidate_stats_cache(resource, language, **kwargs):
     """
     Invalidate template caches and handle the updating of the persistent
     stats.
+
+    Callers that know how the translations changed can pass a
+    ``stats_delta`` dictionary with the changes in the translated,
+    reviewed and translated_wordcount counters. The stats are then
+    adjusted by those, instead of being recalculated. This is not
+    supported for the source language.
+
+    Callers that run in a transaction pass ``bump_version=False`` and call
+    ``bump_content_version`` after committing, so that no one caches the
+    old content of the compiled files under the new version.
     """
 
     is_source = False
@@ -28,67 +41,60 @@ def invalidate_stats_cache(resource, language, **kwargs):
         is_source = True
         language = resource.source_language
 
-    team_languages = get_project_teams(resource.project).values_list(
-            'language', flat=True)
+    team_languages = set(get_project_teams(resource.project).values_list(
+            'language', flat=True))
 
     if not is_source:
         # Get or create new RLStat object
         rl, created = RLStats.objects.get_or_create(resource=resource,
             language=language)
-        rl.update( kwargs['user'] if kwargs.has_key('user') else None)
+        user = kwargs.get('user', None)
+        stats_delta = kwargs.get('stats_delta', None)
+        # A newly created object has just been calculated in full.
+        if stats_delta is not None and not created:
+            rl.apply_delta(user=user, **stats_delta)
+        else:
+            rl.update(user)
         # Check to see if the lang has zero translations and is not a team
         # lang. If yes, delete RLStats object
-        if rl.translated == 0 and rl.language.id not in\
+        if rl.translated == 0 and rl.language_id not in\
           team_languages:
             rl.delete()
     else:
         rl, created = RLStats.objects.get_or_create(resource=resource,
             language=language)
         # Source file was updated. Update all language statistics
-        stats = RLStats.objects.filter(resource=resource)
-        for s in stats:
-            s.update(kwargs['user'] if kwargs.has_key('user') else None)
-            if s.translated == 0 and s.language.id not in\
-              team_languages:
-                s.delete()
+        stats = RLStats.update_by_resource(resource, kwargs.get('user', None))
+        obsolete_ids = [
+            s.id for s in stats
+            if s.translated == 0 and s.language_id not in team_languages
+        ]
+        if obsolete_ids:
+            RLStats.objects.filter(id__in=obsolete_ids).delete()
 
         # Update resource wordcount and total entities
         resource.update_total_entities(save=False)
         resource.update_wordcount(save=True)
 
+    # The next import of the same file is not a no-op anymore.
+    ImportDigest.objects.invalidate(resource, language)
+    if kwargs.get('bump_version', True):
+        bump_content_version(resource, language)
     invalidate_object_templates(resource, language, **kwargs)
 
 def invalidate_object_templates(resource, language, **kwargs):
     """
     Invalidate all template level caches related to a specific object
     """
-
+    # Template lvl cache for resource details
     if language == resource.source_language:
-        langs = resource.available_languages
+        invalidate_resource_templates(resource)
     else:
-        langs = [language]
-
-    # Template lvl cache for resource details
-    invalidate_template_cache("resource_details",
-        resource.project.slug, resource.slug)
-
-    invalidate_template_cache("project_resource_details",
-        resource.project.slug, resource.slug)
-
-    # Number of source strings in resource
-    for lang in langs:
-        invalidate_template_cache("team_details",
-            resource.project.slug, lang.code, resource.id)
-
-        for rel in resource.project.releases.all():
-            # Template lvl cache for release details
-            invalidate_template_cache("release_details",
-                rel.id, lang.id)
+        invalidate_resource_templates(resource, language)
 
-        # Template lvl cache for resource details
-        invalidate_template_cache("resource_details_lang",
-            resource.project.slug, resource.slug,
-             lang.code)
+    for rel_id in resource.project.releases.values_list('id', flat=True):
+        # Template lvl cache for release details
+        bump_generation("release", rel_id)
 
 def on_resource_save(sender, instance, created, user, **kwargs):
     """
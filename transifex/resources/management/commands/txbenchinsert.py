@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import sys
+import time
+from optparse import make_option
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import get_model
+from djangobulk.bulk import insert_many
+from transifex.txcommon.db.bulk import BulkLoader, CopyBulkLoader
+
+
+def _loaders():
+    """Return the (name, function) pairs of the loaders to compare."""
+    loaders = [
+        ('insert_many', insert_many),
+        ('executemany', BulkLoader(connection).load),
+    ]
+    if connection.vendor == 'postgresql':
+        loaders.append(('copy', CopyBulkLoader(connection).load))
+    return loaders
+
+
+class Command(BaseCommand):
+    """
+    Compare the ways to insert translations in bulk.
+    """
+    help = "Benchmark the bulk insertion of translations with djangobulk,"\
+           " with executemany and, on PostgreSQL, with COPY. Each run"\
+           " inserts the translations of a temporary resource in the given"\
+           " project and is rolled back, so the database is left unchanged."
+    args = "<project_slug>"
+
+    option_list = BaseCommand.option_list + (
+        make_option('--translations', action='store', type='int',
+            dest='translations', default=100000,
+            help='The number of translations to insert (default 100000).'),
+    )
+
+    can_import_settings = True
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError("Please give the slug of a project.")
+        Project = get_model('projects', 'Project')
+        try:
+            project = Project.objects.get(slug=args[0])
+        except Project.DoesNotExist:
+            raise CommandError("Unknown project %s" % args[0])
+        count = options['translations']
+
+        for name, load in _loaders():
+            elapsed = self._run(project, count, load)
+            sys.stdout.write("%-12s %8.2fs %10.0f translations/s\n" % (
+                name, elapsed, count / max(elapsed, 0.001)
+            ))
+
+    @transaction.commit_manually
+    def _run(self, project, count, load):
+        """Insert ``count`` translations with ``load`` and roll back.
+
+        Returns:
+            The seconds the insertion took.
+        """
+        Resource = get_model('resources', 'Resource')
+        SourceEntity = get_model('resources', 'SourceEntity')
+        Translation = get_model('resources', 'Translation')
+        try:
+            resource = Resource.objects.create(
+                project=project, slug='txbenchinsert', name='txbenchinsert',
+                source_language=project.source_language, i18n_type='PO'
+            )
+            entities = [
+                SourceEntity(
+                    string=u'This is the source string number %s.' % n,
+                    context=[], resource=resource, order=n
+                ) for n in xrange(count)
+            ]
+            SourceEntity.objects.bulk_insert_with_ids(entities)
+            translations = [
+                Translation(
+                    source_entity=se, language=project.source_language,
+                    rule=5, string=se.string, resource=resource
+                ) for se in entities
+            ]
+            del entities
+            start = time.time()
+            load(Translation, translations)
+            return time.time() - start
+        finally:
+            transaction.rollback()
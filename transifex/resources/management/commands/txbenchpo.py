@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+import codecs
+import os
+import resource
+import sys
+import time
+from optparse import make_option
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import simplejson
+
+
+def generate_po(entries):
+    """Generate the content of a source PO file with ``entries`` entries."""
+    lines = [
+        u'msgid ""',
+        u'msgstr ""',
+        u'"Content-Type: text/plain; charset=UTF-8\\n"',
+        u'"Content-Transfer-Encoding: 8bit\\n"',
+        u'',
+    ]
+    for n in xrange(entries):
+        lines.append(u'#. Comment for string %s' % n)
+        lines.append(u'#: src/file%s.c:%s' % (n % 100, n))
+        if n % 10 == 0:
+            lines.append(u'msgid "%s file has been saved"' % n)
+            lines.append(u'msgid_plural "%s files have been saved"' % n)
+            lines.append(u'msgstr[0] ""')
+            lines.append(u'msgstr[1] ""')
+        else:
+            lines.append(u'msgid "This is the source string number %s."' % n)
+            lines.append(u'msgstr ""')
+        lines.append(u'')
+    return u'\n'.join(lines)
+
+
+def parse_with_polib(content):
+    """Parse a source file the way the PO handler used to, with polib."""
+    import polib
+    from transifex.resources.formats.pofile import POHandler
+    from transifex.resources.formats.utils.hash_tag import hash_tag, \
+            escape_context
+    handler = POHandler()
+    po = polib.pofile(content)
+    translations = []
+    for entry in po:
+        if entry.obsolete:
+            continue
+        translations.extend(handler._entry_translations(entry, True, None))
+        string_hash = hash_tag(
+            entry.msgid, escape_context(entry.msgctxt) or ''
+        )
+        entry.msgstr = "%s_tr" % string_hash
+        if entry.msgid_plural:
+            for n in range(2):
+                entry.msgstr_plural['%s' % n] = "%s_pl_%s" % (string_hash, n)
+    return translations, handler.get_po_contents(po)
+
+
+def parse_with_stream(content):
+    """Parse a source file with the incremental PO reader."""
+    from transifex.resources.formats.pofile import POHandler
+    from transifex.resources.formats.utils.po_stream import \
+            iter_po_entries, PoTemplateWriter
+    handler = POHandler()
+    template = PoTemplateWriter(skip_line=handler._is_copyright_line)
+    translations = []
+    for entry in iter_po_entries(content):
+        if entry.is_header or entry.obsolete:
+            template.write(entry)
+            continue
+        translations.extend(handler._entry_translations(entry, True, None))
+        handler._write_template_entry(template, entry)
+    return translations, handler._generate_template(template)
+
+
+def _measure(func, content):
+    """Run ``func`` in a child process and return its time and memory.
+
+    Using a separate process for each run means that the peak memory
+    of one run does not affect the other.
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.time()
+        translations, template = func(content)
+        elapsed = time.time() - start
+        after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        result = simplejson.dumps({
+            'seconds': elapsed, 'peak_kb': after - before,
+            'strings': len(translations), 'template_bytes': len(template),
+        })
+        os.write(write_fd, result)
+        os._exit(0)
+    os.close(write_fd)
+    f = os.fdopen(read_fd)
+    try:
+        result = f.read()
+    finally:
+        f.close()
+    os.waitpid(pid, 0)
+    if not result:
+        raise CommandError("The benchmark of %s failed." % func.__name__)
+    return simplejson.loads(result)
+
+
+class Command(BaseCommand):
+    """
+    Compare the polib and the incremental parsers of PO files.
+    """
+    help = "Benchmark the parsing of a source PO file with polib and with"\
+           " the incremental reader. The wall time and the growth of the"\
+           " peak memory of each run are reported. If no file is given,"\
+           " one is generated."
+    args = "[<path to PO file>]"
+
+    option_list = BaseCommand.option_list + (
+        make_option('--entries', action='store', type='int',
+            dest='entries', default=50000,
+            help='The number of entries of the generated file.'),
+    )
+
+    can_import_settings = True
+
+    def handle(self, *args, **options):
+        if args:
+            f = codecs.open(args[0], 'r', 'UTF-8')
+            try:
+                content = f.read()
+            finally:
+                f.close()
+        else:
+            content = generate_po(options['entries'])
+
+        for name, func in (('polib', parse_with_polib),
+                           ('stream', parse_with_stream)):
+            r = _measure(func, content)
+            sys.stdout.write(
+                "%-6s %8.2fs %10d KB peak growth %8d strings\n" % (
+                    name, r['seconds'], r['peak_kb'], r['strings']
+                )
+            )
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import sys
+import time
+from optparse import make_option
+from django.core.management.base import NoArgsCommand, CommandError
+from django.db import transaction
+from django.db.models import get_model
+
+
+@transaction.commit_on_success
+def convert_chunk(last_id, chunk_size):
+    """Convert the next chunk of templates to the binary format.
+
+    Args:
+        last_id: The id of the last template converted.
+        chunk_size: The number of templates to convert.
+    Returns:
+        A tuple with the id of the last template converted and the number
+        of templates converted.
+    """
+    Template = get_model('resources', 'Template')
+    templates = Template.objects.filter(
+        id__gt=last_id, legacy_content__isnull=False
+    ).order_by('id')[:chunk_size]
+    count = 0
+    for t in templates:
+        # A queryset update does not increase the version, since the
+        # content does not change.
+        Template.objects.filter(id=t.id).update(
+            content_data=t.legacy_content, legacy_content=None
+        )
+        last_id = t.id
+        count += 1
+    return last_id, count
+
+
+class Command(NoArgsCommand):
+    """
+    Management command to convert the templates to the binary format.
+    """
+    help = "Move the content of the templates saved in the old, pickled"\
+           " format to the compressed binary column. Templates are"\
+           " converted in chunks, each in its own transaction, so the"\
+           " command can be interrupted and run again."
+
+    option_list = NoArgsCommand.option_list + (
+        make_option('--chunk-size', type='int', dest='chunk_size',
+            default=100, help="The number of templates to convert at once "
+            "(default 100)."),
+    )
+
+    can_import_settings = True
+
+    def handle_noargs(self, **options):
+        Template = get_model('resources', 'Template')
+        verbosity = int(options.get('verbosity', 1))
+        chunk_size = options.get('chunk_size') or 100
+        if chunk_size < 1:
+            raise CommandError("The chunk size must be a positive number.")
+
+        total = Template.objects.filter(legacy_content__isnull=False).count()
+        if verbosity:
+            sys.stdout.write("%s templates to convert.\n" % total)
+        start = time.time()
+        last_id, done = 0, 0
+        while True:
+            last_id, count = convert_chunk(last_id, chunk_size)
+            if not count:
+                break
+            done += count
+            if verbosity:
+                sys.stdout.write("Converted %s of %s templates.\n" % (
+                    done, total))
+        if verbosity:
+            sys.stdout.write("Converted %s templates in %.1f seconds.\n" % (
+                done, time.time() - start))
@@ -1,101 +1,192 @@
 # -*- coding: utf-8 -*-
-from optparse import make_option, OptionParser
-import os.path
+import os
 import sys
-from django.core.management.base import (BaseCommand, LabelCommand, CommandError)
+import time
+from bisect import bisect_right
+from itertools import imap
+from multiprocessing import Pool
+from optparse import make_option
+from django.core.management.base import LabelCommand, CommandError
+from django.db import connections, transaction
 from django.db.models import get_model
-from django.conf import settings
+
+
+@transaction.commit_on_success
+def update_chunk(resource_ids):
+    """Rebuild the statistics of a chunk of resources.
+
+    This runs in the worker processes, so it only takes and returns plain
+    data.
+
+    Args:
+        resource_ids: A sorted list with the ids of the resources.
+    Returns:
+        A tuple with the first and the last id of the chunk, the number of
+        resources in it and the ids of the RLStats, which changed.
+    """
+    RLStats = get_model('resources', 'RLStats')
+    changed = RLStats.rebuild_by_resources(resource_ids)
+    return resource_ids[0], resource_ids[-1], len(resource_ids), changed
+
+
+def read_checkpoint(path):
+    """Return the sorted (first id, last id) ranges of the chunks, which
+    are recorded as done in the checkpoint file.
+    """
+    if not path or not os.path.exists(path):
+        return []
+    ranges = []
+    for line in open(path):
+        try:
+            first, last = [int(i) for i in line.split()]
+        except ValueError:
+            # A line the previous run did not finish writing
+            continue
+        ranges.append((first, last))
+    return sorted(ranges)
+
+
+def exclude_done(resource_ids, ranges):
+    """Return the ids, which are not in any of the ranges."""
+    if not ranges:
+        return resource_ids
+    firsts = [first for first, last in ranges]
+    remaining = []
+    for rid in resource_ids:
+        i = bisect_right(firsts, rid) - 1
+        if i < 0 or rid > ranges[i][1]:
+            remaining.append(rid)
+    return remaining
+
 
 class Command(LabelCommand):
     """
     Management Command Class about resource source file updating
     """
     help = "This command creates the necessary objects for every resource"\
-           " and forces statistics to be recalculated."
+           " and forces statistics to be recalculated. Statistics are"\
+           " otherwise updated incrementally, so run it periodically to"\
+           " reconcile them. The statistics of each chunk of resources are"\
+           " calculated with a few grouped queries and chunks can be"\
+           " processed in parallel. With a checkpoint file, a run that was"\
+           " interrupted resumes from the chunks it had not finished."
     args = "<project_slug1.resource_slug1 project_slug1.resource_slug2>"
 
+    option_list = LabelCommand.option_list + (
+        make_option('--workers', '-w', type='int', dest='workers',
+            default=1, help="The number of processes to update the "
+            "statistics with (default 1)."),
+        make_option('--chunk-size', type='int', dest='chunk_size',
+            default=100, help="The number of resources to update at once "
+            "(default 100)."),
+        make_option('--checkpoint', dest='checkpoint', default=None,
+            help="A file to record the finished chunks in. A run with the "
+            "same file skips them. The file is removed, when all chunks "
+            "are done."),
+    )
+
     can_import_settings = True
 
     def handle(self, *args, **options):
 
         Resource = get_model('resources', 'Resource')
-        Translation = get_model('resources', 'Translation')
-        Language = get_model('languages', 'Language')
-        RLStats = get_model('resources', 'RLStats')
-        Team = get_model('teams', 'Team')
 
         verbosity = int(options.get('verbosity',1))
+        workers = options.get('workers') or 1
+        chunk_size = options.get('chunk_size') or 100
+        checkpoint = options.get('checkpoint')
+        if workers < 1 or chunk_size < 1:
+            raise CommandError("The workers and the chunk size must be "
+                "positive numbers.")
 
         if not args:
-            resources = Resource.objects.all()
+            resource_ids = list(Resource.objects.order_by('id').values_list(
+                'id', flat=True))
         else:
-            resources = []
+            resource_ids = []
             for arg in args:
                 try:
                     prj, res = arg.split('.')
-                    resources.extend(Resource.objects.filter(project__slug=prj,
-                        slug=res) or None)
+                    resource_ids.extend(Resource.objects.filter(
+                        project__slug=prj, slug=res).values_list(
+                        'id', flat=True) or None)
                 except TypeError, e:
                     raise Exception("Unknown resource %s.%s" % (prj, res))
                 except ValueError, e:
                     raise Exception("Argument %s is not in the correct format"
                         % arg)
+            resource_ids = sorted(set(resource_ids))
 
-        num = len(resources)
+        num = len(resource_ids)
 
         if num == 0:
             sys.stderr.write("No resources suitable for updating found. Exiting...\n")
             sys.exit()
 
-
+        resource_ids = exclude_done(resource_ids, read_checkpoint(checkpoint))
         if verbosity:
             sys.stdout.write("A total of %s resources are listed for updating.\n" % num)
-
-        for seq, r in enumerate(resources):
-            if verbosity:
-                sys.stdout.write((u"Updating resource %s.%s (%s of %s)\n" %
-                    ( r.project.slug, r.slug, seq+1, num)).encode('UTF-8'))
-
-            # Update resource fields
-            r.update_total_entities()
-            r.update_wordcount()
-
-            # Get a list of the available languages
-            langs = list(Translation.objects.filter(
-                resource=r).order_by('language').values_list(
-                'language',flat=True).distinct())
-
-            # Update stats
-            for lang in langs:
-                lang = Language.objects.get(id=lang)
-                if verbosity:
-                    sys.stdout.write("Calculating statistics for language %s.\n" % lang)
-                rl, created = RLStats.objects.get_or_create(resource=r, language=lang)
-                rl.update()
-
-            if r.project.outsource:
-                teams = Team.objects.filter(project=r.project.outsource)
+            if len(resource_ids) < num:
+                sys.stdout.write("Resuming: %s resources were updated by a "
+                    "previous run.\n" % (num - len(resource_ids)))
+
+        chunks = [
+            resource_ids[i:i + chunk_size]
+            for i in xrange(0, len(resource_ids), chunk_size)
+        ]
+        start = time.time()
+        done = 0
+        changed = []
+        pool = None
+        checkpoint_file = checkpoint and open(checkpoint, 'a')
+        try:
+            if workers > 1 and len(chunks) > 1:
+                # The workers must not share the connections of the parent.
+                for conn in connections.all():
+                    conn.close()
+                pool = Pool(min(workers, len(chunks)))
+                results = pool.imap_unordered(update_chunk, chunks)
             else:
-                teams = Team.objects.filter(project=r.project)
-
-            # Exclude all rlstats that were already created
-            teams = teams.exclude(language__id__in=langs)
-
-            for team in teams:
-                lang = team.language
-                # Add team languages to the existing languages
-                langs.append(lang.id)
+                results = imap(update_chunk, chunks)
+
+            for first, last, count, changed_ids in results:
+                done += count
+                changed.extend(changed_ids)
+                if checkpoint_file:
+                    checkpoint_file.write("%s %s\n" % (first, last))
+                    checkpoint_file.flush()
+                    os.fsync(checkpoint_file.fileno())
                 if verbosity:
-                    sys.stdout.write("Calculating statistics for team language %s.\n" % lang)
-                rl,created = RLStats.objects.get_or_create(resource=r, language=lang)
-                rl.update()
-
-            # Add source language to the existing languages
-            langs.append(r.source_language.id)
-
-            # For all existing languages that don't have a translation or
-            # don't have a corresponding team, delete RLStat object
-            rlstats = RLStats.objects.filter(resource=r)
-            for stat in rlstats:
-                if not stat.language.id in langs:
-                    stat.delete()
+                    sys.stdout.write("Updated resources %s to %s "
+                        "(%s of %s).\n" % (first, last, done,
+                        len(resource_ids)))
+            if pool is not None:
+                pool.close()
+                pool.join()
+        except:
+            if pool is not None:
+                pool.terminate()
+            raise
+        finally:
+            if checkpoint_file:
+                checkpoint_file.close()
+
+        self._send_signals(changed)
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        elapsed = time.time() - start
+        if verbosity:
+            sys.stdout.write("Updated %s resources in %.1f seconds "
+                "(%.1f resources/s). %s statistics changed.\n" % (
+                done, elapsed, done / max(elapsed, 0.001), len(changed)))
+
+    def _send_signals(self, rlstats_ids, size=500):
+        """Send post_update_rlstats for the statistics that changed."""
+        from transifex.resources.signals import post_update_rlstats
+        RLStats = get_model('resources', 'RLStats')
+        for i in xrange(0, len(rlstats_ids), size):
+            for rl in RLStats.objects.filter(
+                    id__in=rlstats_ids[i:i + size]).select_related(
+                    'resource__project', 'language'):
+                post_update_rlstats.send_robust(sender=rl)
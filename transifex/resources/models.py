@@ -10,8 +10,10 @@ from hashlib import md5
 from django.conf import settings
 from django.core.cache import cache
 from django.core.validators import validate_slug
-from django.db import models, connection
-from django.db.models import Q, Sum, Max
+from django.db import models, connection, connections, router, \
+        transaction, IntegrityError
+from django.db.models import Q, Sum, Max, F, Count
+from django.db.models.sql import DeleteQuery
 from django.utils.translation import ugettext_lazy as _
 from django.utils.hashcompat import md5_constructor
 from django.utils import simplejson as json
@@ -21,12 +23,13 @@ from djangobulk.bulk import insert_many, update_many
 from transifex.languages.models import Language
 from transifex.projects.models import Project
 from transifex.txcommon.db.models import CompressedTextField, \
-    ChainerManager, ListCharField
+    ChainerManager, ListCharField, ZlibBinaryField
+from transifex.txcommon.db.bulk import get_bulk_loader
 from transifex.txcommon.log import logger
-from transifex.resources.utils import invalidate_template_cache
+from transifex.resources.utils import invalidate_resource_templates
 from transifex.resources.signals import post_update_rlstats
 from transifex.resources.tasks import check_and_notify_resource_full_reviewed
-from transifex.txcommon.utils import immutable_property
+from transifex.txcommon.utils import immutable_property, LRUCache
 
 class AggregatedRLStats(object):
     def __init__(self, **kwargs):
@@ -237,10 +240,7 @@ class Resource(models.Model):
                 RLStats.objects.get_or_create(resource=self,
                     language=team.language)
 
-        invalidate_template_cache("project_resource_details",
-            self.project.slug, self.slug)
-        invalidate_template_cache("resource_details",
-            self.project.slug, self.slug)
+        invalidate_resource_templates(self)
 
     def delete(self, *args, **kwargs):
         """
@@ -318,6 +318,39 @@ class Resource(models.Model):
             ).filter(translated__gt=0).order_by().values('language').query)
 
 
+# The maximum number of values in the IN clauses of the bulk queries
+IN_QUERY_SIZE = 500
+
+
+def _bulk_delete(model, pks, using):
+    """Delete the objects of a model with the given primary keys.
+
+    The objects, which refer to them, are deleted first, like Django does
+    on deletion, but with a few queries per model keyed on the ids, instead
+    of loading and deleting each object. No delete signals are sent.
+
+    Args:
+        model: The model of the objects.
+        pks: A list with the primary keys of the objects.
+        using: The alias of the database.
+    """
+    if not pks:
+        return
+    for related in model._meta.get_all_related_objects():
+        rel_model, rel_field = related.model, related.field
+        if rel_model._meta.get_all_related_objects():
+            # Find the ids to delete the objects that refer to these.
+            rel_pks = []
+            for i in xrange(0, len(pks), IN_QUERY_SIZE):
+                rel_pks.extend(rel_model._default_manager.using(using).filter(
+                    **{'%s__in' % rel_field.name: pks[i:i + IN_QUERY_SIZE]}
+                ).values_list('pk', flat=True))
+            _bulk_delete(rel_model, rel_pks, using)
+        else:
+            DeleteQuery(rel_model).delete_batch(pks, using, field=rel_field)
+    DeleteQuery(model).delete_batch(pks, using)
+
+
 class SourceEntityManager(models.Manager):
 
     def for_user(self, user):
@@ -331,13 +364,102 @@ class SourceEntityManager(models.Manager):
 
     def bulk_insert(self, records):
         """Bulk insert records to the database."""
-        # TODO Maybe use COPY instead?
-        insert_many(SourceEntity, records)
+        get_bulk_loader(router.db_for_write(SourceEntity)).load(
+            SourceEntity, records
+        )
 
     def bulk_update(self, records):
         """Bulk update records to the database."""
         update_many(SourceEntity, records)
 
+    def bulk_insert_with_ids(self, records):
+        """Bulk insert source entities and set the ids of the objects.
+
+        On PostgreSQL the ids are returned by the INSERT statements. On
+        other databases the entities are inserted with ``bulk_insert`` and
+        their ids are looked up by their string hash and context, which
+        are unique in a resource.
+
+        Args:
+            records: A list of unsaved source entities.
+        """
+        if not records:
+            return
+        using = router.db_for_write(SourceEntity)
+        conn = connections[using]
+        context_field = SourceEntity._meta.get_field('context')
+        by_key = {}
+        for se in records:
+            se.presave()
+            key = (se.resource_id, se.string_hash,
+                   context_field.get_db_prep_value(se.context))
+            by_key[key] = se
+
+        if conn.vendor == 'postgresql':
+            rows = self._insert_returning(records, conn)
+        else:
+            self.bulk_insert(records)
+            rows = []
+            hashes = list(set(se.string_hash for se in records))
+            resource_ids = set(se.resource_id for se in records)
+            for i in xrange(0, len(hashes), IN_QUERY_SIZE):
+                rows.extend(SourceEntity.objects.using(using).filter(
+                    resource__in=resource_ids,
+                    string_hash__in=hashes[i:i + IN_QUERY_SIZE]
+                ).values_list('id', 'resource', 'string_hash', 'context'))
+        for row in rows:
+            se = by_key.get(tuple(row[1:]))
+            if se is not None:
+                se.id = row[0]
+
+    def _insert_returning(self, records, conn):
+        """Insert the records with INSERT ... RETURNING statements.
+
+        Returns:
+            A list of (id, resource_id, string_hash, context) tuples.
+        """
+        fields = [
+            f for f in SourceEntity._meta.fields
+            if not isinstance(f, models.AutoField)
+        ]
+        qn = conn.ops.quote_name
+        returning = ', '.join(
+            qn(c) for c in ('id', 'resource_id', 'string_hash', 'context')
+        )
+        sql_prefix = 'INSERT INTO %s (%s) VALUES ' % (
+            qn(SourceEntity._meta.db_table),
+            ', '.join(qn(f.column) for f in fields)
+        )
+        placeholders = '(%s)' % ', '.join(['%s'] * len(fields))
+        cursor = conn.cursor()
+        rows = []
+        for i in xrange(0, len(records), IN_QUERY_SIZE):
+            chunk = records[i:i + IN_QUERY_SIZE]
+            params = []
+            for se in chunk:
+                params.extend(
+                    f.get_db_prep_save(f.pre_save(se, True), connection=conn)
+                    for f in fields
+                )
+            cursor.execute(
+                sql_prefix + ', '.join([placeholders] * len(chunk)) +
+                ' RETURNING ' + returning, params
+            )
+            rows.extend(cursor.fetchall())
+        transaction.commit_unless_managed(using=conn.alias)
+        return rows
+
+    def bulk_delete(self, ids):
+        """Delete source entities together with their translations,
+        suggestions and anything else that refers to them.
+
+        Args:
+            ids: The ids of the source entities.
+        """
+        using = router.db_for_write(SourceEntity)
+        _bulk_delete(SourceEntity, list(ids), using)
+        transaction.commit_unless_managed(using=using)
+
 
 class SourceEntity(models.Model):
     """
@@ -628,10 +750,32 @@ class TranslationManager(models.Manager):
             language=source_language, rule=5,
         )
 
+    def source_wordcount(self, resource, source_entity_ids):
+        """Return the number of words in the source strings of the
+        specified source entities.
+
+        This includes all plural forms of the source strings, as the
+        translated wordcount of RLStats does.
+
+        Args:
+            resource: The resource the source entities belong to.
+            source_entity_ids: An iterable of source entity ids.
+        Returns:
+            The total number of words.
+        """
+        source_entity_ids = list(source_entity_ids)
+        if not source_entity_ids:
+            return 0
+        return self.filter(
+            resource=resource, language=resource.source_language,
+            source_entity__id__in=source_entity_ids
+        ).aggregate(Sum('wordcount'))['wordcount__sum'] or 0
+
     def bulk_insert(self, records):
         """Bulk insert translations."""
-        # TODO Maybe use COPY instead?
-        insert_many(Translation, records)
+        get_bulk_loader(router.db_for_write(Translation)).load(
+            Translation, records
+        )
 
     def bulk_update(self, records):
         """Bulk update records to the database."""
@@ -898,6 +1042,104 @@ class RLStatsQuerySet(models.query.QuerySet):
         return _aggregate_rlstats(self.by_project(project).order_by('resource__slug'),
             'resource', total)
 
+def _count_translations_by_language(resource):
+    """Count the translated and reviewed entities and the translated
+    wordcount of a resource for all languages with a single query.
+
+    The translated wordcount is the number of words of the source strings
+    (including their plural forms) of the translated entities.
+
+    Args:
+        resource: The resource to count the translations of.
+    Returns:
+        A dictionary mapping language ids to a (translated, reviewed,
+        translated_wordcount) tuple.
+    """
+    qn = connection.ops.quote_name
+    table = qn(Translation._meta.db_table)
+    sql = (
+        "SELECT t.language_id, COUNT(t.id), "
+        "SUM(CASE WHEN t.reviewed THEN 1 ELSE 0 END), "
+        "SUM(COALESCE(s.wordcount, 0)) "
+        "FROM %(table)s t LEFT OUTER JOIN ("
+        "SELECT source_entity_id, SUM(wordcount) AS wordcount "
+        "FROM %(table)s WHERE resource_id = %%s AND language_id = %%s "
+        "GROUP BY source_entity_id"
+        ") s ON s.source_entity_id = t.source_entity_id "
+        "WHERE t.resource_id = %%s AND t.rule = 5 "
+        "GROUP BY t.language_id"
+    ) % {'table': table}
+    cursor = connection.cursor()
+    cursor.execute(sql, [resource.id, resource.source_language_id, resource.id])
+    return dict(
+        (row[0], (int(row[1]), int(row[2] or 0), int(row[3] or 0)))
+        for row in cursor.fetchall()
+    )
+
+
+def _count_translations_by_resource(resource_ids):
+    """Count the translated and reviewed entities and the translated
+    wordcount of many resources for all languages with a single query.
+
+    Args:
+        resource_ids: A list with the ids of the resources.
+    Returns:
+        A dictionary mapping (resource id, language id) tuples to a
+        (translated, reviewed, translated_wordcount) tuple.
+    """
+    qn = connection.ops.quote_name
+    sql = (
+        "SELECT t.resource_id, t.language_id, COUNT(t.id), "
+        "SUM(CASE WHEN t.reviewed THEN 1 ELSE 0 END), "
+        "SUM(COALESCE(s.wordcount, 0)) "
+        "FROM %(table)s t LEFT OUTER JOIN ("
+        "SELECT st.source_entity_id, SUM(st.wordcount) AS wordcount "
+        "FROM %(table)s st INNER JOIN %(resources)s r "
+        "ON r.id = st.resource_id AND r.source_language_id = st.language_id "
+        "WHERE st.resource_id IN (%(ids)s) "
+        "GROUP BY st.source_entity_id"
+        ") s ON s.source_entity_id = t.source_entity_id "
+        "WHERE t.resource_id IN (%(ids)s) AND t.rule = 5 "
+        "GROUP BY t.resource_id, t.language_id"
+    ) % {
+        'table': qn(Translation._meta.db_table),
+        'resources': qn(Resource._meta.db_table),
+        'ids': ', '.join(['%s'] * len(resource_ids)),
+    }
+    cursor = connection.cursor()
+    cursor.execute(sql, list(resource_ids) * 2)
+    return dict(
+        ((row[0], row[1]), (int(row[2]), int(row[3] or 0), int(row[4] or 0)))
+        for row in cursor.fetchall()
+    )
+
+
+def _count_source_words_by_resource(resource_ids):
+    """Return the number of words in the source language of each resource,
+    with a single query.
+
+    Args:
+        resource_ids: A list with the ids of the resources.
+    Returns:
+        A dictionary mapping resource ids to their wordcount.
+    """
+    qn = connection.ops.quote_name
+    sql = (
+        "SELECT t.resource_id, SUM(t.wordcount) "
+        "FROM %(table)s t INNER JOIN %(resources)s r "
+        "ON r.id = t.resource_id AND r.source_language_id = t.language_id "
+        "WHERE t.resource_id IN (%(ids)s) "
+        "GROUP BY t.resource_id"
+    ) % {
+        'table': qn(Translation._meta.db_table),
+        'resources': qn(Resource._meta.db_table),
+        'ids': ', '.join(['%s'] * len(resource_ids)),
+    }
+    cursor = connection.cursor()
+    cursor.execute(sql, list(resource_ids))
+    return dict((row[0], int(row[1] or 0)) for row in cursor.fetchall())
+
+
 class RLStats(models.Model):
     """
     Resource-Language statistics object.
@@ -1017,6 +1259,205 @@ class RLStats(models.Model):
             self.save(update=False)
         post_update_rlstats.send_robust(sender=self)
 
+    @classmethod
+    def update_by_resource(cls, resource, user=None):
+        """Update all RLStat objects of a resource.
+
+        This has the same result as calling ``update()`` for each of them,
+        but the counters of all languages are calculated with one grouped
+        query and saved with one bulk update.
+
+        Args:
+            resource: The resource to update the stats of.
+            user: The user that made the change.
+        Returns:
+            A list with the updated RLStats objects.
+        """
+        total = SourceEntity.objects.filter(resource=resource).count()
+        counters = _count_translations_by_language(resource)
+        now = datetime.datetime.now()
+        stats = list(cls.objects.filter(resource=resource))
+        for rl in stats:
+            rl.resource = resource
+            (rl.translated, rl.reviewed,
+             rl.translated_wordcount) = counters.get(rl.language_id, (0, 0, 0))
+            rl.untranslated = total - rl.translated
+            rl._calculate_perc()
+            rl.last_update = now
+            if user:
+                rl.last_committer = user
+        update_many(cls, stats)
+        for rl in stats:
+            post_update_rlstats.send_robust(sender=rl)
+        return stats
+
+    @classmethod
+    def rebuild_by_resources(cls, resource_ids):
+        """Recalculate the RLStats objects of many resources from scratch.
+
+        Each resource gets stats for the languages it has translations in
+        and for the languages of the teams of its project (or of the
+        project it outsources to). Stats for other languages are deleted.
+        The entity total and wordcount of the resources are updated, too.
+
+        All counters are calculated with a few grouped queries for all
+        resources and the changed rows are written in bulk. Unlike
+        ``update()``, no signal is sent; the caller can send
+        ``post_update_rlstats`` for the returned stats.
+
+        Args:
+            resource_ids: A list with the ids of the resources.
+        Returns:
+            A list with the ids of the RLStats objects, which were created
+            or changed.
+        """
+        resource_ids = list(resource_ids)
+        if not resource_ids:
+            return []
+        Team = models.get_model('teams', 'Team')
+        resources = dict(
+            (r.id, r) for r in Resource.objects.filter(
+                id__in=resource_ids
+            ).select_related('project')
+        )
+        totals = dict(SourceEntity.objects.filter(
+            resource__in=resource_ids
+        ).values_list('resource').annotate(Count('id')).order_by())
+        wordcounts = _count_source_words_by_resource(resource_ids)
+        counters = _count_translations_by_resource(resource_ids)
+
+        languages = dict((rid, set()) for rid in resources)
+        for rid, lid in Translation.objects.filter(
+                resource__in=resource_ids).values_list(
+                'resource', 'language').order_by().distinct():
+            languages[rid].add(lid)
+        team_projects = dict(
+            (rid, r.project.outsource_id or r.project_id)
+            for rid, r in resources.iteritems()
+        )
+        team_languages = {}
+        for pid, lid in Team.objects.filter(
+                project__in=set(team_projects.values())).values_list(
+                'project', 'language'):
+            team_languages.setdefault(pid, set()).add(lid)
+        for rid in resources:
+            languages[rid].update(team_languages.get(team_projects[rid], ()))
+
+        existing = {}
+        orders = {}
+        for rl in cls.objects.filter(resource__in=resource_ids):
+            existing[(rl.resource_id, rl.language_id)] = rl
+            orders[rl.resource_id] = max(
+                orders.get(rl.resource_id, 0), rl._order + 1
+            )
+        # Keep the stats of the source language of empty resources, too.
+        for rid, resource in resources.iteritems():
+            if (rid, resource.source_language_id) in existing:
+                languages[rid].add(resource.source_language_id)
+
+        created, changed = [], []
+        for rid, resource in resources.iteritems():
+            total = totals.get(rid, 0)
+            wordcount = wordcounts.get(rid, 0)
+            if (resource.total_entities, resource.wordcount) != \
+                    (total, wordcount):
+                Resource.objects.filter(pk=rid).update(
+                    total_entities=total, wordcount=wordcount
+                )
+                invalidate_resource_templates(resource)
+            for lid in languages[rid]:
+                translated, reviewed, translated_wordcount = counters.get(
+                    (rid, lid), (0, 0, 0)
+                )
+                rl = existing.pop((rid, lid), None)
+                if rl is None:
+                    rl = cls(resource_id=rid, language_id=lid)
+                    rl._order = orders.get(rid, 0)
+                    orders[rid] = rl._order + 1
+                    created.append(rl)
+                old = (rl.translated, rl.untranslated, rl.reviewed,
+                       rl.translated_wordcount)
+                rl.translated = translated
+                rl.untranslated = total - translated
+                rl.reviewed = reviewed
+                rl.translated_wordcount = translated_wordcount
+                rl._calculate_perc()
+                if rl.pk and old != (rl.translated, rl.untranslated,
+                                     rl.reviewed, rl.translated_wordcount):
+                    changed.append(rl)
+        stale = [rl.pk for rl in existing.itervalues()]
+
+        if created:
+            insert_many(cls, created)
+        if changed:
+            update_many(cls, changed)
+        if stale:
+            cls.objects.filter(pk__in=stale).delete()
+        changed_ids = [rl.pk for rl in changed]
+        if created:
+            # The bulk insert does not set the ids of the new objects.
+            created_keys = set(
+                (rl.resource_id, rl.language_id) for rl in created
+            )
+            changed_ids.extend(
+                pk for pk, rid, lid in cls.objects.filter(
+                    resource__in=resource_ids
+                ).values_list('id', 'resource', 'language')
+                if (rid, lid) in created_keys
+            )
+        return changed_ids
+
+    def apply_delta(self, translated=0, reviewed=0, translated_wordcount=0,
+                    user=None):
+        """Update the RLStat object by the specified differences.
+
+        This is used instead of ``update()``, when the caller knows what
+        changed, to avoid counting all translations of the resource again.
+        The counters are changed with a single query, so that concurrent
+        updates do not overwrite each other. If the counters would get
+        out of range, they have drifted and a full update is done instead.
+
+        Args:
+            translated: The change in the number of translated entities.
+            reviewed: The change in the number of reviewed entities.
+            translated_wordcount: The change in the translated wordcount.
+            user: The user that made the change.
+        """
+        if not (0 <= self.translated + translated <= self.total and
+                0 <= self.reviewed + reviewed <= self.total and
+                0 <= self.translated_wordcount + translated_wordcount):
+            logger.debug("Stats of %s have drifted, recounting." % self)
+            return self.update(user)
+
+        fields = {'last_update': datetime.datetime.now()}
+        if translated:
+            fields['translated'] = F('translated') + translated
+            fields['untranslated'] = F('untranslated') - translated
+        if reviewed:
+            fields['reviewed'] = F('reviewed') + reviewed
+        if translated_wordcount:
+            fields['translated_wordcount'] = F('translated_wordcount') + \
+                    translated_wordcount
+        if user:
+            fields['last_committer'] = user
+        RLStats.objects.filter(pk=self.pk).update(**fields)
+
+        counters = RLStats.objects.filter(pk=self.pk).values(
+            'translated', 'untranslated', 'reviewed', 'translated_wordcount',
+            'last_update'
+        )[0]
+        for field, value in counters.iteritems():
+            setattr(self, field, value)
+        if user:
+            self.last_committer = user
+        self._calculate_perc()
+        RLStats.objects.filter(pk=self.pk).update(
+            translated_perc=self.translated_perc,
+            untranslated_perc=self.untranslated_perc,
+            reviewed_perc=self.reviewed_perc
+        )
+        post_update_rlstats.send_robust(sender=self)
+
     def _update_now(self, user=None):
         """
         Update the last update and last committer.
@@ -1025,29 +1466,124 @@ class RLStats(models.Model):
         if user:
             self.last_committer = user
 
+# The decompressed contents of the most recently used templates, by the
+# digest of their compressed data
+_template_cache = LRUCache(getattr(settings, 'TEMPLATE_CACHE_SIZE', 50))
+
+
 class Template(models.Model):
     """
     Source file template for a specific resource.
 
-    This model holds the source file template in a compressed textfield to save
-    space in the database. All translation strings are changed with the md5
-    hashes of the SourceEntity string which enables us to do a quick search and
-    replace each time we want to recreate the file.
+    This model holds the source file template compressed in a binary field to
+    save space in the database. All translation strings are changed with the
+    md5 hashes of the SourceEntity string which enables us to do a quick search
+    and replace each time we want to recreate the file.
+
+    The content is only decompressed when it is read and the decompressed
+    contents of the latest templates are kept in memory, by the digest of
+    the data stored in the database. Since the key depends on the data
+    only, a process never serves the content of another version of the
+    template, even if the transaction, which saved it, is rolled back.
     """
 
-    content = CompressedTextField(null=False, blank=False,
+    content_data = ZlibBinaryField(null=True, blank=True, editable=False,
         help_text=_("This is the actual content of the template"))
+    # Templates saved before content_data existed. They are moved to
+    # content_data by the txconverttemplates command.
+    legacy_content = CompressedTextField(null=True, blank=True,
+        editable=False, db_column='content',
+        help_text=_("The content of the template in the old format."))
+    version = models.PositiveIntegerField(default=0, editable=False,
+        help_text=_("The number of times the content has changed."))
     resource = models.OneToOneField(Resource,
         verbose_name=_("Resource"),unique=True,
         blank=False, null=False,related_name="source_file_template",
         help_text=_("This is the template of the imported source file which is"
             " used to export translation files from the db to the user."))
+    placeholder_index = CompressedTextField(null=True, blank=True,
+        editable=False,
+        help_text=_("The length of the content and the offsets of the hashes"
+            " in it, so that they need not be searched for on every"
+            " compilation."))
 
     class Meta:
         verbose_name = _('Template')
         verbose_name_plural = _('Templates')
         ordering = ['resource']
 
+    # Whether the content has been set since the template was loaded
+    _content_changed = False
+
+    def _get_content(self):
+        data = self._meta.get_field('content_data').compressed_data(self)
+        if data is None:
+            # Already decompressed, just set or in the old format
+            content = self.content_data
+            if content is None:
+                content = self.legacy_content
+            return content
+        key = md5(data).hexdigest()
+        content = _template_cache.get(key)
+        if content is None:
+            content = self.content_data
+            _template_cache.set(key, content)
+        return content
+
+    def _set_content(self, value):
+        if isinstance(value, unicode):
+            value = value.encode('UTF-8')
+        self.content_data = value
+        self.legacy_content = None
+        self._content_changed = True
+
+    content = property(_get_content, _set_content)
+
+    def save(self, *args, **kwargs):
+        """Index the hashes of the content, before saving it."""
+        if self._content_changed or self.placeholder_index is None:
+            self.placeholder_index = self._index_hashes()
+        if self._content_changed:
+            if self.pk is None:
+                self.version = 1
+            else:
+                # Increment in the database, so that concurrent saves do
+                # not end up with the same version. In a transaction, the
+                # row stays locked until it is committed.
+                versions = Template.objects.filter(pk=self.pk)
+                versions.update(version=F('version') + 1)
+                self.version = versions.values_list(
+                    'version', flat=True
+                )[0]
+        super(Template, self).save(*args, **kwargs)
+        self._content_changed = False
+
+    def get_placeholder_index(self):
+        """Return the index of the hashes in the content.
+
+        Templates saved before the index existed are indexed the first
+        time the index is asked for.
+        """
+        if self.placeholder_index is None and self.pk is not None:
+            self.placeholder_index = self._index_hashes()
+            Template.objects.filter(pk=self.pk).update(
+                placeholder_index=self.placeholder_index
+            )
+        return self.placeholder_index
+
+    def _index_hashes(self):
+        """Index the hashes of the (decoded) content."""
+        from transifex.resources.formats.utils.hash_tag import index_hashes
+        content = self.content
+        if content is None:
+            return None
+        if isinstance(content, str):
+            try:
+                content = content.decode('UTF-8')
+            except UnicodeDecodeError, e:
+                return None
+        return index_hashes(content)
+
 post_update_rlstats.connect(check_and_notify_resource_full_reviewed)
 
 
@@ -1118,3 +1654,180 @@ class ReviewHistory(models.Model):
         elif isinstance(t, models.query.QuerySet):
             for translation in t:
                 cls.add_one(translation, user, project_id, reviewed)
+
+
+class ImportJob(models.Model):
+    """
+    An import of a source or translation file, which runs in the background.
+
+    Big files take long to parse and save. Instead of importing them
+    during the request, the uploaded content is stored in a job and a
+    celery task imports it. The task records its progress and the
+    results in the job, so that clients can poll for them.
+    """
+
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+
+    # Progress (percentage) reached after each step of the import
+    PROGRESS_STARTED = 10
+    PROGRESS_PARSED = 50
+    PROGRESS_DONE = 100
+
+    resource = models.ForeignKey(Resource, verbose_name=_('Resource'),
+        related_name='import_jobs', blank=False, null=False,
+        help_text=_("The resource the content is imported to."))
+    language = models.ForeignKey(Language, verbose_name=_('Language'),
+        blank=False, null=False,
+        help_text=_("The language of the imported content."))
+    user = models.ForeignKey(User, verbose_name=_('User'),
+        related_name='import_jobs', blank=True, null=True,
+        help_text=_("The user who uploaded the content."))
+    is_source = models.BooleanField(_('Source'), default=False,
+        help_text=_("Whether the content is a source file."))
+    filename = models.CharField(_('Filename'), max_length=255,
+        blank=True, null=True,
+        help_text=_("The name of the uploaded file, if any."))
+    content = CompressedTextField(null=True, blank=True,
+        help_text=_("The uploaded content. It is cleared after the import."))
+    status = models.CharField(_('Status'), max_length=10,
+        choices=STATUS_CHOICES, default='pending', db_index=True)
+    progress = models.PositiveSmallIntegerField(_('Progress'), default=0,
+        help_text=_("The percentage of the import that has been done."))
+    strings_added = models.PositiveIntegerField(_('Strings added'), default=0)
+    strings_updated = models.PositiveIntegerField(_('Strings updated'),
+        default=0)
+    strings_deleted = models.PositiveIntegerField(_('Strings deleted'),
+        default=0)
+    error = models.TextField(_('Error'), blank=True, null=True,
+        help_text=_("The reason the import failed, if it did."))
+    created = models.DateTimeField(auto_now_add=True, editable=False)
+    last_update = models.DateTimeField(auto_now=True, editable=False)
+
+    class Meta:
+        verbose_name = _('Import job')
+        verbose_name_plural = _('Import jobs')
+        ordering = ['-created']
+
+    def __unicode__(self):
+        return u'%s (%s): %s' % (self.resource, self.language, self.status)
+
+    @property
+    def finished(self):
+        """Whether the job has finished, successfully or not."""
+        return self.status in ('done', 'failed', )
+
+    def _set(self, **fields):
+        """Set and store the specified fields only.
+
+        The content is not written back, which would mean compressing
+        it again.
+        """
+        fields['last_update'] = datetime.datetime.now()
+        for name, value in fields.iteritems():
+            setattr(self, name, value)
+        ImportJob.objects.filter(id=self.id).update(**fields)
+
+    def start(self):
+        """Mark the job as running."""
+        self._set(status='running', progress=self.PROGRESS_STARTED)
+
+    def set_progress(self, progress):
+        """Record the progress of the job."""
+        self._set(progress=progress)
+
+    def finish(self, added, updated, deleted):
+        """Mark the job as done and record the changes it made."""
+        self._set(
+            status='done', progress=self.PROGRESS_DONE, content=None,
+            strings_added=added, strings_updated=updated,
+            strings_deleted=deleted
+        )
+
+    def fail(self, error):
+        """Mark the job as failed because of ``error``."""
+        self._set(status='failed', content=None, error=error)
+
+
+class ImportDigestManager(models.Manager):
+
+    def invalidate(self, resource, language=None):
+        """Forget the digests of the imports to a resource.
+
+        This must be called, whenever the strings of a resource change,
+        so that importing the same file again is not skipped.
+
+        Args:
+            resource: The resource that changed.
+            language: The language that changed. If it is None or the
+                source language, the digests of all languages are
+                forgotten, since a change to the source strings affects
+                which translations are imported.
+        """
+        digests = self.filter(resource=resource)
+        if language is not None and language != resource.source_language:
+            digests = digests.filter(language=language)
+        digests.delete()
+
+    def record(self, resource, language, is_source, content_digest,
+               stringset_digest):
+        """Store the digests of an import, which has just been saved.
+
+        Concurrent imports to the same resource and language may record
+        their digests at the same time. Recording must never fail an
+        import, so the existing row is updated in place and a new one is
+        created only if there is none.
+        """
+        values = {
+            'is_source': is_source,
+            'content_digest': content_digest,
+            'stringset_digest': stringset_digest,
+            'created': datetime.datetime.now(),
+        }
+        digests = self.filter(resource=resource, language=language)
+        if digests.update(**values):
+            return
+        sid = transaction.savepoint()
+        try:
+            self.create(resource=resource, language=language, **values)
+            transaction.savepoint_commit(sid)
+        except IntegrityError:
+            # Another import created the row in the meantime.
+            transaction.savepoint_rollback(sid)
+            digests.update(**values)
+
+
+class ImportDigest(models.Model):
+    """
+    The digests of the last file imported to a (resource, language) pair.
+
+    Build systems often push the same files over and over. If a file has
+    the digests of the last import and nothing has changed the strings
+    since then, importing it again would change nothing, so it is skipped.
+    """
+
+    resource = models.ForeignKey(Resource, verbose_name=_('Resource'),
+        related_name='import_digests', blank=False, null=False,
+        help_text=_("The resource the file was imported to."))
+    language = models.ForeignKey(Language, verbose_name=_('Language'),
+        blank=False, null=False,
+        help_text=_("The language of the imported file."))
+    is_source = models.BooleanField(_('Source'), default=False,
+        help_text=_("Whether the file was imported as a source file."))
+    content_digest = models.CharField(_('Content digest'), max_length=40,
+        help_text=_("The SHA-1 digest of the normalized content of the file."))
+    stringset_digest = models.CharField(_('Stringset digest'), max_length=40,
+        help_text=_("The SHA-1 digest of the strings parsed from the file "
+            "(and of the template of source files)."))
+    created = models.DateTimeField(auto_now_add=True, editable=False)
+
+    objects = ImportDigestManager()
+
+    class Meta:
+        unique_together = ('resource', 'language', )
+        verbose_name = _('Import digest')
+        verbose_name_plural = _('Import digests')
@@ -5,7 +5,8 @@ from django.conf import settings
 from django.db.models import get_model
 from transifex.txcommon.log import logger
 from transifex.txcommon import notifications as txnotification
-from transifex.projects.signals import post_resource_save
+from transifex.projects.signals import post_resource_save, \
+        post_submit_translation
 
 
 #@task(name='tx_project_resource_full_reviewed', ignore_result=True, max_retries=3)
@@ -34,23 +35,32 @@ def check_and_notify_resource_full_reviewed(**kwargs):
                 nt, context)
 
 
-def _notify_all_on_source_change(resource, context):
+def _notify_all_on_source_change(resource, context, digest):
     """
-    Send notifications to everyone involved with a resource.
+    Add the notices for everyone involved with a resource to the digest.
+
+    The watches of all languages and their observers are fetched at once.
+    Languages without a watch have no observers.
 
     Args:
         resource: The updated resource.
+        context: The context of the notices.
+        digest: The NoticeDigest to add the notices to.
     """
     signal_name = 'project_resource_translation_changed'
-    msg = "addon-watches: Sending notification for '%s'"
     TWatch = get_model('watches', 'TranslationWatch')
 
-    for l in resource.available_languages:
-        twatch = TWatch.objects.get_or_create(resource=resource, language=l)[0]
-        logger.debug(msg % twatch)
-        txnotification.send_observation_notices_for(
-            twatch, signal=signal_name, extra_context=context
-        )
+    twatches = TWatch.objects.filter(
+        resource=resource, language__in=resource.available_languages
+    ).select_related('language')
+    logger.debug(
+        "addon-watches: Sending notifications for the translations of '%s'"
+        % resource
+    )
+    digest.add_observers(
+        twatches, signal_name, extra_context=context,
+        context_for=lambda twatch: {'language': twatch.language}
+    )
 
 
 @task(name='send_notices_on_importing_files', max_retries=3)
@@ -58,6 +68,9 @@ def send_notices_for_formats(signal, context):
     """
     Send notifications to watching users that a resource has been changed.
 
+    The notices for the project and, in case of a source language update,
+    for the translations of the resource are sent as one digest per user.
+
     Args:
         signal: The signal to send.
         context: The context of the signal.
@@ -66,9 +79,11 @@ def send_notices_for_formats(signal, context):
     project = context['project']
     language = context['language']
 
-    txnotification.send_observation_notices_for(project, signal, context)
+    digest = txnotification.NoticeDigest()
+    digest.add_observers([project], signal, extra_context=context)
     if language == resource.source_language:
-        _notify_all_on_source_change(resource, context)
+        _notify_all_on_source_change(resource, context, digest)
+    digest.send()
 
 
 @task(name='send_notices_on_resource_changed', max_retries=2)
@@ -83,3 +98,31 @@ def send_notices_for_resource_edited(resource, user):
     post_resource_save.send(
         sender=None, instance=resource, created=False, user=user
     )
+
+
+@task(name='import_resource_content', ignore_result=True)
+def import_content(job_id):
+    """
+    Run an import that has been scheduled through the formats backend.
+
+    Args:
+        job_id: The id of the ImportJob to run.
+    """
+    from transifex.resources.backends import FormatsBackend
+    ImportJob = get_model('resources', 'ImportJob')
+    try:
+        job = ImportJob.objects.select_related(
+            'resource', 'language', 'user'
+        ).get(id=job_id)
+    except ImportJob.DoesNotExist:
+        logger.warning("Import job %s does not exist." % job_id)
+        return
+    if job.status != 'pending':
+        logger.warning("Import job %s has already run." % job_id)
+        return
+    FormatsBackend(job.resource, job.language, job.user).run_import_job(job)
+    if job.status == 'done':
+        post_submit_translation.send(
+            None, request=None, resource=job.resource, language=job.language,
+            modified=job.strings_added + job.strings_updated > 0
+        )
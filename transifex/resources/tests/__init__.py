@@ -7,4 +7,5 @@ from lib import *
 from views import *
 from templates import *
 from backends import *
+from cache import *
 from models import *
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
+from __future__ import with_statement
 import os
-from mock import Mock
+from mock import Mock, patch
 from piston.utils import rc
 from django.core.urlresolvers import reverse
 from django.utils import simplejson
@@ -12,7 +13,8 @@ from transifex.txcommon.tests.base import Users, TransactionNoticeTypes,\
                             TransactionUsers, TransactionBaseTestCase,\
                             BaseTestCase
 from transifex.txcommon.utils import log_skip_transaction_test
-from transifex.resources.models import Resource, RLStats, SourceEntity
+from transifex.resources.models import Resource, RLStats, SourceEntity, \
+        ImportDigest
 from transifex.resources.api import (ResourceHandler,
         TranslationObjectsHandler, NoContentError, BadRequestError,
         ForbiddenError, NotFoundError)
@@ -759,6 +761,36 @@ class TestTranslationAPI(APIBaseTests):
         f.close()
         self.assertEquals(res.status_code, 200)
 
+    def test_put_unchanged_translation(self):
+        """Test that pushing the same file again is skipped."""
+        self._create_resource()
+        url = reverse(
+            'apiv2_translation',
+            kwargs={
+                'project_slug': 'new_pr',
+                'resource_slug': 'r1',
+                'lang_code': 'el',
+            }
+        )
+        with open(self.po_file) as f:
+            content = f.read()
+        res = self.client['registered'].put(
+            url, data=simplejson.dumps({'content': content}),
+            content_type='application/json'
+        )
+        self.assertEquals(res.status_code, 200)
+        self.assertTrue(ImportDigest.objects.filter(
+                resource__slug='r1', language__code='el'
+        ).exists())
+        with patch('transifex.resources.formats.core.Handler.save2db') \
+                as save2db:
+            res = self.client['registered'].put(
+                url, data=simplejson.dumps({'content': content}),
+                content_type='application/json'
+            )
+            self.assertEquals(res.status_code, 200)
+            self.assertFalse(save2db.called)
+
     def test_rlstats_updated(self):
         self._create_project()
         content = 'key = value'
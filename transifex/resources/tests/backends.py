@@ -9,7 +9,9 @@ from transifex.projects.models import Project
 from transifex.txcommon.tests.base import TransactionLanguages, \
         TransactionUsers, TransactionNoticeTypes
 from transifex.languages.models import Language
-from transifex.resources.models import Resource, SourceEntity, Translation
+from transifex.resources.models import Resource, SourceEntity, Translation, \
+        ImportDigest
+from transifex.resources.handlers import invalidate_stats_cache
 from transifex.resources.backends import *
 
 
@@ -63,6 +65,92 @@ class TestFormatsBackend(TestBackend):
         self.assertEquals(len(ses), 6)
         self.assertEquals(len(trs), 7)
 
+    def test_import_invalid_translation(self):
+        """Test that translations with errors are left out of an import,
+        along with the other plural forms of their strings, and reported.
+        """
+        fb = FormatsBackend(self.resource, self.source_lang, self.maintainer)
+        fb.import_source(self.content, self.method)
+        content = self.content.replace(
+            'msgstr "A\xc3\xa7\xc3\xa3o"', 'msgstr "A\xc3\xa7\xc3\xa3o %s"'
+        ).replace(
+            'msgstr[1] "{0} resultados"', 'msgstr[1] "{0} resultados %s"'
+        )
+        handler = registry.appropriate_handler(
+            self.resource, self.target_lang
+        )
+        handler.bind_resource(self.resource)
+        handler.set_language(self.target_lang)
+        handler.bind_content(content)
+        handler.parse_file(is_source=False)
+        handler.save2db(is_source=False, user=self.maintainer)
+        translations = Translation.objects.filter(
+            resource=self.resource, language=self.target_lang
+        )
+        self.assertTrue(
+            translations.filter(source_entity__string='User').exists()
+        )
+        for string in ('Action', '{0} result'):
+            self.assertFalse(
+                translations.filter(source_entity__string=string).exists()
+            )
+            se = SourceEntity.objects.get(
+                resource=self.resource, string=string
+            )
+            self.assertTrue(
+                'validation_%s' % se.id in handler.warning_messages
+            )
+
+    def test_record_import_digests(self):
+        """Test that recording the digests of an import updates the row of
+        the resource and language in place.
+        """
+        ImportDigest.objects.record(
+            self.resource, self.target_lang, False, 'a' * 40, 'b' * 40
+        )
+        ImportDigest.objects.record(
+            self.resource, self.target_lang, False, 'c' * 40, 'd' * 40
+        )
+        digests = ImportDigest.objects.filter(
+            resource=self.resource, language=self.target_lang
+        )
+        self.assertEquals(digests.count(), 1)
+        self.assertEquals(digests[0].content_digest, 'c' * 40)
+        self.assertEquals(digests[0].stringset_digest, 'd' * 40)
+
+    def test_import_unchanged_file(self):
+        """Test that importing the last imported file again is skipped."""
+        fb = FormatsBackend(self.resource, self.source_lang, self.maintainer)
+        self.assertEquals(fb.import_source(self.content, self.method), (6, 0))
+        self.assertTrue(ImportDigest.objects.filter(
+                resource=self.resource, language=self.source_lang,
+                is_source=True
+        ).exists())
+        with patch('transifex.resources.formats.core.Handler.save2db') \
+                as save2db:
+            # The same content with different line endings
+            res = fb.import_source(
+                self.content.replace('\n', '\r\n'), self.method
+            )
+            self.assertEquals(res, (0, 0))
+            # The same strings with different formatting
+            res = fb.import_source(
+                self.content.replace('\n\n', '\n\n\n'), self.method
+            )
+            self.assertEquals(res, (0, 0))
+            self.assertFalse(save2db.called)
+
+        # A change to the strings makes the next import count again.
+        invalidate_stats_cache(self.resource, self.source_lang)
+        self.assertFalse(
+            ImportDigest.objects.filter(resource=self.resource).exists()
+        )
+        with patch('transifex.resources.formats.core.Handler.save2db') \
+                as save2db:
+            save2db.return_value = (0, 0)
+            fb.import_source(self.content, self.method)
+            self.assertTrue(save2db.called)
+
     def test_handlers_used_for_source_import(self):
         """Test the handlers used for various combinations of resources and
         languages, when pushing the source file.
@@ -172,3 +260,51 @@ class TestFormatsBackend(TestBackend):
                 fb = FormatsBackend(resource, lang, None)
                 self.assertRaises(FormatsBackendError, fb.import_source, '')
 
+
+
+class TestImportJobs(TestBackend):
+
+    def test_schedule_import(self):
+        """Test that scheduling an import only stores the content."""
+        fb = FormatsBackend(self.resource, self.source_lang, self.maintainer)
+        with patch('transifex.resources.backends.import_content') as task:
+            job = fb.schedule_import(self.content, True, filename='test.po')
+            task.delay.assert_called_once_with(job.id)
+        job = ImportJob.objects.get(id=job.id)
+        self.assertEquals(job.status, 'pending')
+        self.assertEquals(job.progress, 0)
+        self.assertEquals(job.content, self.content)
+        self.assertFalse(
+            SourceEntity.objects.filter(resource=self.resource).exists()
+        )
+
+    def test_run_import_job(self):
+        """Test that running a job imports the content and records the
+        results.
+        """
+        fb = FormatsBackend(self.resource, self.source_lang, self.maintainer)
+        with patch('transifex.resources.backends.import_content'):
+            job = fb.schedule_import(self.content, True, filename='test.po')
+        fb.run_import_job(job)
+        job = ImportJob.objects.get(id=job.id)
+        self.assertEquals(job.status, 'done')
+        self.assertEquals(job.progress, ImportJob.PROGRESS_DONE)
+        self.assertEquals(job.strings_added, 6)
+        self.assertEquals(job.strings_updated, 0)
+        self.assertEquals(job.strings_deleted, 0)
+        self.assertEquals(job.content, None)
+        self.assertEquals(
+            SourceEntity.objects.filter(resource=self.resource).count(), 6
+        )
+
+    def test_failed_import_job(self):
+        """Test that errors are recorded in the job."""
+        fb = FormatsBackend(self.resource, self.source_lang, self.maintainer)
+        with patch('transifex.resources.backends.import_content'):
+            job = fb.schedule_import(self.content, True, filename='test.po')
+        with patch.object(FormatsBackend, '_import_content') as mock:
+            mock.side_effect = FormatsBackendError("Broken file")
+            fb.run_import_job(job)
+        job = ImportJob.objects.get(id=job.id)
+        self.assertEquals(job.status, 'failed')
+        self.assertEquals(job.error, "Broken file")
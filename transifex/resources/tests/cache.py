@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import with_statement
+from mock import patch
+from django.core.cache import get_cache
+from transifex.txcommon.tests.base import BaseTestCase
+from transifex.resources.formats.compilation import Mode
+from transifex.resources.backends import FormatsBackend
+from transifex.resources.cache import compiled_translation_etag, \
+        bump_content_version
+
+
+class TestCompiledTranslationCache(BaseTestCase):
+    """Test the caching of compiled translation files."""
+
+    def setUp(self):
+        super(TestCompiledTranslationCache, self).setUp()
+        self.locmem = get_cache('django.core.cache.backends.locmem.LocMemCache')
+        self.locmem.clear()
+        self.patcher = patch('transifex.resources.cache.cache', self.locmem)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        super(TestCompiledTranslationCache, self).tearDown()
+
+    def _etag(self, language, mode=Mode.DEFAULT):
+        return compiled_translation_etag(self.resource, language, mode)
+
+    def test_etag_is_stable(self):
+        """Test that the tag does not change without updates."""
+        etag = self._etag(self.language_ar)
+        self.assertTrue(etag)
+        self.assertEquals(etag, self._etag(self.language_ar))
+        self.assertNotEquals(etag, self._etag(self.language))
+        self.assertNotEquals(etag, self._etag(self.language_ar, Mode.REVIEWED))
+
+    def test_etag_of_representations(self):
+        """Test that the file and the JSON responses have different tags."""
+        file_etag = compiled_translation_etag(
+            self.resource, self.language_ar, Mode.DEFAULT, None, 'file'
+        )
+        json_etag = compiled_translation_etag(
+            self.resource, self.language_ar, Mode.DEFAULT, None, 'json'
+        )
+        self.assertTrue(file_etag)
+        self.assertNotEquals(file_etag, json_etag)
+
+    def test_bump_language(self):
+        """Test that bumping a language affects that language only."""
+        etag_ar = self._etag(self.language_ar)
+        etag = self._etag(self.language)
+        bump_content_version(self.resource, self.language_ar)
+        self.assertNotEquals(etag_ar, self._etag(self.language_ar))
+        self.assertEquals(etag, self._etag(self.language))
+
+    def test_bump_source(self):
+        """Test that bumping the source language affects all languages."""
+        etag_ar = self._etag(self.language_ar)
+        etag = self._etag(self.language)
+        bump_content_version(self.resource, self.resource.source_language)
+        self.assertNotEquals(etag_ar, self._etag(self.language_ar))
+        self.assertNotEquals(etag, self._etag(self.language))
+
+    def test_compiled_file_is_cached(self):
+        """Test that the second compilation is served from the cache."""
+        fb = FormatsBackend(self.resource, self.language_ar)
+        content = fb.compile_translation()
+        with patch('transifex.resources.backends.registry') as registry:
+            self.assertEquals(fb.compile_translation(), content)
+            self.assertFalse(registry.appropriate_handler.called)
+            bump_content_version(self.resource, self.language_ar)
+            fb.compile_translation()
+            self.assertTrue(registry.appropriate_handler.called)
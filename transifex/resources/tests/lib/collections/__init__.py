@@ -4,7 +4,7 @@
 import unittest
 from transifex.resources.models import SourceEntity, Translation
 from transifex.resources.formats.core import SourceEntityCollection, \
-        TranslationCollection, GenericTranslation, StringSet
+        TranslationCollection, GenericTranslation, StringSet, TranslationRow
 
 
 class TestResourceCollections(unittest.TestCase):
@@ -72,6 +72,21 @@ class TestResourceCollections(unittest.TestCase):
         self.assertTrue(t3 in col)
         self.assertTrue(len(col._items), 3)
 
+    def test_translation_rows(self):
+        """Test that rows are looked up like the translations they are
+        loaded from.
+        """
+        self.se1.id = 1
+        row = TranslationRow(10, 1, 5, "A translation", False)
+        col = TranslationCollection()
+        col.add(row)
+        t = Translation(string="A translation", rule=5)
+        t.source_entity_id = 1
+        self.assertTrue(t in col)
+        gt = GenericTranslation(self.se1.string, "A translation", rule=5)
+        self.assertTrue((self.se1, gt) in col)
+        self.assertEquals(col.get((self.se1, gt)), row)
+
 
 class TestStringSet(unittest.TestCase):
     """Test stringset class."""
@@ -6,3 +6,4 @@ from .decorators import *
 from .mode import *
 from .factories import *
 from .compilers import *
+from .benchmark import *
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmark of the substitution of hashes in templates.
+
+The timings are logged, not asserted on. Raise ``entries`` and ``repeat``
+to get meaningful numbers.
+"""
+
+import time
+from django.utils import unittest
+from django.utils.hashcompat import md5_constructor
+from transifex.resources.formats.compilation.compilers import Compiler, \
+        PluralCompiler
+from transifex.resources.formats.utils.hash_tag import index_hashes, \
+        pluralized_hash_regex
+from transifex.txcommon.log import logger
+
+
+def _po_entry(n, string_hash):
+    if n % 10 == 0:
+        return u'#: src/file.c:%(n)s\nmsgid "%(n)s file"\n'\
+                u'msgid_plural "%(n)s files"\nmsgstr[0] "%(h)s_pl_0"\n'\
+                u'msgstr[1] "%(h)s_pl_1"\n\n' % {'n': n, 'h': string_hash}
+    return u'#: src/file.c:%(n)s\nmsgid "Source string %(n)s"\n'\
+            u'msgstr "%(h)s_tr"\n\n' % {'n': n, 'h': string_hash}
+
+
+def _qt_entry(n, string_hash):
+    return u'    <message>\n        <source>Source string %s</source>\n'\
+            u'        <translation>%s_tr</translation>\n    </message>\n' % (
+                n, string_hash
+            )
+
+
+def _properties_entry(n, string_hash):
+    return u'# Comment for key%s\nkey%s=%s_tr\n' % (n, n, string_hash)
+
+
+class TestHashSubstitutionBenchmark(unittest.TestCase):
+    """Compare the compilation of templates with and without an index
+    of their hashes.
+    """
+
+    entries = 1000
+    repeat = 1
+
+    def _template(self, entry_func):
+        """Return a template and the translations of its hashes."""
+        chunks = []
+        translations = {}
+        for n in xrange(self.entries):
+            string_hash = md5_constructor(str(n)).hexdigest()
+            chunks.append(entry_func(n, string_hash))
+            translations[string_hash + '_tr'] = u'Translation %s' % n
+            translations[string_hash + '_pl_0'] = u'One translation %s' % n
+            translations[string_hash + '_pl_1'] = u'Translations %s' % n
+        return u''.join(chunks), translations
+
+    def _best_time(self, func):
+        best = None
+        for i in range(self.repeat):
+            start = time.time()
+            result = func()
+            elapsed = time.time() - start
+            if best is None or elapsed < best:
+                best = elapsed
+        return best, result
+
+    def _benchmark(self, compiler_class, entry_func):
+        template, translations = self._template(entry_func)
+        compiler = compiler_class(resource=None)
+        scan_time, scanned = self._best_time(
+            lambda: compiler._apply_translations(translations, template)
+        )
+        compiler.placeholder_index = index_hashes(template)
+        compiler._template = template
+        index_time, indexed = self._best_time(
+            lambda: compiler._apply_translations(translations, template)
+        )
+        self.assertEquals(scanned, indexed)
+        self.assertFalse(pluralized_hash_regex().search(indexed))
+        logger.debug("%s: %.3fs with the index, %.3fs without" % (
+            entry_func.__name__, index_time, scan_time
+        ))
+
+    def test_po_template(self):
+        self._benchmark(PluralCompiler, _po_entry)
+
+    def test_qt_template(self):
+        self._benchmark(PluralCompiler, _qt_entry)
+
+    def test_properties_template(self):
+        self._benchmark(Compiler, _properties_entry)
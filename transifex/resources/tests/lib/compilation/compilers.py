@@ -3,6 +3,7 @@
 from django.utils import unittest
 from transifex.resources.formats.compilation.compilers import Compiler, \
         PluralCompiler
+from transifex.resources.formats.utils.hash_tag import index_hashes
 
 
 class TestCompiler(unittest.TestCase):
@@ -17,6 +18,32 @@ class TestCompiler(unittest.TestCase):
         res = compiler._apply_translations(translations, text)
         self.assertEquals(res, 'yes ')
 
+    def test_apply_translations_with_index(self):
+        """Test that the index of the template is used, if it is valid."""
+        string_hash = '1' * 32 + '_tr'
+        text = u'%s %s' % (string_hash, string_hash)
+        translations = {string_hash: u'yes'}
+        compiler = Compiler(resource=None)
+        compiler._template = text
+        compiler.placeholder_index = (len(text), [0])
+        res = compiler._apply_translations(translations, text)
+        self.assertEquals(res, u'yes ' + string_hash)
+        # The index is ignored for any other text.
+        other = text + u' '
+        res = compiler._apply_translations(translations, other)
+        self.assertEquals(res, u'yes yes ')
+        compiler._template = other
+        compiler.placeholder_index = (len(text), [0])
+        res = compiler._apply_translations(translations, other)
+        self.assertEquals(res, u'yes yes ')
+
+    def test_index_hashes(self):
+        """Test the offsets of the index."""
+        hash_normal = '1' * 32 + '_tr'
+        hash_plural = '2' * 32 + '_pl_0'
+        text = u'a %s b %s' % (hash_normal, hash_plural)
+        self.assertEquals(index_hashes(text), (len(text), [2, 40]))
+
 
 class TestPluralCompiler(unittest.TestCase):
     """Test the compiler class for pluralized formats."""
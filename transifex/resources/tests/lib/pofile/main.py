@@ -1,4 +1,5 @@
 import os
+import codecs
 import polib
 from django.utils import unittest
 from django.conf import settings
@@ -10,6 +11,8 @@ from transifex.resources.models import *
 from transifex.resources.backends import ResourceBackend, FormatsBackend
 from transifex.resources.formats.pofile import POHandler, POTHandler, \
         PoParseError
+from transifex.resources.formats.utils.po_stream import iter_po_entries, \
+        PoTemplateWriter, PoSyntaxError
 from transifex.resources.formats.compilation import Mode
 from transifex.resources.tests.lib.base import FormatsBaseTestCase
 from transifex.addons.copyright.models import Copyright
@@ -524,3 +527,43 @@ class TestPolibEmptyComments(unittest.TestCase):
             settings.TX_ROOT, 'resources/tests/lib/pofile/empty_comment.po'
         )
         polib.pofile(filename)
+
+
+class TestPoStream(unittest.TestCase):
+    """Check that the incremental reader reads files the way polib does."""
+
+    def _files(self):
+        path = os.path.join(settings.TX_ROOT, 'resources/tests/lib/pofile')
+        for name in ('pt_BR.po', 'ar.po', 'tests.pot', 'copyright.po',
+                     'general/test.pot'):
+            yield os.path.join(path, name)
+
+    def test_entries(self):
+        for filename in self._files():
+            content = codecs.open(filename, 'r', 'UTF-8').read()
+            po = polib.pofile(content)
+            entries = list(iter_po_entries(content))
+            self.assertTrue(entries[0].is_header)
+            self.assertEqual(entries[0].metadata, po.metadata)
+            self.assertEqual(len(entries[1:]), len(po))
+            for entry, po_entry in zip(entries[1:], po):
+                for attr in ('msgid', 'msgid_plural', 'msgstr',
+                             'msgstr_plural', 'msgctxt', 'comment',
+                             'occurrences', 'flags', 'obsolete'):
+                    self.assertEqual(
+                        getattr(entry, attr), getattr(po_entry, attr)
+                    )
+
+    def test_unchanged_copy(self):
+        for filename in self._files():
+            content = codecs.open(filename, 'r', 'UTF-8').read()
+            writer = PoTemplateWriter()
+            for entry in iter_po_entries(content):
+                writer.write(entry)
+            self.assertEqual(
+                writer.getvalue().rstrip('\n'), content.rstrip('\n')
+            )
+
+    def test_syntax_error(self):
+        content = u'msgid "a"\nmsgid_plural "b"\nmsgid_plural "c"\n'
+        self.assertRaises(PoSyntaxError, list, iter_po_entries(content))
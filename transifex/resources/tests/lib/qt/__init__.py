@@ -6,6 +6,7 @@ from transifex.languages.models import Language
 from transifex.resources.models import *
 from transifex.resources.formats.qt import LinguistHandler, \
         _getElementByTagName, _getText, _context_of_message
+from transifex.resources.formats.utils.xml_stream import parse_units
 from transifex.addons.suggestions.models import Suggestion
 from transifex.resources.tests.lib.base import FormatsBaseTestCase
 
@@ -491,3 +492,42 @@ class TestQtFile(FormatsBaseTestCase):
                 self.assertEquals(s.translation, 'asadfzasdf')
             else:
                 self.assertTrue(False, "Not supposed to happen")
+
+
+class TestXmlStream(unittest.TestCase):
+    """Test the incremental parsing of XML files."""
+
+    def setUp(self):
+        filename = os.path.join(os.path.dirname(__file__), 'en.ts')
+        f = open(filename, 'r')
+        try:
+            self.content = f.read()
+        finally:
+            f.close()
+
+    def test_same_xml(self):
+        """Test that the document is serialized as minidom does."""
+        units = []
+        doc = parse_units(
+            self.content, lambda node: node.tagName == 'message',
+            units.append
+        )
+        minidom_doc = xml.dom.minidom.parseString(self.content)
+        self.assertEquals(
+            len(units), len(minidom_doc.getElementsByTagName('message'))
+        )
+        self.assertEquals(doc.toxml(), minidom_doc.toxml())
+        self.assertFalse(doc.getElementsByTagName('message'))
+
+    def test_modified_units(self):
+        """Test that changes to the units are kept."""
+        def handle_unit(node):
+            node.setAttribute('seen', 'yes')
+        doc = parse_units(
+            self.content, lambda node: node.tagName == 'message',
+            handle_unit
+        )
+        minidom_doc = xml.dom.minidom.parseString(self.content)
+        for node in minidom_doc.getElementsByTagName('message'):
+            handle_unit(node)
+        self.assertEquals(doc.toxml(), minidom_doc.toxml())
@@ -5,7 +5,8 @@ Tests for the utils module.
 """
 
 from django.utils import unittest
-from transifex.resources.formats.utils.string_utils import split_by_newline
+from transifex.resources.formats.utils.string_utils import split_by_newline, \
+        find_similar_strings, percent_diff
 
 
 class TestSplitNewlines(unittest.TestCase):
@@ -45,3 +46,54 @@ class TestSplitNewlines(unittest.TestCase):
         expected_pos = [2, 4, 6, -1]
         for res, expected in zip(split_by_newline(text), expected_pos):
             self.assertEqual(res[0], expected)
+
+
+class TestFindSimilarStrings(unittest.TestCase):
+    """Test the find_similar_strings function."""
+
+    originals = [
+        (1, u'The file has been saved.'),
+        (2, u'Could not open the file %s.'),
+        (3, u'Quit'),
+        (4, u''),
+    ]
+    candidates = [
+        (10, u'The files have been saved.'),
+        (11, u'Could not open file %s.'),
+        (12, u'The file has been saved!'),
+        (13, u'Quite'),
+        (14, u''),
+    ]
+
+    def _brute_force(self, max_distance):
+        pairs = []
+        for key, string in self.originals:
+            for other_key, other_string in self.candidates:
+                if percent_diff(string, other_string) < max_distance:
+                    pairs.append((key, other_key))
+                    break
+        return pairs
+
+    def test_same_as_comparing_all(self):
+        """Test that the pairs are the ones found by comparing all
+        strings.
+        """
+        for max_distance in (0, 5, 10, 20, 50, 100, 101):
+            self.assertEqual(
+                find_similar_strings(
+                    self.originals, self.candidates, max_distance
+                ),
+                self._brute_force(max_distance)
+            )
+
+    def test_max_comparisons(self):
+        """Test the limit in the number of comparisons."""
+        pairs = find_similar_strings(
+            self.originals, self.candidates, 10,
+            max_comparisons=len(self.originals) * len(self.candidates)
+        )
+        self.assertEqual(pairs, self._brute_force(10))
+        pairs = find_similar_strings(
+            self.originals, self.candidates, 10, max_comparisons=0
+        )
+        self.assertEqual(pairs, [])
@@ -221,3 +221,38 @@ class TestValidators(TestCase):
         v.rule = 1
         new = "apple"
         v(old, new)
+
+    def test_string_tokens(self):
+        tokens = StringTokens(
+            "Visit http://www.transifex.net or mail info@transifex.net "
+            "%(count)d times (%s)\\n"
+        )
+        self.assertEqual(tokens.urls, ['http://www.transifex.net'])
+        self.assertEqual(tokens.emails, ['info@transifex.net'])
+        self.assertEqual(
+            [key for expr, key, type_ in tokens.printf], ['count', None]
+        )
+        self.assertEqual(tokens.bracket_count('('), 2)
+        self.assertTrue(tokens.unescaped.endswith('\n'))
+
+    def test_engine(self):
+
+        class Language(object):
+            nplurals = 2
+
+        engine = ValidationEngine('PO', Language(), Language())
+        results = engine.validate_many([
+            ("%s apples", "%s mela", 5, (1, 5)),
+            ("%s apples", "mela", 5, (1, 5)),
+            ("Call 112", "Chiama", 5, (2, 5)),
+            ("Call 112", "", 5, (2, 5)),
+        ])
+        self.assertEqual(results[0], (None, []))
+        self.assertTrue(results[1][0])
+        self.assertEqual(results[2][0], None)
+        self.assertEqual(len(results[2][1]), 1)
+        self.assertEqual(results[3], (None, []))
+        # The tokens of the source strings are kept by key.
+        self.assertEqual(
+            engine.source_tokens("ignored", (1, 5)).string, "%s apples"
+        )
@@ -255,3 +255,197 @@ class RLStatsModelWordsTests(BaseTestCase):
         # untranslated English string; in this case it's just the new string
         self.assertEqual(rls_ar.untranslated_wordcount, self.translation_en2.wordcount)
 
+
+
+class RLStatsDeltaTests(BaseTestCase):
+    """Test the incremental updates of the RLStats model."""
+
+    def _stats(self, language):
+        return self.resource.rlstats_set.get(language=language)
+
+    def test_delta_matches_update(self):
+        """Test that applying a delta gives the same result as recounting."""
+        se = self.source_entity_plural
+        Translation.objects.create(
+            string='Plural string', rule=5, source_entity=se,
+            language=self.language_en, resource=self.resource
+        )
+        t = Translation.objects.create(
+            string='Pluralized translation', rule=5, source_entity=se,
+            language=self.language_ar, resource=self.resource
+        )
+        rls = self._stats(self.language_ar)
+        rls.apply_delta(
+            translated=1, user=self.user['registered'],
+            translated_wordcount=Translation.objects.source_wordcount(
+                self.resource, [se.id]
+            )
+        )
+        applied = self._stats(self.language_ar)
+        self.assertEqual(applied.last_committer, self.user['registered'])
+        rls.update()
+        self.assertEqual(applied.translated, rls.translated)
+        self.assertEqual(applied.untranslated, rls.untranslated)
+        self.assertEqual(applied.translated_perc, rls.translated_perc)
+        self.assertEqual(
+            applied.translated_wordcount, rls.translated_wordcount
+        )
+
+        t.reviewed = True
+        t.save()
+        rls.apply_delta(reviewed=1)
+        self.assertEqual(self._stats(self.language_ar).reviewed, 1)
+        self.assertEqual(self._stats(self.language_ar).reviewed_perc, 50)
+
+    def test_drifted_delta(self):
+        """Test that out of range deltas cause a full update."""
+        rls = self._stats(self.language_ar)
+        rls.apply_delta(translated=-10)
+        self.assertEqual(self._stats(self.language_ar).translated, 1)
+
+
+class RLStatsBulkUpdateTests(BaseTestCase):
+    """Test the update of the stats of all languages of a resource."""
+
+    def test_update_by_resource(self):
+        """Test that the grouped update matches the per language update."""
+        self.create_more_entities()
+        self.translation_ar.reviewed = True
+        self.translation_ar.save()
+        updated = dict(
+            (rl.language_id, rl) for rl in RLStats.update_by_resource(
+                self.resource, self.user['maintainer']
+            )
+        )
+        self.assertTrue(updated)
+        for rl in RLStats.objects.filter(resource=self.resource):
+            bulk = updated[rl.language_id]
+            self.assertEqual(rl.last_committer, self.user['maintainer'])
+            rl.update()
+            for field in ('translated', 'untranslated', 'reviewed',
+                          'translated_wordcount', 'translated_perc',
+                          'reviewed_perc'):
+                self.assertEqual(getattr(bulk, field), getattr(rl, field))
+
+    def test_rebuild_by_resources(self):
+        """Test that the set-based rebuild matches the per language update
+        for many resources and fixes drifted, missing and stale stats.
+        """
+        self.create_more_entities()
+        resources = [self.resource, self.resource_private]
+        expected = {}
+        for rl in RLStats.objects.filter(resource__in=resources):
+            rl.update()
+            expected[(rl.resource_id, rl.language_id)] = rl
+        missing = RLStats.objects.get(
+            resource=self.resource, language=self.language_ar
+        )
+        RLStats.objects.filter(pk=missing.pk).delete()
+        drifted = RLStats.objects.get(
+            resource=self.resource, language=self.language_en
+        )
+        RLStats.objects.filter(pk=drifted.pk).update(translated=0)
+        stale = Language.objects.exclude(id__in=[
+            lid for rid, lid in expected if rid == self.resource_private.id
+        ])[0]
+        RLStats.objects.create(resource=self.resource_private, language=stale)
+
+        changed = RLStats.rebuild_by_resources(
+            [r.id for r in resources]
+        )
+        rebuilt = dict(
+            ((rl.resource_id, rl.language_id), rl)
+            for rl in RLStats.objects.filter(resource__in=resources)
+        )
+        self.assertEqual(set(rebuilt), set(expected))
+        self.assertIn(drifted.pk, changed)
+        self.assertIn(rebuilt[(self.resource.id, self.language_ar.id)].pk,
+                      changed)
+        for key, rl in expected.iteritems():
+            for field in ('translated', 'untranslated', 'reviewed',
+                          'translated_wordcount', 'translated_perc',
+                          'reviewed_perc'):
+                self.assertEqual(getattr(rebuilt[key], field),
+                                 getattr(rl, field))
+        self.assertEqual(RLStats.rebuild_by_resources(
+            [r.id for r in resources]
+        ), [])
+
+    def test_bulk_delete_source_entities(self):
+        """Test that deleting source entities in bulk deletes the objects
+        that refer to them and nothing else.
+        """
+        from suggestions.models import Suggestion, Vote
+        self.create_more_entities()
+        suggestion = Suggestion.objects.create(
+            source_entity=self.source_entity, language=self.language_ar,
+            string='A suggestion', user=self.user['registered']
+        )
+        suggestion.vote_up(self.user['maintainer'])
+        other = Suggestion.objects.create(
+            source_entity=self.source_entity2, language=self.language_ar,
+            string='Another suggestion', user=self.user['registered']
+        )
+        other.vote_up(self.user['maintainer'])
+
+        SourceEntity.objects.bulk_delete([self.source_entity.id])
+        self.assertFalse(
+            SourceEntity.objects.filter(id=self.source_entity.id).exists()
+        )
+        self.assertFalse(Translation.objects.filter(
+                source_entity=self.source_entity.id
+        ).exists())
+        self.assertFalse(Suggestion.objects.filter(id=suggestion.id).exists())
+        self.assertFalse(Vote.objects.filter(suggestion=suggestion.id).exists())
+        self.assertTrue(Translation.objects.filter(
+                source_entity=self.source_entity2
+        ).exists())
+        self.assertEqual(Vote.objects.filter(suggestion=other).count(), 1)
+
+    def test_template_content(self):
+        """Test that the content of templates is stored compressed, read
+        lazily and converted from the old format.
+        """
+        from django.core.management import call_command
+        from transifex.resources import models as resources_models
+        content = 'msgid "%s"\nmsgstr "%s_tr"\n' % (
+            SAMPLE_STRING, md5('1').hexdigest()
+        )
+        Template.objects.filter(resource=self.resource).delete()
+        t = Template.objects.create(resource=self.resource, content=content)
+        self.assertEqual(t.version, 1)
+        resources_models._template_cache.clear()
+        t = Template.objects.get(pk=t.pk)
+        self.assertFalse(isinstance(t.__dict__['content_data'], str))
+        self.assertEqual(t.content, content)
+        self.assertEqual(t.content, content)
+        self.assertEqual(len(resources_models._template_cache), 1)
+
+        stale = Template.objects.get(pk=t.pk)
+        t.content = content.replace(SAMPLE_STRING, 'Other')
+        t.save()
+        self.assertEqual(t.version, 2)
+        t = Template.objects.get(pk=t.pk)
+        self.assertEqual(t.content, content.replace(SAMPLE_STRING, 'Other'))
+        # The cached content of the old data is not served for the new one.
+        self.assertEqual(len(resources_models._template_cache), 2)
+
+        # Saving a stale instance does not reuse the version.
+        stale.content = content
+        stale.save()
+        self.assertEqual(stale.version, 3)
+        t = Template.objects.get(pk=t.pk)
+        self.assertEqual(t.version, 3)
+        self.assertEqual(t.content, content)
+
+        # A template in the old format
+        Template.objects.filter(pk=t.pk).update(
+            content_data=None, legacy_content=content
+        )
+        resources_models._template_cache.clear()
+        self.assertEqual(Template.objects.get(pk=t.pk).content, content)
+        call_command('txconverttemplates', verbosity=0)
+        t = Template.objects.get(pk=t.pk)
+        self.assertEqual(t.legacy_content, None)
+        self.assertEqual(t.content, content)
+        self.assertEqual(t.version, 3)
@@ -3,6 +3,7 @@ from django.conf import settings
 from django.core.cache import cache
 from django.utils.hashcompat import md5_constructor
 from django.utils.http import urlquote
+from transifex.txcommon.cache import bump_generation
 
 
 def invalidate_template_cache(fragment_name, *variables):
@@ -23,3 +24,20 @@ def invalidate_template_cache(fragment_name, *variables):
         args = md5_constructor(u':'.join([urlquote(var) for var in cur_vars]))
         cache_key = 'template.cache.%s.%s' % (fragment_name, args.hexdigest())
         cache.delete(cache_key)
+
+
+def invalidate_resource_templates(resource, language=None):
+    """
+    Invalidate the template fragments of a resource, which are keyed by the
+    generations of the "resource", "resource_source" and "resource_language"
+    scopes.
+
+    If a language is given, only the fragments of that language and the
+    ones about the whole resource are invalidated. Otherwise, the fragments
+    of all languages are.
+    """
+    bump_generation("resource", resource.id)
+    if language is None:
+        bump_generation("resource_source", resource.id)
+    else:
+        bump_generation("resource_language", resource.id, language.code)
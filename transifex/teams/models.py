@@ -5,7 +5,7 @@ from django.utils.translation import ugettext_lazy as _
 from transifex.languages.models import Language
 from transifex.projects.models import Project
 from transifex.txcommon.log import log_model
-from transifex.resources.utils import invalidate_template_cache
+from transifex.resources.utils import invalidate_resource_templates
 
 class TeamManager(models.Manager):
 
@@ -94,10 +94,7 @@ class Team(models.Model):
             Q(project__outsource=self.project))
         for r in res:
             RLStats.objects.get_or_create(resource=r, language=self.language)
-            invalidate_template_cache("project_resource_details",
-                self.project.slug, r.slug)
-            invalidate_template_cache("resource_details",
-                self.project.slug, r.slug)
+            invalidate_resource_templates(r)
 
     def delete(self, *args, **kwargs):
         """
@@ -111,10 +108,7 @@ class Team(models.Model):
             rl, created = RLStats.objects.get_or_create(resource=r, language=self.language)
             if rl.translated == 0:
                 rl.delete()
-            invalidate_template_cache("project_resource_details",
-                self.project.slug, r.slug)
-            invalidate_template_cache("resource_details",
-                self.project.slug, r.slug)
+            invalidate_resource_templates(r)
         super(Team, self).delete(*args, **kwargs)
 
 
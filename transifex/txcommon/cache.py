@@ -4,6 +4,7 @@
 Cache-related functionality.
 """
 
+import time
 from django.core.cache import cache
 from django.conf import settings
 from django.template import Context
@@ -35,6 +36,76 @@ def invalidate_template_cache(fragment_name, *variables):
         cache.delete(cache_key)
 
 
+# Generations must outlive the fragments keyed by them. This is the longest
+# timeout memcached supports.
+GENERATION_TIMEOUT = 60 * 60 * 24 * 30
+
+
+def _generation_key(namespace, ids):
+    """Return the cache key of the generation of the namespace and ids."""
+    return 'template.generation.%s.%s' % (
+        namespace, u':'.join([urlquote(i) for i in ids])
+    )
+
+
+def _new_generation():
+    """Return the initial value of a generation.
+
+    It depends on the time, so that a generation, which has been evicted
+    from the cache, does not start over with a value used before.
+    """
+    return int(time.time() * 1000)
+
+
+def get_generations(*scopes):
+    """Return the generations of the scopes as a string.
+
+    Template fragments, which include the string in their key, are
+    invalidated by ``bump_generation`` with a single increment, instead of
+    deleting them for every language. The stale fragments age out of the
+    cache. For example:
+
+    {% cache_generation "resource" resource.id as generation %}
+    {% cache 500 resource_details resource.slug generation LANGUAGE_CODE %}
+        ...
+    {% endcache %}
+
+    We invalidate this by calling:
+     -  bump_generation("resource", resource.id)
+
+    Args:
+        scopes: A list of (namespace, ids) tuples, where ids is a tuple of
+            the values, which identify an object in the namespace.
+    Returns:
+        A string with the generations of the scopes.
+    """
+    keys = [_generation_key(namespace, ids) for namespace, ids in scopes]
+    values = cache.get_many(keys)
+    generations = []
+    for key in keys:
+        generation = values.get(key)
+        if generation is None:
+            cache.add(key, _new_generation(), GENERATION_TIMEOUT)
+            # Another process may have added it first.
+            generation = cache.get(key)
+        generations.append(unicode(generation))
+    return u'.'.join(generations)
+
+
+def bump_generation(namespace, *ids):
+    """Invalidate the template fragments, which are keyed by the generation
+    of the namespace and ids.
+
+    See ``get_generations``.
+    """
+    key = _generation_key(namespace, ids)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Nothing has been cached with the generation or it was evicted.
+        cache.set(key, _new_generation(), GENERATION_TIMEOUT)
+
+
 def update_template_cache(template_name, fragment_names, key_vars, context):
     """Update the template cache with the new data.
 
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+"""
+Bulk loading of model objects.
+
+Imports insert tens of thousands of source entities and translations at
+once. The loaders here insert them with as little work per row as the
+database allows: PostgreSQL gets the rows streamed through COPY, the other
+databases get them with executemany in batches.
+
+The loader of each database vendor can be replaced with the BULK_LOADERS
+setting, which maps vendors to the dotted paths of loader classes.
+"""
+
+import datetime
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import AutoField
+from django.utils.importlib import import_module
+
+
+def _insert_fields(model):
+    """Return the fields of a model, which are inserted."""
+    return [f for f in model._meta.fields if not isinstance(f, AutoField)]
+
+
+class BulkLoader(object):
+    """Insert objects with executemany.
+
+    The values of the rows are prepared the way Model.save does it, after
+    calling the ``presave`` method of the objects, if they have one, so
+    that fields like hashes and word counts are filled in.
+    """
+
+    # The number of rows sent with each executemany call
+    batch_size = 1000
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def load(self, model, objects):
+        """Insert the objects of a model.
+
+        Args:
+            model: The model of the objects.
+            objects: An iterable of unsaved objects.
+        Returns:
+            The number of objects inserted.
+        """
+        fields = _insert_fields(model)
+        count = self._load(model, fields, self._rows(fields, objects))
+        transaction.commit_unless_managed(using=self.connection.alias)
+        return count
+
+    def _rows(self, fields, objects):
+        """Yield the prepared values of the objects."""
+        connection = self.connection
+        for obj in objects:
+            presave = getattr(obj, 'presave', None)
+            if presave is not None:
+                presave()
+            yield [
+                f.get_db_prep_save(f.pre_save(obj, True), connection=connection)
+                for f in fields
+            ]
+
+    def _load(self, model, fields, rows):
+        qn = self.connection.ops.quote_name
+        sql = 'INSERT INTO %s (%s) VALUES (%s)' % (
+            qn(model._meta.db_table),
+            ', '.join(qn(f.column) for f in fields),
+            ', '.join(['%s'] * len(fields))
+        )
+        cursor = self.connection.cursor()
+        count = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == self.batch_size:
+                cursor.executemany(sql, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+            count += len(batch)
+        return count
+
+
+def _copy_value(value):
+    """Return a value in the text format of COPY."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return value and 't' or 'f'
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if not isinstance(value, basestring):
+        value = unicode(value)
+    if isinstance(value, unicode):
+        value = value.encode('UTF-8')
+    return value.replace('\\', '\\\\').replace('\t', '\\t').replace(
+        '\n', '\\n').replace('\r', '\\r')
+
+
+class _CopyStream(object):
+    """A file-like object, which reads rows as lines for COPY.
+
+    The lines are generated as they are read, so that the whole data is
+    never held in memory.
+    """
+
+    def __init__(self, rows):
+        self._rows = rows
+        self._buffer = ''
+        self.count = 0
+
+    def read(self, size=-1):
+        chunks = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            try:
+                row = self._rows.next()
+            except StopIteration:
+                break
+            line = '\t'.join(_copy_value(v) for v in row) + '\n'
+            chunks.append(line)
+            length += len(line)
+            self.count += 1
+        data = ''.join(chunks)
+        if size < 0:
+            self._buffer = ''
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
+
+class CopyBulkLoader(BulkLoader):
+    """Insert objects with COPY ... FROM STDIN on PostgreSQL.
+
+    The rows are streamed to the server as they are prepared, in a single
+    statement.
+    """
+
+    def _load(self, model, fields, rows):
+        qn = self.connection.ops.quote_name
+        sql = 'COPY %s (%s) FROM STDIN' % (
+            qn(model._meta.db_table),
+            ', '.join(qn(f.column) for f in fields)
+        )
+        stream = _CopyStream(iter(rows))
+        self.connection.cursor().copy_expert(sql, stream)
+        return stream.count
+
+
+DEFAULT_LOADERS = {
+    'postgresql': 'transifex.txcommon.db.bulk.CopyBulkLoader',
+}
+
+
+def get_bulk_loader(using='default'):
+    """Return the bulk loader for a database.
+
+    The class of the loader is taken from the BULK_LOADERS setting for the
+    vendor of the database. COPY is used on PostgreSQL and executemany
+    everywhere else by default.
+
+    Args:
+        using: The alias of the database.
+    """
+    connection = connections[using]
+    loaders = dict(DEFAULT_LOADERS)
+    loaders.update(getattr(settings, 'BULK_LOADERS', {}))
+    path = loaders.get(connection.vendor)
+    if path is None:
+        return BulkLoader(connection)
+    module, name = path.rsplit('.', 1)
+    return getattr(import_module(module), name)(connection)
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-import base64, datetime, re
+import base64, datetime, re, zlib
 from django import forms
 from django.conf import settings
 from django.db.models.signals import post_save
@@ -207,6 +207,110 @@ class CompressedTextField(models.TextField):
                 self.__class__.__name__,', '.join(db_types.keys()))
 
 
+class _Compressed(object):
+    """The compressed value of a ZlibBinaryField, as read from the db."""
+
+    def __init__(self, data):
+        self.data = data
+
+
+class _ZlibDescriptor(object):
+    """Decompress the value of a ZlibBinaryField on first access."""
+
+    def __init__(self, field):
+        self.field = field
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = instance.__dict__.get(self.field.attname)
+        if isinstance(value, _Compressed):
+            value = self.field.decompress(value.data)
+            instance.__dict__[self.field.attname] = value
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = self.field.from_db(value)
+
+
+class ZlibBinaryField(models.Field):
+    """
+    Store a byte string compressed with zlib in a binary column.
+
+    Unlike CompressedTextField, the value is neither pickled nor base64
+    encoded and it is only decompressed when the attribute is first read,
+    so loading an object, that does not need the value, costs nothing.
+    Saving an object, the value of which has not been read, writes the
+    compressed data back as is. Unicode values are stored encoded in UTF-8
+    and are read back as byte strings.
+    """
+
+    # The prefix of the stored data, which tells it apart from
+    # uncompressed values on databases that return binary columns as
+    # strings.
+    MAGIC = 'ZLB\x00'
+
+    def contribute_to_class(self, cls, name):
+        super(ZlibBinaryField, self).contribute_to_class(cls, name)
+        setattr(cls, self.name, _ZlibDescriptor(self))
+
+    def from_db(self, value):
+        """Wrap values read from the database, so that they are
+        decompressed lazily."""
+        if isinstance(value, (buffer, bytearray)):
+            value = str(value)
+            if value.startswith(self.MAGIC):
+                return _Compressed(value)
+        elif isinstance(value, str) and value.startswith(self.MAGIC):
+            return _Compressed(value)
+        return value
+
+    def decompress(self, data):
+        return zlib.decompress(data[len(self.MAGIC):])
+
+    def compressed_data(self, instance):
+        """Return the data of the instance as read from the database, if the
+        value has not been read or set since, else None."""
+        value = instance.__dict__.get(self.attname)
+        if isinstance(value, _Compressed):
+            return value.data
+        return None
+
+    def compress(self, value):
+        if isinstance(value, unicode):
+            value = value.encode('UTF-8')
+        return self.MAGIC + zlib.compress(value)
+
+    def pre_save(self, model_instance, add):
+        # Do not decompress a value, which has not been read.
+        return model_instance.__dict__.get(self.attname)
+
+    def get_db_prep_value(self, value, connection=None, prepared=False):
+        if value is None:
+            return None
+        if isinstance(value, _Compressed):
+            data = value.data
+        else:
+            data = self.compress(value)
+        if connection is not None and connection.vendor == 'mysql':
+            return data
+        # The drivers of PostgreSQL and SQLite take buffers as binary data.
+        return buffer(data)
+
+    def value_to_string(self, obj):
+        return self._get_val_from_obj(obj)
+
+    def db_type(self, connection):
+        db_types = {'mysql': 'longblob',
+                    'sqlite': 'blob',
+                    'postgresql': 'bytea'}
+        try:
+            return db_types[connection.vendor]
+        except KeyError, e:
+            raise Exception, '%s currently works only with: %s' % (
+                self.__class__.__name__,', '.join(db_types.keys()))
+
+
 """
 South Introspection Extending for Custom fields
 Reference: http://south.aeracode.org/docs/customfields.html#extending-introspection
@@ -236,6 +340,17 @@ rules['CompressedTextField'] = [
     ),
 ]
 
+rules['ZlibBinaryField'] = [
+    (
+        [ZlibBinaryField],
+        [],
+        {
+            "blank": ["blank", {"default": True}],
+            "null": ["null", {"default": True}],
+        },
+    ),
+]
+
 rules['ListCharField'] = [
     (
         [ListCharField],
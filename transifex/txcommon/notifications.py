@@ -1,8 +1,20 @@
 # -*- coding: utf-8 -*-
+from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.contenttypes.models import ContentType
-from django.utils.translation import ugettext_noop as _
-from notification.models import ObservedItem, is_observing, send
+from django.contrib.sites.models import Site
+from django.core.mail import get_connection
+from django.core.mail.message import EmailMessage
+from django.core.urlresolvers import reverse
+from django.template import Context
+from django.template.loader import render_to_string
+from django.utils.translation import ugettext_noop as _, ugettext, \
+        get_language, activate
+from djangobulk.bulk import insert_many
+from notification.models import ObservedItem, is_observing, send, Notice, \
+        NoticeSetting, NOTICE_MEDIA_DEFAULTS, LanguageStoreNotAvailable, \
+        get_notification_language, get_formatted_messages
+from transifex.txcommon.log import logger
 
 
 # This is temporary
@@ -341,3 +353,234 @@ def send_observation_notices_for(observed, signal='post_save', extra_context=Non
 
         send([item.user], item.notice_type.label, context)
     return observed_items
+
+
+class NoticeDigest(object):
+    """Collect the notices of a change and send them as one digest per user.
+
+    Sending the notices of a change one observed object and one user at a
+    time renders the templates and sends an email for each of them. The
+    digest resolves the observers of all objects with one query per model,
+    renders the templates of each notice once per language and sends a
+    single email to each user with all of the user's notices. The emails are
+    sent in batches, over one connection per batch.
+
+    It should be used from a celery task, since it sends the emails right
+    away, even if NOTIFICATION_QUEUE_ALL is set.
+
+    Usage::
+
+        digest = NoticeDigest()
+        digest.add_observers([project], 'project_changed', context)
+        digest.send()
+    """
+
+    # The notice formats, as in notification.send_now
+    formats = ('short.txt', 'full.txt', 'notice.html', 'full.html', )
+
+    def __init__(self):
+        # The (notice type, context) of each notice
+        self._notices = []
+        self._users = {}
+        # The indexes of the notices of each user
+        self._user_notices = {}
+
+    def __len__(self):
+        return len(self._notices)
+
+    def add(self, users, notice_type, context):
+        """Add a notice for the users.
+
+        Args:
+            users: An iterable of users.
+            notice_type: The NoticeType of the notice.
+            context: A dictionary with the context of the notice templates.
+        """
+        index = len(self._notices)
+        self._notices.append((notice_type, context))
+        for user in users:
+            self._users[user.pk] = user
+            self._user_notices.setdefault(user.pk, []).append(index)
+
+    def add_observers(self, observed_objects, signal, extra_context=None,
+                      context_for=None):
+        """Add a notice for the observers of each object.
+
+        The observers of the objects of each model are fetched with one
+        query.
+
+        Args:
+            observed_objects: An iterable of observed model instances.
+            signal: The signal the users observe.
+            extra_context: A dictionary with the context shared by the
+                notices.
+            context_for: A function, which returns the context specific
+                to an observed object, if any.
+        """
+        by_ctype = {}
+        for obj in observed_objects:
+            ctype = ContentType.objects.get_for_model(obj)
+            by_ctype.setdefault(ctype, {})[obj.pk] = obj
+        for ctype, objects in by_ctype.iteritems():
+            items = ObservedItem.objects.filter(
+                content_type=ctype, object_id__in=objects.keys(),
+                signal=signal
+            ).select_related('user', 'notice_type').order_by('id')
+            observers = {}
+            for item in items:
+                key = (item.object_id, item.notice_type_id)
+                if key not in observers:
+                    observers[key] = (item.notice_type, [])
+                observers[key][1].append(item.user)
+            for (object_id, notice_type_id), (notice_type, users) in \
+                    sorted(observers.iteritems()):
+                observed = objects[object_id]
+                context = {"observed": observed}
+                context.update(extra_context or {})
+                if context_for is not None:
+                    context.update(context_for(observed))
+                self.add(users, notice_type, context)
+
+    def _email_allowed(self, notice_types):
+        """Return the (user id, notice type id) pairs, for which emails
+        are allowed.
+
+        The settings of the users are fetched with one query. Users without
+        a setting for a notice type get its default.
+        """
+        medium = "1"
+        user_ids = self._users.keys()
+        allowed = set()
+        for notice_type in notice_types:
+            if notice_type.default >= NOTICE_MEDIA_DEFAULTS[medium]:
+                allowed.update((pk, notice_type.pk) for pk in user_ids)
+        for user_id, notice_type_id, send_email in \
+                NoticeSetting.objects.filter(
+                    user__in=user_ids, medium=medium,
+                    notice_type__in=[nt.pk for nt in notice_types]
+                ).values_list('user', 'notice_type', 'send'):
+            if send_email:
+                allowed.add((user_id, notice_type_id))
+            else:
+                allowed.discard((user_id, notice_type_id))
+        return allowed
+
+    def _language_of(self, user):
+        """Return the language of the notices of a user, if any."""
+        try:
+            return get_notification_language(user)
+        except LanguageStoreNotAvailable:
+            return None
+
+    def send(self, batch_size=None):
+        """Create the on-site notices and send the digest emails.
+
+        Args:
+            batch_size: The number of emails to send over a connection.
+                Defaults to the NOTICE_EMAIL_BATCH_SIZE setting.
+        """
+        if not self._notices:
+            return
+        if batch_size is None:
+            batch_size = getattr(settings, 'NOTICE_EMAIL_BATCH_SIZE', 100)
+        current_site = Site.objects.get_current()
+        notices_url = u"%s://%s%s" % (
+            getattr(settings, "DEFAULT_HTTP_PROTOCOL", "http"),
+            unicode(current_site), reverse("notification_notices")
+        )
+        allowed = self._email_allowed(
+            dict((nt.pk, nt) for nt, c in self._notices).values()
+        )
+
+        by_language = {}
+        for user_id, user in self._users.iteritems():
+            by_language.setdefault(self._language_of(user), []).append(user)
+
+        current_language = get_language()
+        records = []
+        emails = []
+        try:
+            for language, users in by_language.iteritems():
+                if language is not None:
+                    activate(language)
+                # The messages of each notice, rendered once per language
+                messages = {}
+                for user in sorted(users, key=lambda u: u.pk):
+                    indexes = self._user_notices[user.pk]
+                    for index in indexes:
+                        if index not in messages:
+                            messages[index] = self._render(
+                                index, current_site, notices_url
+                            )
+                        notice_type = self._notices[index][0]
+                        records.append(Notice(
+                            recipient=user, notice_type=notice_type,
+                            message=messages[index]["notice.html"],
+                            on_site=True
+                        ))
+                    if not (user.email and user.is_active):
+                        continue
+                    emailed = [
+                        i for i in indexes
+                        if (user.pk, self._notices[i][0].pk) in allowed
+                    ]
+                    if emailed:
+                        emails.append(self._email(
+                            user, [messages[i] for i in emailed],
+                            current_site, notices_url
+                        ))
+        finally:
+            activate(current_language)
+
+        if records:
+            insert_many(Notice, records)
+        for i in xrange(0, len(emails), batch_size):
+            batch = emails[i:i + batch_size]
+            connection = get_connection()
+            connection.send_messages(batch)
+        logger.debug(
+            "Sent %s notices to %s users with %s emails." % (
+                len(records), len(self._users), len(emails)
+            )
+        )
+        self._notices = []
+        self._users = {}
+        self._user_notices = {}
+
+    def _context(self, current_site, notices_url, notice_type=None):
+        """Return the context shared by the notices."""
+        context = Context({
+            "recipient": None,
+            "sender": None,
+            "notices_url": notices_url,
+            "current_site": current_site,
+        })
+        if notice_type is not None:
+            context["notice"] = ugettext(notice_type.display)
+        return context
+
+    def _render(self, index, current_site, notices_url):
+        """Render the formats of a notice."""
+        notice_type, extra_context = self._notices[index]
+        context = self._context(current_site, notices_url, notice_type)
+        context.update(extra_context)
+        return get_formatted_messages(self.formats, notice_type.label, context)
+
+    def _email(self, user, messages, current_site, notices_url):
+        """Return the digest email of the messages for the user."""
+        context = self._context(current_site, notices_url)
+        context["recipient"] = user
+        message = messages[0]["short.txt"]
+        if len(messages) > 1:
+            message = render_to_string("notification/digest_short.txt", {
+                "message": message, "others": len(messages) - 1,
+            }, context)
+        subject = "".join(render_to_string(
+            "notification/email_subject.txt", {"message": message}, context
+        ).splitlines())
+        body = render_to_string("notification/email_body.txt", {
+            "message": "\n".join(m["full.txt"] for m in messages),
+        }, context)
+        return EmailMessage(
+            subject, body, settings.DEFAULT_FROM_EMAIL, [user.email]
+        )
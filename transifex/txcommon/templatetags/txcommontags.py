@@ -10,6 +10,7 @@ from django.template import Node, NodeList, TemplateSyntaxError
 from actionlog.models import LogEntry
 from transifex.projects.models import Project
 from transifex import txcommon
+from transifex.txcommon.cache import get_generations
 
 register = template.Library()
 
@@ -149,6 +150,61 @@ def counter(parser, token):
     return CounterNode.handle_token(parser, token)
 
 
+class CacheGenerationNode(ResolverNode):
+    """A template node to get the generations of cache scopes."""
+
+    @classmethod
+    def handle_token(cls, parser, token):
+        bits = token.split_contents()
+        tag_name = bits[0]
+        if len(bits) < 4 or bits[-2] != 'as' or bits[1][0] not in ('"', "'"):
+            raise TemplateSyntaxError(
+                "Wrong syntax for %s. Use: {%% %s \"namespace\" id [id...] "
+                "[\"namespace\" id [id...]] as var_name %%}" % (
+                    tag_name, tag_name
+                )
+            )
+        scopes = []
+        for bit in bits[1:-2]:
+            if bit[0] in ('"', "'"):
+                scopes.append((bit[1:-1], []))
+            else:
+                scopes[-1][1].append(bit)
+        return cls(scopes, bits[-1])
+
+    def __init__(self, scopes, var_name):
+        self.scopes = scopes
+        self.var_name = var_name
+
+    def render(self, context):
+        scopes = [
+            (namespace, [self.resolve(var, context) for var in ids])
+            for namespace, ids in self.scopes
+        ]
+        context[self.var_name] = get_generations(*scopes)
+        return ''
+
+@register.tag
+def cache_generation(parser, token):
+    """
+    Retrieve the generations of the given cache scopes and assign them to a
+    context variable, so that they can be part of the key of a cached
+    template fragment. Each scope is a quoted namespace followed by the
+    values, which identify an object in the namespace.
+
+    Syntax::
+
+        {% cache_generation "resource" resource.id as generation %}
+        {% cache 500 resource_details resource.slug generation %}
+            ...
+        {% endcache %}
+
+        {% cache_generation "resource" resource.id "team" project.id language.code as generation %}
+
+    """
+    return CacheGenerationNode.handle_token(parser, token)
+
+
 # Forms
 
 @register.inclusion_tag("form_as_table_rows.html", takes_context=True)
@@ -1,3 +1,6 @@
 from base import *
+from bulk import *
+from cache import *
+from notifications import *
 from testmaker import *
 from user import *
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+from django.db import connection
+from django.utils import unittest
+from transifex.resources.models import Translation
+from transifex.txcommon.db.bulk import BulkLoader, _CopyStream, \
+        get_bulk_loader
+from transifex.txcommon.tests.base import BaseTestCase
+
+
+class TestBulkLoader(BaseTestCase):
+    """Test the bulk loading of objects."""
+
+    def test_load(self):
+        """Test that the loaded objects are prepared like saved ones."""
+        loader = BulkLoader(connection)
+        loader.batch_size = 2
+        Translation.objects.filter(source_entity=self.source_entity).delete()
+        translations = [
+            Translation(
+                source_entity=self.source_entity, language=lang, rule=5,
+                string=u'Three words here', resource=self.resource
+            ) for lang in (self.language_en, self.language_ar, self.language)
+        ]
+        self.assertEqual(loader.load(Translation, translations), 3)
+        loaded = Translation.objects.filter(source_entity=self.source_entity)
+        self.assertEqual(loaded.count(), 3)
+        for t in loaded:
+            self.assertEqual(t.wordcount, 3)
+            self.assertEqual(t.string_hash, translations[0].string_hash)
+            self.assertTrue(t.created is not None)
+
+    def test_get_bulk_loader(self):
+        """Test that PostgreSQL gets the COPY loader."""
+        loader = get_bulk_loader()
+        self.assertTrue(isinstance(loader, BulkLoader))
+        self.assertEqual(
+            connection.vendor == 'postgresql',
+            loader.__class__.__name__ == 'CopyBulkLoader'
+        )
+
+
+class TestCopyStream(unittest.TestCase):
+    """Test the rows streamed to COPY."""
+
+    def test_read(self):
+        """Test that the rows are escaped and read in pieces."""
+        rows = [[1, u'A\ttab', None], [2, u'A\nnew line \\ αβγ', True]]
+        expected = '1\tA\\ttab\t\\N\n' \
+                '2\tA\\nnew line \\\\ \xce\xb1\xce\xb2\xce\xb3\tt\n'
+        stream = _CopyStream(iter(rows))
+        data = []
+        chunk = stream.read(5)
+        while chunk:
+            data.append(chunk)
+            chunk = stream.read(5)
+        self.assertEqual(''.join(data), expected)
+        self.assertEqual(stream.count, 2)
+        self.assertEqual(_CopyStream(iter(rows)).read(), expected)
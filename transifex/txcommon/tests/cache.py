@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from django.core.cache import get_cache
+from django.utils import unittest
+from transifex.txcommon import cache as txcache
+
+
+class TestGenerations(unittest.TestCase):
+    """Test the generations of template fragments."""
+
+    def setUp(self):
+        self._cache = txcache.cache
+        txcache.cache = get_cache(
+            'django.core.cache.backends.locmem.LocMemCache'
+        )
+
+    def tearDown(self):
+        txcache.cache = self._cache
+
+    def test_bump_generation(self):
+        """Test that only the generation of the bumped scope changes."""
+        scopes = [('resource', (1, )), ('resource_language', (1, 'el'))]
+        generations = txcache.get_generations(*scopes)
+        self.assertEqual(txcache.get_generations(*scopes), generations)
+        other = txcache.get_generations(('resource', (2, )))
+        txcache.bump_generation('resource_language', 1, 'el')
+        self.assertNotEqual(txcache.get_generations(*scopes), generations)
+        self.assertEqual(txcache.get_generations(('resource', (2, ))), other)
+
+    def test_bump_missing_generation(self):
+        """Test bumping a generation, which is not in the cache."""
+        txcache.bump_generation('release', 1)
+        generation = txcache.get_generations(('release', (1, )))
+        txcache.bump_generation('release', 1)
+        self.assertNotEqual(
+            txcache.get_generations(('release', (1, ))), generation
+        )
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+from django.core import mail
+from django.db.models import get_model
+from notification.models import Notice, NoticeSetting, NoticeType, observe
+from transifex.txcommon.notifications import NoticeDigest
+from transifex.txcommon.tests.base import BaseTestCase
+
+TranslationWatch = get_model('watches', 'TranslationWatch')
+
+
+class TestNoticeDigest(BaseTestCase):
+    """Test the digests of notices."""
+
+    def setUp(self):
+        super(TestNoticeDigest, self).setUp()
+        self.context = {
+            'project': self.project,
+            'resource': self.resource,
+            'language': self.language_en,
+        }
+        self.twatches = []
+        for language in (self.language_en, self.language_ar):
+            twatch = TranslationWatch.objects.create(
+                resource=self.resource, language=language
+            )
+            self.twatches.append(twatch)
+        mail.outbox = []
+
+    def _observe(self, user):
+        signal = 'project_resource_translated'
+        observe(self.project, user, signal, signal)
+        signal = 'project_resource_translation_changed'
+        for twatch in self.twatches:
+            observe(twatch, user, signal, signal)
+
+    def _send(self, batch_size=None):
+        digest = NoticeDigest()
+        digest.add_observers(
+            [self.project], 'project_resource_translated',
+            extra_context=self.context
+        )
+        digest.add_observers(
+            self.twatches, 'project_resource_translation_changed',
+            extra_context=self.context,
+            context_for=lambda twatch: {'language': twatch.language}
+        )
+        self.assertEqual(len(digest), 3)
+        digest.send(batch_size=batch_size)
+
+    def test_one_email_per_user(self):
+        """Test that each user gets all notices in one email."""
+        for nick in ('maintainer', 'writer'):
+            self._observe(self.user[nick])
+        self._send(batch_size=1)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(
+            sorted(m.to[0] for m in mail.outbox),
+            [self.user['maintainer'].email, self.user['writer'].email]
+        )
+        for message in mail.outbox:
+            self.assertIn(self.language_en.name, message.body)
+            self.assertIn(self.language_ar.name, message.body)
+            self.assertIn('2 more notices', message.subject)
+        for nick in ('maintainer', 'writer'):
+            self.assertEqual(
+                Notice.objects.filter(recipient=self.user[nick]).count(), 3
+            )
+
+    def test_no_observers(self):
+        """Test that nothing is sent without observers."""
+        self._observe(self.user['maintainer'])
+        digest = NoticeDigest()
+        digest.add_observers(
+            [self.project_private], 'project_resource_translated',
+            extra_context=self.context
+        )
+        self.assertEqual(len(digest), 0)
+        digest.send()
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Notice.objects.count(), 0)
+
+    def test_email_settings(self):
+        """Test that the emails respect the notice settings of users."""
+        user = self.user['maintainer']
+        self._observe(user)
+        NoticeSetting.objects.create(
+            user=user, medium="1", send=False,
+            notice_type=NoticeType.objects.get(
+                label='project_resource_translation_changed'
+            )
+        )
+        self._send()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertNotIn('more notice', mail.outbox[0].subject)
+        self.assertEqual(Notice.objects.filter(recipient=user).count(), 3)
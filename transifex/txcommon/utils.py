@@ -1,6 +1,8 @@
 from __future__ import absolute_import
 import gc, re
 import operator
+import threading
+from collections import OrderedDict
 from django.core.urlresolvers import get_resolver
 from django.views.generic.simple import direct_to_template
 from django.views.decorators.http import condition
@@ -282,6 +284,52 @@ def queryset_iterator(queryset, chunksize=1000):
             yield row
         gc.collect()
 
+class LRUCache(object):
+    """
+    A thread-safe, in-process cache, which keeps the ``size`` most recently
+    used values.
+
+    Usage:
+    cache = LRUCache(100)
+    cache.set(key, value)
+    cache.get(key)
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the value of a key and mark it as the most recent one."""
+        with self._lock:
+            try:
+                value = self._values.pop(key)
+            except KeyError:
+                return default
+            self._values[key] = value
+            return value
+
+    def set(self, key, value):
+        """Store a value and evict the least recently used ones, if the
+        cache is full.
+        """
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._values.pop(key, None)
+            self._values[key] = value
+            while len(self._values) > self.size:
+                self._values.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def __len__(self):
+        return len(self._values)
+
+
 def normalize_query(query_string,
         findterms=re.compile(r'\'([^\']+)\'|"([^"]+)"|(\S+)').findall,
     normspace=re.compile(r'\s{2,}').sub):